@@ -7,7 +7,7 @@ export { createStateAdapter } from './src/state/create-state-adapter'
 export { setupCronHandlers, CronManager } from './src/cron-handler'
 export { isApiStep, isCronStep, isEventStep, isNoopStep } from './src/guards'
 export { LockedData } from './src/locked-data'
-export { getStepConfig, getStreamConfig } from './src/get-step-config'
+export { getStepConfig, getStepConfigs, getStreamConfig } from './src/get-step-config'
 export { StateAdapter } from './src/state/state-adapter'
 export { createMermaidGenerator } from './src/mermaid-generator'
 export { StreamConfig, MotiaStream } from './src/types-stream'
@@ -7,14 +7,20 @@ import { Logger } from '../logger'
 import { Motia } from '../motia'
 import { NoPrinter } from '../printer'
 import { MemoryStateAdapter } from '../state/adapters/memory-state-adapter'
-import { createCronStep } from './fixtures/step-fixtures'
+import { createCronStep, createEventStep } from './fixtures/step-fixtures'
 import { NoTracer } from '../observability/no-tracer'
+import { closeWorkerPools } from '../process-communication/worker-pool'
 
 describe('callStepFile', () => {
   beforeAll(() => {
     process.env._MOTIA_TEST_MODE = 'true'
   })
 
+  afterEach(() => {
+    delete process.env.MOTIA_PAYLOAD_THRESHOLD
+    closeWorkerPools()
+  })
+
   it('should call the cron step file with onlyContext true', async () => {
     const baseDir = path.join(__dirname, 'steps')
     const eventManager = createEventManager()
@@ -49,4 +55,32 @@ describe('callStepFile', () => {
       step.filePath,
     )
   })
+  it('should close a worker invocation whose payload cannot be decoded', async () => {
+    // every input goes through a payload file, decoded into the typed input inside the worker
+    process.env.MOTIA_PAYLOAD_THRESHOLD = '16'
+
+    const baseDir = path.join(__dirname, 'steps')
+    const eventManager = createEventManager()
+    const step = createEventStep(
+      { subscribes: ['TEST_EVENT'], emits: [], worker: { poolSize: 1 } },
+      path.join(baseDir, 'typed-input-step.py'),
+    )
+    const printer = new NoPrinter()
+    const logger = new Logger()
+    const tracer = new NoTracer()
+    const motia: Motia = {
+      eventManager,
+      state: new MemoryStateAdapter(),
+      printer,
+      lockedData: new LockedData(baseDir, 'memory', printer),
+      loggerFactory: { create: () => logger },
+      tracerFactory: { createTracer: () => tracer },
+    }
+
+    jest.spyOn(tracer, 'end')
+
+    await callStepFile({ step, traceId: randomUUID(), logger, tracer, data: { other: 'value' } }, motia)
+
+    expect(tracer.end).toHaveBeenCalledWith(expect.objectContaining({ message: expect.stringContaining('name') }))
+  }, 20_000)
 })
@@ -0,0 +1,43 @@
+import { EventBatcher } from '../event-batcher'
+
+describe('EventBatcher', () => {
+  it('should flush once the batch is full', async () => {
+    const batches: number[][] = []
+    const batcher = new EventBatcher<number>({
+      maxSize: 3,
+      maxWaitMs: 60_000,
+      onFlush: async (items) => {
+        batches.push(items)
+      },
+    })
+
+    batcher.add(1)
+    batcher.add(2)
+    await batcher.add(3)
+    batcher.add(4)
+
+    expect(batches).toEqual([[1, 2, 3]])
+
+    await batcher.flush()
+    expect(batches).toEqual([[1, 2, 3], [4]])
+  })
+
+  it('should flush pending items after the wait time', async () => {
+    const batches: number[][] = []
+    const batcher = new EventBatcher<number>({
+      maxSize: 100,
+      maxWaitMs: 10,
+      onFlush: async (items) => {
+        batches.push(items)
+      },
+    })
+
+    const first = batcher.add(1)
+    const second = batcher.add(2)
+
+    expect(batches).toEqual([])
+
+    await Promise.all([first, second])
+    expect(batches).toEqual([[1, 2]])
+  })
+})
@@ -0,0 +1,87 @@
+import { DecodedFrame, encodeFrame, FrameDecoder } from '../process-communication/framing'
+
+const push = (decoder: FrameDecoder, chunk: Buffer): DecodedFrame[] => {
+  const frames: DecodedFrame[] = []
+  decoder.push(chunk, (frame) => frames.push(frame))
+  return frames
+}
+
+describe('FrameDecoder', () => {
+  it('should decode every frame of a chunk', () => {
+    const decoder = new FrameDecoder()
+    const chunk = Buffer.concat([encodeFrame({ a: 1 }, 'json'), encodeFrame({ b: 2 }, 'json')])
+
+    expect(push(decoder, chunk)).toEqual([
+      { codec: 'json', message: { a: 1 } },
+      { codec: 'json', message: { b: 2 } },
+    ])
+  })
+
+  it('should wait for frames split across chunks', () => {
+    const decoder = new FrameDecoder()
+    const frame = encodeFrame({ text: 'x'.repeat(100) }, 'json')
+
+    // the split also falls inside the length prefix
+    expect(push(decoder, frame.subarray(0, 2))).toEqual([])
+    expect(push(decoder, frame.subarray(2, 50))).toEqual([])
+    expect(push(decoder, frame.subarray(50))).toEqual([{ codec: 'json', message: { text: 'x'.repeat(100) } }])
+  })
+
+  it('should decode frames byte by byte', () => {
+    const decoder = new FrameDecoder()
+    const stream = Buffer.concat([encodeFrame([1, 2], 'json'), encodeFrame('done', 'json')])
+    const messages = Array.from(stream).flatMap((byte) =>
+      push(decoder, Buffer.from([byte])).map((frame) => frame.message),
+    )
+
+    expect(messages).toEqual([[1, 2], 'done'])
+  })
+
+  it('should keep the start of the next frame', () => {
+    const decoder = new FrameDecoder()
+    const first = encodeFrame({ a: 1 }, 'json')
+    const second = encodeFrame({ b: 2 }, 'json')
+
+    expect(push(decoder, Buffer.concat([first, second.subarray(0, 7)]))).toEqual([{ codec: 'json', message: { a: 1 } }])
+    expect(push(decoder, second.subarray(7))).toEqual([{ codec: 'json', message: { b: 2 } }])
+  })
+
+  it('should reject a length prefix above the limit', () => {
+    const decoder = new FrameDecoder(1024)
+    const header = Buffer.alloc(4)
+    header.writeUInt32BE(0xffffffff, 0)
+
+    expect(() => push(decoder, Buffer.concat([header, Buffer.from('garbage')]))).toThrow(
+      'Invalid frame size 4294967295',
+    )
+    // nothing is left buffered from the corrupt stream
+    expect(push(decoder, encodeFrame({ a: 1 }, 'json'))).toEqual([{ codec: 'json', message: { a: 1 } }])
+  })
+
+  it('should reject an empty frame', () => {
+    expect(() => push(new FrameDecoder(), Buffer.alloc(4))).toThrow('Invalid frame size 0')
+  })
+
+  it('should deliver the frames before a corrupt length prefix', () => {
+    const decoder = new FrameDecoder(1024)
+    const frames: DecodedFrame[] = []
+    const header = Buffer.alloc(4)
+    header.writeUInt32BE(0xffffffff, 0)
+
+    const chunk = Buffer.concat([encodeFrame({ a: 1 }, 'json'), header])
+
+    expect(() => decoder.push(chunk, (frame) => frames.push(frame))).toThrow('Invalid frame size')
+    expect(frames).toEqual([{ codec: 'json', message: { a: 1 } }])
+  })
+
+  it('should skip a frame that cannot be decoded', () => {
+    const decoder = new FrameDecoder()
+    const frames: DecodedFrame[] = []
+    const corrupt = encodeFrame({ b: 2 }, 'json')
+    corrupt.write('!', corrupt.length - 1)
+    const chunk = Buffer.concat([encodeFrame({ a: 1 }, 'json'), corrupt, encodeFrame({ c: 3 }, 'json')])
+
+    expect(() => decoder.push(chunk, (frame) => frames.push(frame))).toThrow(SyntaxError)
+    expect(frames.map((frame) => frame.message)).toEqual([{ a: 1 }, { c: 3 }])
+  })
+})
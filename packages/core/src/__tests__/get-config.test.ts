@@ -1,5 +1,5 @@
 import path from 'path'
-import { getStepConfig } from '../get-step-config'
+import { getStepConfig, getStepConfigs } from '../get-step-config'
 import { ApiRouteConfig } from '../types'
 
 describe('Get Config', () => {
@@ -45,4 +45,14 @@ describe('Get Config', () => {
     expect(apiStep.path).toEqual('/test')
     expect(apiStep.method).toEqual('POST')
   })
+
+  it('should get the configs of many files at once', async () => {
+    const baseDir = __dirname
+    const files = ['api-step.py', 'event-step.py', 'api-step.ts'].map((file) => path.join(baseDir, 'steps', file))
+    const configs = await getStepConfigs(files)
+
+    expect(configs[files[0]]?.type).toEqual('api')
+    expect(configs[files[1]]?.type).toEqual('event')
+    expect(configs[files[2]]?.type).toEqual('api')
+  })
 })
@@ -0,0 +1,52 @@
+import { Logger } from '../logger'
+import { Tracer } from '../observability'
+import { MultiTracer } from '../observability/multi-tracer'
+import { NoTracer } from '../observability/no-tracer'
+import { createEventStep } from './fixtures/step-fixtures'
+
+class RecordingTracer extends NoTracer {
+  readonly calls: unknown[][] = []
+  readonly children: RecordingTracer[] = []
+
+  stateOperation(...args: unknown[]) {
+    this.calls.push(['state', ...args])
+  }
+
+  end(...args: unknown[]) {
+    this.calls.push(['end', ...args])
+  }
+
+  child(): Tracer {
+    const child = new RecordingTracer()
+    this.children.push(child)
+    return child
+  }
+}
+
+describe('MultiTracer', () => {
+  it('should record operations in every tracer', () => {
+    const tracers = [new RecordingTracer(), new RecordingTracer()]
+    const tracer = new MultiTracer(tracers)
+
+    tracer.stateOperation('get', { key: 'a' })
+    tracer.end({ message: 'failed' })
+
+    tracers.forEach((recording) => {
+      expect(recording.calls).toEqual([
+        ['state', 'get', { key: 'a' }],
+        ['end', { message: 'failed' }],
+      ])
+    })
+  })
+
+  it('should create a child of every tracer', () => {
+    const tracers = [new RecordingTracer(), new RecordingTracer()]
+
+    new MultiTracer(tracers).child(createEventStep(), new Logger()).end({ message: 'failed' })
+
+    tracers.forEach((recording) => {
+      expect(recording.children.length).toBe(1)
+      expect(recording.children[0].calls).toEqual([['end', { message: 'failed' }]])
+    })
+  })
+})
@@ -0,0 +1,59 @@
+import fs from 'fs'
+import {
+  isPayloadHandle,
+  jsonSize,
+  packPayload,
+  PAYLOAD_KEY,
+  unpackPayload,
+} from '../process-communication/payload-transfer'
+
+describe('payload transfer', () => {
+  beforeEach(() => {
+    process.env.MOTIA_PAYLOAD_THRESHOLD = '16'
+  })
+
+  afterEach(() => {
+    delete process.env.MOTIA_PAYLOAD_THRESHOLD
+  })
+
+  it('should keep small payloads inline', async () => {
+    const { payload, json } = await packPayload({ a: 1 })
+
+    expect(payload).toEqual({ a: 1 })
+    expect(json).toBe('{"a":1}')
+  })
+
+  it('should move large payloads to a file', async () => {
+    const value = { text: 'x'.repeat(100) }
+    const { payload, json } = await packPayload(value)
+
+    expect(isPayloadHandle(payload)).toBe(true)
+    expect(JSON.parse(json)).toEqual(payload)
+
+    const filePath = (payload as { [PAYLOAD_KEY]: { path: string } })[PAYLOAD_KEY].path
+    expect(await unpackPayload(payload)).toEqual(value)
+    expect(fs.existsSync(filePath)).toBe(false)
+  })
+
+  it('should size values like their JSON', () => {
+    const value = {
+      text: 'héllo',
+      list: [1, -2.5, null, true, false, undefined, { nested: [] }],
+      date: new Date(0),
+      skipped: undefined,
+      empty: {},
+    }
+
+    expect(jsonSize(value)).toBe(Buffer.byteLength(JSON.stringify(value)))
+  })
+
+  it('should stop sizing once above the limit', () => {
+    expect(jsonSize({ text: 'x'.repeat(100), rest: 'y'.repeat(100) }, 16)).toBeLessThan(200)
+  })
+
+  it('should reject handles outside the payload directory', async () => {
+    await expect(unpackPayload({ [PAYLOAD_KEY]: { path: '/etc/passwd', size: 1 } })).rejects.toThrow(
+      'Invalid payload file',
+    )
+  })
+})
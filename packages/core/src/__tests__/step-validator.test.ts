@@ -0,0 +1,16 @@
+import { validateStep } from '../step-validator'
+import { createEventStep } from './fixtures/step-fixtures'
+
+describe('validateStep', () => {
+  it('should accept batch delivery for Python steps', () => {
+    const step = createEventStep({ batch: { maxSize: 10 } }, '/steps/processor_step.py')
+
+    expect(validateStep(step)).toEqual({ success: true })
+  })
+
+  it('should reject batch delivery for other runtimes', () => {
+    const step = createEventStep({ batch: { maxSize: 10 } }, '/steps/processor.step.ts')
+
+    expect(validateStep(step)).toEqual(expect.objectContaining({ success: false }))
+  })
+})
@@ -0,0 +1,10 @@
+config = {
+    "type": "event",
+    "name": "event-step",
+    "subscribes": ["TEST_EVENT"],
+    "emits": [],
+}
+
+
+async def handler(data, context):
+    context.logger.info("event received", data)
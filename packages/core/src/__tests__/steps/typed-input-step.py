@@ -0,0 +1,16 @@
+config = {
+    "type": "event",
+    "name": "typed-input-step",
+    "subscribes": ["TEST_EVENT"],
+    "emits": [],
+    "typedInput": True,
+    "input": {
+        "type": "object",
+        "properties": {"name": {"type": "string"}},
+        "required": ["name"],
+    },
+}
+
+
+async def handler(data, context):
+    context.logger.info("event received", {"name": data.name})
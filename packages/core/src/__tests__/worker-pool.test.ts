@@ -0,0 +1,87 @@
+import { Logger } from '../logger'
+import { WorkerPool } from '../process-communication/worker-pool'
+
+const createPool = (options: { poolSize?: number; concurrency?: number; maxRequests?: number } = {}) =>
+  new WorkerPool({
+    command: 'node',
+    args: ['-e', 'setInterval(() => {}, 1000)'],
+    logger: new Logger(),
+    poolSize: options.poolSize ?? 1,
+    concurrency: options.concurrency ?? 1,
+    maxRequests: options.maxRequests ?? 100,
+    idleTimeoutMs: 60_000,
+  })
+
+describe('WorkerPool', () => {
+  it('should reuse an idle worker', async () => {
+    const pool = createPool()
+
+    const first = await pool.acquire()
+    pool.release(first)
+    const second = await pool.acquire()
+
+    expect(second).toBe(first)
+    expect(second.requests).toBe(2)
+
+    pool.close()
+  })
+
+  it('should not spawn more workers than the pool size', async () => {
+    const pool = createPool({ poolSize: 1 })
+
+    const first = await pool.acquire()
+    const pending = pool.acquire()
+    let acquired = false
+    pending.then(() => (acquired = true))
+
+    await new Promise((resolve) => setTimeout(resolve, 50))
+    expect(acquired).toBe(false)
+
+    pool.release(first)
+    expect(await pending).toBe(first)
+
+    pool.close()
+  })
+
+  it('should multiplex invocations up to the concurrency limit', async () => {
+    const pool = createPool({ poolSize: 1, concurrency: 2 })
+
+    const first = await pool.acquire()
+    const second = await pool.acquire()
+    const pending = pool.acquire()
+    let acquired = false
+    pending.then(() => (acquired = true))
+
+    await new Promise((resolve) => setTimeout(resolve, 50))
+    expect(second).toBe(first)
+    expect(first.active).toBe(2)
+    expect(acquired).toBe(false)
+
+    pool.release(second)
+    expect(await pending).toBe(first)
+
+    pool.close()
+  })
+
+  it('should recycle a worker after max requests', async () => {
+    const pool = createPool({ maxRequests: 1 })
+
+    const first = await pool.acquire()
+    pool.release(first)
+    const second = await pool.acquire()
+
+    expect(second).not.toBe(first)
+
+    pool.close()
+  })
+
+  it('should reject pending acquires when closed', async () => {
+    const pool = createPool()
+
+    await pool.acquire()
+    const pending = pool.acquire()
+    pool.close()
+
+    await expect(pending).rejects.toThrow('Worker pool is closed')
+  })
+})
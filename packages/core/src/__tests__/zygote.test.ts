@@ -0,0 +1,68 @@
+import path from 'path'
+import { Logger } from '../logger'
+import { Zygote } from '../process-communication/zygote'
+import { RpcSocketProcessor } from '../step-handler-rpc-socket-processor'
+
+const runner = path.join(__dirname, '..', 'python', 'python-runner.py')
+const stepFile = path.join(__dirname, 'steps', 'event-step.py')
+
+const createZygote = () => new Zygote({ command: 'python', args: [runner, '--zygote', stepFile], logger: new Logger() })
+
+const invoke = async (zygote: Zygote, invocationId: string, data: unknown) => {
+  const socket = await zygote.fork(invocationId, { data, flows: ['test'], traceId: invocationId, streams: [] })
+  const processor = new RpcSocketProcessor(socket)
+  const entries: unknown[] = []
+
+  const closed = new Promise<unknown>((resolve) => {
+    processor.handler<unknown[]>('log.batch', async (batch) => {
+      entries.push(...batch)
+    })
+    processor.handler<unknown>('close', async (input) => resolve(input))
+  })
+
+  await processor.init()
+  const input = await closed
+  processor.close()
+
+  return { input, entries }
+}
+
+describe('Zygote', () => {
+  it('should serve an invocation in a forked child', async () => {
+    const zygote = createZygote()
+
+    try {
+      const { input, entries } = await invoke(zygote, 'first', { hello: 'world' })
+
+      expect((input as { error?: unknown } | undefined)?.error).toBe(undefined)
+      expect(entries.length).toBe(1)
+      expect(entries[0]).toEqual(expect.objectContaining({ msg: 'event received', hello: 'world', traceId: 'first' }))
+    } finally {
+      zygote.close()
+    }
+  })
+
+  it('should fork a child per invocation from the same zygote', async () => {
+    const zygote = createZygote()
+
+    try {
+      const [first, second] = await Promise.all([
+        invoke(zygote, 'first', { index: 1 }),
+        invoke(zygote, 'second', { index: 2 }),
+      ])
+
+      expect(first.entries[0]).toEqual(expect.objectContaining({ index: 1, traceId: 'first' }))
+      expect(second.entries[0]).toEqual(expect.objectContaining({ index: 2, traceId: 'second' }))
+    } finally {
+      zygote.close()
+    }
+  })
+
+  it('should reject forks once closed', async () => {
+    const zygote = createZygote()
+
+    zygote.close()
+
+    await expect(zygote.fork('closed', {})).rejects.toThrow('Zygote is closed')
+  })
+})
@@ -1,18 +1,31 @@
+import { randomUUID } from 'crypto'
 import path from 'path'
 import { trackEvent } from './analytics/utils'
 import { Motia } from './motia'
 import { ProcessManager } from './process-communication/process-manager'
-import { Event, Step } from './types'
+import { RpcHandlerRegistry } from './process-communication/rpc-processor-interface'
+import { getWorkerPool, WorkerPool } from './process-communication/worker-pool'
+import { packPayload, unpackPayload } from './process-communication/payload-transfer'
+import { getZygote, Zygote } from './process-communication/zygote'
+import { RpcSocketProcessor } from './step-handler-rpc-socket-processor'
+import { Event, Step, WorkerConfig } from './types'
 import { BaseStreamItem } from './types-stream'
 import { isAllowedToEmit } from './utils'
-import { Logger } from './logger'
+import { globalLogger, Logger } from './logger'
 import { Tracer } from './observability'
-import { TraceError } from './observability/types'
+import { StepTimings, TraceError } from './observability/types'
 
 type StateGetInput = { traceId: string; key: string }
 type StateSetInput = { traceId: string; key: string; value: unknown }
 type StateDeleteInput = { traceId: string; key: string }
 type StateClearInput = { traceId: string }
+type StateBatchOperation =
+  | ({ op: 'get' } & StateGetInput)
+  | ({ op: 'set' } & StateSetInput)
+  | ({ op: 'delete' } & StateDeleteInput)
+  | ({ op: 'clear' } & StateClearInput)
+type StateBatchInput = { operations: StateBatchOperation[] }
+type StateBatchResult = { result?: unknown; error?: string }
 
 type StateStreamGetInput = { groupId: string; id: string }
 type StateStreamMutateInput = { groupId: string; id: string; data: BaseStreamItem }
@@ -23,6 +36,7 @@ const getLanguageBasedRunner = (
   command: string
   runner: string
   args: string[]
+  supportsWorkers: boolean
 } => {
   const isPython = stepFilePath.endsWith('.py')
   const isRuby = stepFilePath.endsWith('.rb')
@@ -30,23 +44,143 @@ const getLanguageBasedRunner = (
 
   if (isPython) {
     const pythonRunner = path.join(__dirname, 'python', 'python-runner.py')
-    return { runner: pythonRunner, command: 'python', args: [] }
+    return { runner: pythonRunner, command: 'python', args: [], supportsWorkers: true }
   } else if (isRuby) {
     const rubyRunner = path.join(__dirname, 'ruby', 'ruby-runner.rb')
-    return { runner: rubyRunner, command: 'ruby', args: [] }
+    return { runner: rubyRunner, command: 'ruby', args: [], supportsWorkers: false }
   } else if (isNode) {
     if (process.env._MOTIA_TEST_MODE === 'true') {
       const nodeRunner = path.join(__dirname, 'node', 'node-runner.ts')
-      return { runner: nodeRunner, command: 'node', args: ['-r', 'ts-node/register'] }
+      return { runner: nodeRunner, command: 'node', args: ['-r', 'ts-node/register'], supportsWorkers: false }
     }
 
     const nodeRunner = path.join(__dirname, 'node', 'node-runner.js')
-    return { runner: nodeRunner, command: 'node', args: [] }
+    return { runner: nodeRunner, command: 'node', args: [], supportsWorkers: false }
   }
 
   throw Error(`Unsupported file extension ${stepFilePath}`)
 }
 
+const parseEnvNumber = (value: string | undefined, fallback: number): number => {
+  return value ? parseInt(value) : fallback
+}
+
+/**
+ * Warm workers are opt-in, either per step through `config.worker`
+ * or for every Python step through MOTIA_PYTHON_WORKERS=true
+ */
+const getWorkerConfig = (step: Step): Required<WorkerConfig> | undefined => {
+  const stepWorker = 'worker' in step.config ? step.config.worker : undefined
+
+  if (!stepWorker && process.env.MOTIA_PYTHON_WORKERS !== 'true') {
+    return undefined
+  }
+
+  return {
+    poolSize: stepWorker?.poolSize ?? parseEnvNumber(process.env.MOTIA_PYTHON_POOL_SIZE, 1),
+    concurrency: stepWorker?.concurrency ?? parseEnvNumber(process.env.MOTIA_PYTHON_CONCURRENCY, 1),
+    maxRequests: stepWorker?.maxRequests ?? parseEnvNumber(process.env.MOTIA_PYTHON_MAX_REQUESTS, 1000),
+    idleTimeoutMs: stepWorker?.idleTimeoutMs ?? parseEnvNumber(process.env.MOTIA_PYTHON_IDLE_TIMEOUT_MS, 60_000),
+    preload: stepWorker?.preload ?? process.env.MOTIA_PYTHON_PRELOAD?.split(',').filter(Boolean) ?? [],
+  }
+}
+
+/**
+ * Zygote mode is opt-in, either per step through `config.zygote`
+ * or for every Python step through MOTIA_PYTHON_ZYGOTE=true
+ */
+const getZygoteConfig = (step: Step): { preload: string[] } | undefined => {
+  const stepZygote = 'zygote' in step.config ? step.config.zygote : undefined
+
+  if (process.platform === 'win32' || (!stepZygote && process.env.MOTIA_PYTHON_ZYGOTE !== 'true')) {
+    return undefined
+  }
+
+  const preload = typeof stepZygote === 'object' ? stepZygote.preload : undefined
+
+  return { preload: preload ?? process.env.MOTIA_PYTHON_PRELOAD?.split(',').filter(Boolean) ?? [] }
+}
+
+/**
+ * Deadline of an invocation starting now, from `config.timeoutMs` or MOTIA_STEP_TIMEOUT_MS,
+ * undefined when the invocation is not bounded
+ */
+const getDeadline = (step: Step): number | undefined => {
+  const stepTimeout = 'timeoutMs' in step.config ? step.config.timeoutMs : undefined
+  const timeoutMs = stepTimeout ?? parseEnvNumber(process.env.MOTIA_STEP_TIMEOUT_MS, 0)
+
+  return timeoutMs > 0 ? Date.now() + timeoutMs : undefined
+}
+
+/**
+ * Streams the runner exposes to the handler, with the coalescing window of each stream
+ */
+const getStreamsInput = (motia: Motia): { name: string; coalesceMs?: number }[] => {
+  return motia.lockedData.listStreams().map(({ config }) => ({ name: config.name, coalesceMs: config.coalesceMs }))
+}
+
+// time a step gets to report its own timeout or cancellation before it is stopped
+const CANCEL_GRACE_MS = 1000
+
+type InvocationControl = {
+  /**
+   * Asks the step to stop, it closes the invocation with an error when it does
+   */
+  cancel: () => void
+  /**
+   * Stops a step that did not close after being asked to
+   */
+  kill: (reason: string) => void
+}
+
+/**
+ * Cancels the invocation once its deadline passed or the signal aborted, and kills it when
+ * it still did not close after the grace period. Returns the function disposing the watch.
+ */
+const watchInvocation = (deadline: number | undefined, signal: AbortSignal | undefined, control: InvocationControl) => {
+  let killTimer: NodeJS.Timeout | undefined
+
+  const cancel = (reason: string) => {
+    if (!killTimer) {
+      control.cancel()
+      killTimer = setTimeout(() => control.kill(reason), CANCEL_GRACE_MS)
+    }
+  }
+
+  // the step enforces its deadline itself, the host only steps in when it does not
+  const deadlineTimer = deadline
+    ? setTimeout(() => cancel('Invocation timed out'), deadline - Date.now() + CANCEL_GRACE_MS)
+    : undefined
+  const onAbort = () => cancel('Invocation was cancelled')
+
+  if (signal?.aborted) {
+    onAbort()
+  }
+  signal?.addEventListener('abort', onAbort)
+
+  return () => {
+    clearTimeout(deadlineTimer)
+    clearTimeout(killTimer)
+    signal?.removeEventListener('abort', onAbort)
+  }
+}
+
+/**
+ * Receives the response an API step streams instead of returning it
+ */
+export type ResponseStream = {
+  start: (status: number, headers: Record<string, string>) => void
+  /**
+   * Resolves once the chunk was handed to the socket, which is what paces the step
+   */
+  write: (chunk: Buffer | string) => Promise<void>
+  end: () => void
+}
+
+type CloseInput = Partial<TraceError> & { timings?: StepTimings }
+type ResponseStartInput = { status: number; headers?: Record<string, string> }
+type ResponseWriteInput = { data: string; encoding?: 'base64' }
+
 type CallStepFileOptions = {
   step: Step
   traceId: string
@@ -54,123 +188,401 @@ type CallStepFileOptions = {
   contextInFirstArg?: boolean
   logger: Logger
   tracer: Tracer
+  response?: ResponseStream
+  /**
+   * Cancels the invocation when aborted, e.g. when the HTTP client went away
+   */
+  signal?: AbortSignal
 }
 
-export const callStepFile = <TData>(options: CallStepFileOptions, motia: Motia): Promise<TData | undefined> => {
-  const { step, traceId, data, tracer, logger, contextInFirstArg = false } = options
+type StepHandlerCallbacks<TData> = {
+  onResult: (result: TData) => void
+  onClose: (err?: TraceError) => void
+}
 
-  const flows = step.config.flows
+const registerStepHandlers = <TData>(
+  registry: RpcHandlerRegistry,
+  options: CallStepFileOptions,
+  motia: Motia,
+  callbacks: StepHandlerCallbacks<TData>,
+) => {
+  const { step, traceId, tracer, logger } = options
+  const streamConfig = motia.lockedData.getStreams()
+
+  registry.handler<CloseInput | undefined>('close', async (input) => {
+    const { timings, ...error } = input ?? {}
+    // runners without timings close with just the error, or nothing on success
+    const err = error.message !== undefined ? (error as TraceError) : undefined
+
+    if (timings) {
+      tracer.timings(timings)
+    }
 
-  return new Promise((resolve, reject) => {
-    const streamConfig = motia.lockedData.getStreams()
-    const streams = Object.keys(streamConfig).map((name) => ({ name }))
-    const jsonData = JSON.stringify({ data, flows, traceId, contextInFirstArg, streams })
-    const { runner, command, args } = getLanguageBasedRunner(step.filePath)
-    let result: TData | undefined
+    if (err) {
+      trackEvent('step_execution_error', {
+        stepName: step.config.name,
+        traceId,
+        message: err.message,
+      })
+    }
 
-    const processManager = new ProcessManager({
-      command,
-      args: [...args, runner, step.filePath, jsonData],
-      logger,
-      context: 'StepExecution',
+    callbacks.onClose(err)
+
+    if (err) {
+      tracer.end({
+        message: err.message,
+        code: err.code,
+        stack: err.stack?.replace(new RegExp(`${motia.lockedData.baseDir}/`), ''),
+      })
+    } else {
+      tracer.end()
+    }
+  })
+  registry.handler<unknown>('log', async (input: unknown) => logger.log(input))
+  registry.handler<unknown[]>('log.batch', async (entries) => entries.forEach((entry) => logger.log(entry)))
+
+  const stateGet = async (input: StateGetInput) => {
+    tracer.stateOperation('get', input)
+    return motia.state.get(input.traceId, input.key)
+  }
+
+  const stateSet = async (input: StateSetInput) => {
+    tracer.stateOperation('set', { traceId: input.traceId, key: input.key, value: true })
+    return motia.state.set(input.traceId, input.key, input.value)
+  }
+
+  const stateDelete = async (input: StateDeleteInput) => {
+    tracer.stateOperation('delete', input)
+    return motia.state.delete(input.traceId, input.key)
+  }
+
+  const stateClear = async (input: StateClearInput) => {
+    tracer.stateOperation('clear', input)
+    return motia.state.clear(input.traceId)
+  }
+
+  const stateOperations = { get: stateGet, set: stateSet, delete: stateDelete, clear: stateClear }
+
+  registry.handler<StateGetInput, unknown>('state.get', stateGet)
+  registry.handler<StateSetInput, unknown>('state.set', stateSet)
+  registry.handler<StateDeleteInput, unknown>('state.delete', stateDelete)
+  registry.handler<StateClearInput, void>('state.clear', stateClear)
+
+  // operations run in order so reads observe earlier writes of the same batch
+  registry.handler<StateBatchInput, StateBatchResult[]>('state.batch', async ({ operations }) => {
+    const results: StateBatchResult[] = []
+
+    for (const operation of operations) {
+      try {
+        const run = stateOperations[operation.op] as (input: StateBatchOperation) => Promise<unknown>
+        results.push({ result: await run(operation) })
+      } catch (error) {
+        results.push({ error: String(error) })
+      }
+    }
+
+    return results
+  })
+
+  registry.handler<StateStreamGetInput>(`state.getGroup`, (input) => {
+    tracer.stateOperation('getGroup', input)
+    return motia.state.getGroup(input.groupId)
+  })
+
+  registry.handler<TData, void>('result', async (input) => {
+    callbacks.onResult(await unpackPayload(input))
+  })
+
+  const { response } = options
+
+  if (response) {
+    registry.handler<ResponseStartInput, void>('response.start', async ({ status, headers }) => {
+      response.start(status, headers ?? {})
     })
+    registry.handler<ResponseWriteInput, void>('response.write', ({ data, encoding }) =>
+      response.write(encoding === 'base64' ? Buffer.from(data, 'base64') : data),
+    )
+    registry.handler<void, void>('response.end', async () => response.end())
+  }
 
-    trackEvent('step_execution_started', {
-      stepName: step.config.name,
-      language: command,
-      type: step.config.type,
-      streams: streams.length,
+  registry.handler<Event, unknown>('emit', async (input) => {
+    const flows = step.config.flows
+
+    if (!isAllowedToEmit(step, input.topic)) {
+      tracer.emitOperation(input.topic, input.data, false)
+      return motia.printer.printInvalidEmit(step, input.topic)
+    }
+
+    tracer.emitOperation(input.topic, input.data, true)
+    return motia.eventManager.emit({ ...input, traceId, flows, logger, tracer }, step.filePath)
+  })
+
+  Object.entries(streamConfig).forEach(([name, streamFactory]) => {
+    const stateStream = streamFactory()
+
+    registry.handler<StateStreamGetInput>(`streams.${name}.get`, async (input) => {
+      tracer.streamOperation(name, 'get', input)
+      return stateStream.get(input.groupId, input.id)
     })
 
-    processManager
-      .spawn()
-      .then(() => {
-        processManager.handler<TraceError | undefined>('close', async (err) => {
-          processManager.kill()
+    registry.handler<StateStreamMutateInput>(`streams.${name}.set`, async (input) => {
+      tracer.streamOperation(name, 'set', { groupId: input.groupId, id: input.id, data: true })
+      return stateStream.set(input.groupId, input.id, input.data)
+    })
 
-          if (err) {
-            trackEvent('step_execution_error', {
-              stepName: step.config.name,
-              traceId,
-              message: err.message,
-            })
-          }
+    registry.handler<StateStreamGetInput>(`streams.${name}.delete`, async (input) => {
+      tracer.streamOperation(name, 'delete', input)
+      return stateStream.delete(input.groupId, input.id)
+    })
 
-          if (err) {
-            tracer.end({
-              message: err.message,
-              code: err.code,
-              stack: err.stack?.replace(new RegExp(`${motia.lockedData.baseDir}/`), ''),
-            })
-          } else {
-            tracer.end()
+    registry.handler<StateStreamGetInput>(`streams.${name}.getGroup`, async (input) => {
+      tracer.streamOperation(name, 'getGroup', input)
+      return stateStream.getGroup(input.groupId)
+    })
+  })
+}
+
+const callStepWorker = <TData>(
+  options: CallStepFileOptions,
+  motia: Motia,
+  pool: WorkerPool,
+): Promise<TData | undefined> => {
+  const { step, traceId, data, tracer, signal, contextInFirstArg = false } = options
+  const flows = step.config.flows
+  const streams = getStreamsInput(motia)
+  const deadline = getDeadline(step)
+
+  trackEvent('step_execution_started', {
+    stepName: step.config.name,
+    language: 'python',
+    type: step.config.type,
+    streams: streams.length,
+    worker: true,
+  })
+
+  return pool
+    .acquire()
+    .catch((error) => {
+      tracer.end({ message: error.message, code: error.code, stack: error.stack })
+      trackEvent('step_execution_error', {
+        stepName: step.config.name,
+        traceId,
+        code: error.code,
+        message: error.message,
+      })
+      throw `Failed to spawn process: ${error}`
+    })
+    .then(async (worker) => {
+      const invocationId = randomUUID()
+      let release = () => {}
+      let dispose = () => {}
+      let onExit: ((reason: string) => void) | undefined
+
+      // the worker goes back to the pool however the invocation ends, including when it never started
+      try {
+        const packed = await packPayload({ data, flows, traceId, contextInFirstArg, streams, deadline })
+        release = packed.release
+
+        return await new Promise<TData | undefined>((resolve, reject) => {
+          let result: TData | undefined
+
+          // a worker stuck in the handler is killed, its exit fails the invocation
+          dispose = watchInvocation(deadline, signal, {
+            cancel: () => worker.processManager.send({ type: 'cancel', invocationId }),
+            kill: () => worker.processManager.kill(),
+          })
+
+          onExit = (reason: string) => {
+            tracer.end({ message: reason })
+            trackEvent('step_execution_error', { stepName: step.config.name, traceId, message: reason })
+            reject(reason)
           }
-        })
-        processManager.handler<unknown>('log', async (input: unknown) => logger.log(input))
 
-        processManager.handler<StateGetInput, unknown>('state.get', async (input) => {
-          tracer.stateOperation('get', input)
-          return motia.state.get(input.traceId, input.key)
-        })
+          worker.exitHandlers.add(onExit)
 
-        processManager.handler<StateSetInput, unknown>('state.set', async (input) => {
-          tracer.stateOperation('set', { traceId: input.traceId, key: input.key, value: true })
-          return motia.state.set(input.traceId, input.key, input.value)
-        })
+          registerStepHandlers<TData>(worker.processManager.scoped(invocationId), options, motia, {
+            onResult: (input) => {
+              result = input
+            },
+            onClose: () => resolve(result),
+          })
 
-        processManager.handler<StateDeleteInput, unknown>('state.delete', async (input) => {
-          tracer.stateOperation('delete', input)
-          return motia.state.delete(input.traceId, input.key)
+          worker.processManager.send({ type: 'invoke', invocationId, args: packed.payload })
         })
+      } finally {
+        dispose()
+        release()
+        if (onExit) {
+          worker.exitHandlers.delete(onExit)
+        }
+        worker.processManager.removeScope(invocationId)
+        pool.release(worker)
+      }
+    })
+}
+
+const callStepZygote = async <TData>(
+  options: CallStepFileOptions,
+  motia: Motia,
+  zygote: Zygote,
+): Promise<TData | undefined> => {
+  const { step, traceId, data, tracer, signal, contextInFirstArg = false } = options
+  const flows = step.config.flows
+  const streams = getStreamsInput(motia)
+  const invocationId = randomUUID()
+  const deadline = getDeadline(step)
+
+  trackEvent('step_execution_started', {
+    stepName: step.config.name,
+    language: 'python',
+    type: step.config.type,
+    streams: streams.length,
+    zygote: true,
+  })
+
+  const { payload, release } = await packPayload({ data, flows, traceId, contextInFirstArg, streams, deadline })
+
+  return new Promise<TData | undefined>((resolve, reject) => {
+    let result: TData | undefined
+    let isClosed = false
+    let dispose = () => {}
+
+    // the socket closing after a failed init would report the invocation a second time
+    const fail = (message: string) => {
+      if (isClosed) {
+        return
+      }
+
+      isClosed = true
+      dispose()
+      release()
+      tracer.end({ message })
+      trackEvent('step_execution_error', { stepName: step.config.name, traceId, message })
+      reject(message)
+    }
 
-        processManager.handler<StateClearInput, void>('state.clear', async (input) => {
-          tracer.stateOperation('clear', input)
-          return motia.state.clear(input.traceId)
+    zygote
+      .fork(invocationId, payload)
+      .then((socket) => {
+        const processor = new RpcSocketProcessor(socket)
+
+        dispose = watchInvocation(deadline, signal, {
+          cancel: () => processor.send({ type: 'cancel' }),
+          kill: () => {
+            zygote.kill(invocationId)
+            socket.destroy()
+          },
         })
 
-        processManager.handler<StateStreamGetInput>(`state.getGroup`, (input) => {
-          tracer.stateOperation('getGroup', input)
-          return motia.state.getGroup(input.groupId)
+        registerStepHandlers<TData>(processor, options, motia, {
+          onResult: (input) => {
+            result = input
+          },
+          onClose: () => {
+            isClosed = true
+            dispose()
+            release()
+            resolve(result)
+          },
         })
 
-        processManager.handler<TData, void>('result', async (input) => {
-          result = input
+        // the child exits right after closing, anything else means it died mid-invocation
+        socket.on('close', () => {
+          processor.close()
+          if (!isClosed) {
+            fail('Process exited before completing the invocation')
+          }
         })
 
-        processManager.handler<Event, unknown>('emit', async (input) => {
-          const flows = step.config.flows
+        return processor.init()
+      })
+      .catch((error) => fail(`Failed to fork process: ${error.message ?? error}`))
+  })
+}
 
-          if (!isAllowedToEmit(step, input.topic)) {
-            tracer.emitOperation(input.topic, input.data, false)
-            return motia.printer.printInvalidEmit(step, input.topic)
-          }
+export const callStepFile = async <TData>(options: CallStepFileOptions, motia: Motia): Promise<TData | undefined> => {
+  const { step, traceId, data, tracer, logger, signal, contextInFirstArg = false } = options
 
-          tracer.emitOperation(input.topic, input.data, true)
-          return motia.eventManager.emit({ ...input, traceId, flows, logger, tracer }, step.filePath)
-        })
+  const flows = step.config.flows
+  const { runner, command, args, supportsWorkers } = getLanguageBasedRunner(step.filePath)
+  const workerConfig = supportsWorkers ? getWorkerConfig(step) : undefined
 
-        Object.entries(streamConfig).forEach(([name, streamFactory]) => {
-          const stateStream = streamFactory()
+  if (workerConfig) {
+    const pool = getWorkerPool(step.filePath, {
+      ...workerConfig,
+      command,
+      args: [
+        ...args,
+        runner,
+        '--worker',
+        step.filePath,
+        String(workerConfig.concurrency),
+        ...(workerConfig.preload.length > 0 ? ['--preload', workerConfig.preload.join(',')] : []),
+      ],
+      logger: globalLogger,
+    })
 
-          processManager.handler<StateStreamGetInput>(`streams.${name}.get`, async (input) => {
-            tracer.streamOperation(name, 'get', input)
-            return stateStream.get(input.groupId, input.id)
-          })
+    return callStepWorker<TData>(options, motia, pool)
+  }
 
-          processManager.handler<StateStreamMutateInput>(`streams.${name}.set`, async (input) => {
-            tracer.streamOperation(name, 'set', { groupId: input.groupId, id: input.id, data: true })
-            return stateStream.set(input.groupId, input.id, input.data)
-          })
+  const zygoteConfig = supportsWorkers ? getZygoteConfig(step) : undefined
 
-          processManager.handler<StateStreamGetInput>(`streams.${name}.delete`, async (input) => {
-            tracer.streamOperation(name, 'delete', input)
-            return stateStream.delete(input.groupId, input.id)
-          })
+  if (zygoteConfig) {
+    const preload = zygoteConfig.preload.length > 0 ? ['--preload', zygoteConfig.preload.join(',')] : []
+    const zygote = getZygote(step.filePath, {
+      command,
+      args: [...args, runner, '--zygote', step.filePath, ...preload],
+      logger: globalLogger,
+    })
 
-          processManager.handler<StateStreamGetInput>(`streams.${name}.getGroup`, async (input) => {
-            tracer.streamOperation(name, 'getGroup', input)
-            return stateStream.getGroup(input.groupId)
-          })
+    return callStepZygote<TData>(options, motia, zygote)
+  }
+
+  const streams = getStreamsInput(motia)
+
+  const deadline = getDeadline(step)
+  // lets the runner report how long the interpreter took to start
+  const input = { data, flows, traceId, contextInFirstArg, streams, deadline, spawnedAt: Date.now() }
+
+  // large Python inputs go through a payload file, keeping the argument below the OS limits
+  const { json: jsonData, release } =
+    command === 'python' ? await packPayload(input) : { json: JSON.stringify(input), release: () => {} }
+
+  return new Promise((resolve, reject) => {
+    let result: TData | undefined
+
+    const processManager = new ProcessManager({
+      command,
+      args: [...args, runner, step.filePath, jsonData],
+      logger,
+      context: 'StepExecution',
+    })
+
+    trackEvent('step_execution_started', {
+      stepName: step.config.name,
+      language: command,
+      type: step.config.type,
+      streams: streams.length,
+    })
+
+    processManager
+      .spawn()
+      .then(() => {
+        let killReason: string | undefined
+
+        const dispose = watchInvocation(deadline, signal, {
+          cancel: () => processManager.send({ type: 'cancel' }),
+          kill: (reason) => {
+            killReason = reason
+            processManager.kill()
+          },
+        })
+
+        registerStepHandlers<TData>(processManager, options, motia, {
+          onResult: (input) => {
+            result = input
+          },
+          onClose: () => processManager.kill(),
         })
 
         processManager.onStdout((data) => {
@@ -185,9 +597,15 @@ export const callStepFile = <TData>(options: CallStepFileOptions, motia: Motia):
         processManager.onStderr((data) => logger.error(Buffer.from(data).toString()))
 
         processManager.onProcessClose((code) => {
+          dispose()
+          release()
           processManager.close()
 
-          if (code !== 0 && code !== null) {
+          if (killReason) {
+            tracer.end({ message: killReason })
+            trackEvent('step_execution_error', { stepName: step.config.name, traceId, message: killReason })
+            reject(killReason)
+          } else if (code !== 0 && code !== null) {
             const error = { message: `Process exited with code ${code}`, code }
             tracer.end(error)
             trackEvent('step_execution_error', { stepName: step.config.name, traceId, code })
@@ -199,6 +617,8 @@ export const callStepFile = <TData>(options: CallStepFileOptions, motia: Motia):
         })
 
         processManager.onProcessError((error) => {
+          dispose()
+          release()
           processManager.close()
           tracer.end({
             message: error.message,
@@ -220,6 +640,7 @@ export const callStepFile = <TData>(options: CallStepFileOptions, motia: Motia):
         })
       })
       .catch((error) => {
+        release()
         tracer.end({
           message: error.message,
           code: error.code,
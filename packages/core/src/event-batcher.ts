@@ -0,0 +1,69 @@
+export type EventBatcherOptions<T> = {
+  /**
+   * Items that trigger a flush as soon as they are pending
+   */
+  maxSize: number
+  /**
+   * Time in milliseconds the first pending item waits before the batch is flushed
+   */
+  maxWaitMs: number
+  onFlush: (items: T[]) => Promise<void>
+}
+
+/**
+ * Collects items and hands them over in batches, once `maxSize` items are pending or
+ * `maxWaitMs` elapsed since the first one arrived, whichever comes first.
+ */
+export class EventBatcher<T> {
+  private items: T[] = []
+  private timer?: NodeJS.Timeout
+  private delivered?: Promise<void>
+  private resolveDelivered?: () => void
+
+  constructor(private readonly options: EventBatcherOptions<T>) {}
+
+  /**
+   * Adds an item, resolves once the batch it ended up in was delivered
+   */
+  add(item: T): Promise<void> {
+    this.items.push(item)
+
+    if (!this.delivered) {
+      this.delivered = new Promise((resolve) => (this.resolveDelivered = resolve))
+    }
+
+    const delivered = this.delivered
+
+    if (this.items.length >= this.options.maxSize) {
+      this.flush()
+    } else if (!this.timer) {
+      this.timer = setTimeout(() => this.flush(), this.options.maxWaitMs)
+    }
+
+    return delivered
+  }
+
+  /**
+   * Delivers the pending items right away
+   */
+  async flush(): Promise<void> {
+    clearTimeout(this.timer)
+    this.timer = undefined
+
+    const items = this.items
+    const resolveDelivered = this.resolveDelivered
+    this.items = []
+    this.delivered = undefined
+    this.resolveDelivered = undefined
+
+    if (items.length === 0) {
+      return
+    }
+
+    try {
+      await this.options.onFlush(items)
+    } finally {
+      resolveDelivered?.()
+    }
+  }
+}
@@ -34,15 +34,31 @@ const getLanguageBasedRunner = (
   throw Error(`Unsupported file extension ${stepFilePath}`)
 }
 
-const getConfig = <T>(file: string): Promise<T | null> => {
+/**
+ * Python configs are cached on disk, keyed by the step file and the project modules it imports
+ */
+const pythonConfigCache = () => path.join(process.cwd(), '.motia', 'cache', 'python-config.json')
+
+const getRunnerArgs = (file: string, files: string[]): { command: string; args: string[] } => {
   const { runner, command, args } = getLanguageBasedRunner(file)
 
+  if (command === 'python') {
+    const batch = files.length > 1 ? ['--batch'] : []
+    return { command, args: [...args, runner, '--cache', pythonConfigCache(), ...batch, ...files] }
+  }
+
+  return { command, args: [...args, runner, ...files] }
+}
+
+const getConfig = <T>(file: string, files: string[] = [file]): Promise<T | null> => {
+  const { command, args } = getRunnerArgs(file, files)
+
   return new Promise((resolve, reject) => {
     let config: T | null = null
 
     const processManager = new ProcessManager({
       command,
-      args: [...args, runner, file],
+      args,
       logger: globalLogger,
       context: 'Config',
     })
@@ -86,10 +102,44 @@ const getConfig = <T>(file: string): Promise<T | null> => {
   })
 }
 
+type BatchConfigResult<T> = { results: Record<string, { config?: T; error?: string }> }
+
+/**
+ * Reads the config of many files, Python files are all read by a single interpreter
+ */
+const getConfigs = async <T>(files: string[]): Promise<Record<string, T | null>> => {
+  const configs: Record<string, T | null> = {}
+  const pythonFiles = files.filter((file) => file.endsWith('.py'))
+  const isBatch = pythonFiles.length > 1
+
+  if (isBatch) {
+    const { results } = (await getConfig<BatchConfigResult<T>>(pythonFiles[0], pythonFiles)) as BatchConfigResult<T>
+
+    Object.entries(results).forEach(([file, { config, error }]) => {
+      if (error) {
+        throw `Failed to read config of ${file}: ${error}`
+      }
+      configs[file] = config ?? null
+    })
+  }
+
+  for (const file of files) {
+    if (!isBatch || !file.endsWith('.py')) {
+      configs[file] = await getConfig<T>(file)
+    }
+  }
+
+  return configs
+}
+
 export const getStepConfig = (file: string): Promise<StepConfig | null> => {
   return getConfig<StepConfig>(file)
 }
 
+export const getStepConfigs = (files: string[]): Promise<Record<string, StepConfig | null>> => {
+  return getConfigs<StepConfig>(files)
+}
+
 export const getStreamConfig = (file: string): Promise<StreamConfig | null> => {
   return getConfig<StreamConfig>(file)
 }
@@ -1,6 +1,6 @@
 import { Logger } from '../logger'
 import { Step } from '../types'
-import { StateOperation, StreamOperation, TraceError } from './types'
+import { StateOperation, StepTimings, StreamOperation, TraceError } from './types'
 
 export interface TracerFactory {
   createTracer(traceId: string, step: Step, logger: Logger): Promise<Tracer> | Tracer
@@ -11,5 +11,6 @@ export interface Tracer {
   stateOperation(operation: StateOperation, input: unknown): void
   emitOperation(topic: string, data: unknown, success: boolean): void
   streamOperation(streamName: string, operation: StreamOperation, input: unknown): void
+  timings(timings: StepTimings): void
   child(step: Step, logger: Logger): Tracer
 }
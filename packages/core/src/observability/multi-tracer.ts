@@ -0,0 +1,35 @@
+import { Tracer } from '.'
+import { Logger } from '../logger'
+import { Step } from '../types'
+import { StateOperation, StepTimings, StreamOperation, TraceError } from './types'
+
+/**
+ * Records the same invocation in several traces, e.g. a batch in the trace of each event
+ */
+export class MultiTracer implements Tracer {
+  constructor(private readonly tracers: Tracer[]) {}
+
+  end(err?: TraceError) {
+    this.tracers.forEach((tracer) => tracer.end(err))
+  }
+
+  stateOperation(operation: StateOperation, input: unknown) {
+    this.tracers.forEach((tracer) => tracer.stateOperation(operation, input))
+  }
+
+  emitOperation(topic: string, data: unknown, success: boolean) {
+    this.tracers.forEach((tracer) => tracer.emitOperation(topic, data, success))
+  }
+
+  streamOperation(streamName: string, operation: StreamOperation, input: unknown) {
+    this.tracers.forEach((tracer) => tracer.streamOperation(streamName, operation, input))
+  }
+
+  timings(timings: StepTimings) {
+    this.tracers.forEach((tracer) => tracer.timings(timings))
+  }
+
+  child(step: Step, logger: Logger) {
+    return new MultiTracer(this.tracers.map((tracer) => tracer.child(step, logger)))
+  }
+}
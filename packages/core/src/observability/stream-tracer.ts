@@ -3,7 +3,7 @@ import { Logger } from '../logger'
 import { Step } from '../types'
 import { createTrace } from './create-trace'
 import { TraceManager } from './trace-manager'
-import { StateOperation, StreamOperation, Trace, TraceError, TraceEvent, TraceGroup } from './types'
+import { StateOperation, StepTimings, StreamOperation, Trace, TraceError, TraceEvent, TraceGroup } from './types'
 
 export class StreamTracer implements Tracer {
   constructor(
@@ -107,6 +107,17 @@ export class StreamTracer implements Tracer {
     })
   }
 
+  timings({ startedAt, phases, totals }: StepTimings) {
+    phases.forEach(({ name, start, duration }) => {
+      this.trace.events.push({ type: 'timing', timestamp: startedAt + start, name, duration })
+    })
+    Object.entries(totals).forEach(([name, duration]) => {
+      this.trace.events.push({ type: 'timing', timestamp: startedAt, name, duration, total: true })
+    })
+
+    this.manager.updateTrace()
+  }
+
   child(step: Step, logger: Logger) {
     const trace = createTrace(this.traceGroup, step)
     const manager = this.manager.child(trace)
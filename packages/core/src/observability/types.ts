@@ -34,7 +34,7 @@ export interface Trace {
   events: TraceEvent[]
 }
 
-export type TraceEvent = StateEvent | EmitEvent | StreamEvent | LogEntry
+export type TraceEvent = StateEvent | EmitEvent | StreamEvent | LogEntry | TimingEvent
 
 export type StateOperation = 'get' | 'getGroup' | 'set' | 'delete' | 'clear'
 export type StreamOperation = 'get' | 'getGroup' | 'set' | 'delete' | 'clear' | 'send'
@@ -74,3 +74,23 @@ export interface LogEntry {
   message: string
   metadata?: unknown
 }
+
+export interface TimingEvent {
+  type: 'timing'
+  timestamp: number
+  name: string
+  duration: number
+  /**
+   * Time added up over the whole invocation, e.g. waiting for RPC responses
+   */
+  total?: boolean
+}
+
+/**
+ * Where a step spent its time, as reported by the runner when it closes
+ */
+export type StepTimings = {
+  startedAt: number
+  phases: { name: string; start: number; duration: number }[]
+  totals: Record<string, number>
+}
@@ -1,14 +1,37 @@
 import { SpawnOptions } from 'child_process'
+import { supportedCodecs } from './framing'
 
-export type CommunicationType = 'rpc' | 'ipc'
+export type CommunicationType = 'rpc' | 'ipc' | 'framed'
 
 export interface CommunicationConfig {
   type: CommunicationType
   spawnOptions: SpawnOptions
 }
 
+/**
+ * File descriptor of the pipe used by the 'framed' communication type
+ */
+export const FRAMED_CHANNEL_FD = 3
+
 export function createCommunicationConfig(command: string): CommunicationConfig {
-  const type = command === 'python' && process.platform === 'win32' ? 'rpc' : 'ipc'
+  const isPython = command === 'python'
+
+  // length-prefixed binary frames are opt-in for Python through MOTIA_PYTHON_CHANNEL=framed
+  if (isPython && process.platform !== 'win32' && process.env.MOTIA_PYTHON_CHANNEL === 'framed') {
+    return {
+      type: 'framed',
+      spawnOptions: {
+        stdio: ['inherit', 'inherit', 'inherit', 'pipe'],
+        env: {
+          ...process.env,
+          MOTIA_CHANNEL_FD: String(FRAMED_CHANNEL_FD),
+          MOTIA_CHANNEL_CODECS: supportedCodecs().join(','),
+        },
+      },
+    }
+  }
+
+  const type = isPython && process.platform === 'win32' ? 'rpc' : 'ipc'
 
   const spawnOptions: SpawnOptions = {
     stdio:
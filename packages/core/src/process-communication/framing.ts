@@ -0,0 +1,129 @@
+/**
+ * Length-prefixed frames used by the 'framed' communication type.
+ *
+ * Every frame is a 4 byte big-endian length followed by a one byte codec tag and the
+ * payload. JSON is always available, MessagePack is used when `@msgpack/msgpack` is installed.
+ */
+
+export type Codec = 'json' | 'msgpack'
+
+type MsgpackModule = {
+  encode(value: unknown): Uint8Array
+  decode(buffer: Uint8Array): unknown
+}
+
+const HEADER_SIZE = 4
+// payloads above MOTIA_PAYLOAD_THRESHOLD travel through files, a larger length means a corrupt stream
+const MAX_FRAME_SIZE = 256 * 1024 * 1024
+const CODEC_TAGS: Record<Codec, number> = { json: 0, msgpack: 1 }
+
+const loadMsgpack = (): MsgpackModule | undefined => {
+  try {
+    // eslint-disable-next-line @typescript-eslint/no-require-imports
+    return require('@msgpack/msgpack')
+  } catch {
+    return undefined
+  }
+}
+
+const msgpack = loadMsgpack()
+
+export const supportedCodecs = (): Codec[] => (msgpack ? ['json', 'msgpack'] : ['json'])
+
+export const encodeFrame = (message: unknown, codec: Codec): Buffer => {
+  const useMsgpack = codec === 'msgpack' && msgpack
+  const payload = useMsgpack ? Buffer.from(msgpack.encode(message)) : Buffer.from(JSON.stringify(message))
+  const header = Buffer.alloc(HEADER_SIZE + 1)
+
+  header.writeUInt32BE(payload.length + 1, 0)
+  header.writeUInt8(useMsgpack ? CODEC_TAGS.msgpack : CODEC_TAGS.json, HEADER_SIZE)
+
+  return Buffer.concat([header, payload])
+}
+
+export type DecodedFrame = { codec: Codec; message: unknown }
+
+export class FrameDecoder {
+  private chunks: Buffer[] = []
+  private length = 0
+  private frameSize?: number
+
+  constructor(private readonly maxFrameSize = MAX_FRAME_SIZE) {}
+
+  /**
+   * Hands every frame completed by the chunk to `onFrame`, in order. Frames that cannot
+   * be decoded are skipped and reported once the others were delivered. Throws on a length
+   * no frame can have, after the frames before it, dropping everything buffered so far
+   * since the stream cannot be resynchronized.
+   */
+  push(chunk: Buffer, onFrame: (frame: DecodedFrame) => void): void {
+    let error: unknown
+
+    this.chunks.push(chunk)
+    this.length += chunk.length
+
+    while (true) {
+      if (this.frameSize === undefined) {
+        if (this.length < HEADER_SIZE) {
+          break
+        }
+        const frameSize = this.take(HEADER_SIZE).readUInt32BE(0)
+
+        if (frameSize < 1 || frameSize > this.maxFrameSize) {
+          this.chunks = []
+          this.length = 0
+          throw new Error(`Invalid frame size ${frameSize}, the limit is ${this.maxFrameSize} bytes`)
+        }
+        this.frameSize = frameSize
+      }
+
+      if (this.length < this.frameSize) {
+        break
+      }
+
+      const frame = this.take(this.frameSize)
+      this.frameSize = undefined
+
+      let decoded: DecodedFrame
+      try {
+        decoded = this.decode(frame)
+      } catch (decodeError) {
+        // the frame was read whole, the ones after it are still in sync
+        error = error ?? decodeError
+        continue
+      }
+      onFrame(decoded)
+    }
+
+    if (error) {
+      throw error
+    }
+  }
+
+  private decode(frame: Buffer): DecodedFrame {
+    const payload = frame.subarray(1)
+
+    if (frame[0] === CODEC_TAGS.msgpack) {
+      if (!msgpack) {
+        throw new Error('Received a MessagePack frame but @msgpack/msgpack is not installed')
+      }
+      return { codec: 'msgpack', message: msgpack.decode(payload) }
+    }
+
+    return { codec: 'json', message: JSON.parse(payload.toString('utf-8')) }
+  }
+
+  /**
+   * Chunks are only joined once enough bytes for the next header or frame arrived,
+   * so large frames are copied once instead of on every chunk.
+   */
+  private take(size: number): Buffer {
+    const buffer = this.chunks.length === 1 ? this.chunks[0] : Buffer.concat(this.chunks, this.length)
+    const rest = buffer.subarray(size)
+
+    this.chunks = rest.length > 0 ? [rest] : []
+    this.length = rest.length
+
+    return buffer.subarray(0, size)
+  }
+}
@@ -0,0 +1,144 @@
+import { randomUUID } from 'crypto'
+import fs from 'fs'
+import os from 'os'
+import path from 'path'
+
+/**
+ * Payloads above the threshold are written to a file in shared memory (/dev/shm when
+ * available) and only a handle is passed to the child process, see python/motia_payload.py
+ */
+export const PAYLOAD_KEY = '__motia_payload__'
+
+const DEFAULT_THRESHOLD = 64 * 1024
+
+export type PayloadHandle = { [PAYLOAD_KEY]: { path: string; size: number } }
+
+export type PackedPayload<T> = {
+  /**
+   * The value itself, or a handle to the payload file
+   */
+  payload: T | PayloadHandle
+  /**
+   * JSON of the payload, only encoded when read
+   */
+  json: string
+  /**
+   * Removes the payload file if the child process did not consume it
+   */
+  release: () => void
+}
+
+const payloadThreshold = (): number => {
+  return process.env.MOTIA_PAYLOAD_THRESHOLD ? parseInt(process.env.MOTIA_PAYLOAD_THRESHOLD) : DEFAULT_THRESHOLD
+}
+
+const payloadDir = (): string => {
+  if (process.env.MOTIA_PAYLOAD_DIR) {
+    return process.env.MOTIA_PAYLOAD_DIR
+  }
+  return fs.existsSync('/dev/shm') ? '/dev/shm' : os.tmpdir()
+}
+
+export const isPayloadHandle = (value: unknown): value is PayloadHandle => {
+  return !!value && typeof value === 'object' && Object.keys(value).length === 1 && PAYLOAD_KEY in value
+}
+
+/**
+ * Size in bytes of the JSON of a value, counted without encoding it. Counting stops once
+ * the size is above `limit`, and escaped characters count as one.
+ */
+export const jsonSize = (value: unknown, limit = Infinity): number => {
+  const pending: unknown[] = [value]
+  let size = 0
+
+  while (pending.length > 0 && size <= limit) {
+    let item = pending.pop()
+
+    if (item !== null && typeof (item as { toJSON?: unknown })?.toJSON === 'function') {
+      item = (item as { toJSON: () => unknown }).toJSON()
+    }
+
+    if (typeof item === 'string') {
+      size += Buffer.byteLength(item) + 2
+    } else if (typeof item === 'number') {
+      size += Number.isFinite(item) ? String(item).length : 4
+    } else if (typeof item === 'boolean') {
+      size += item ? 4 : 5
+    } else if (item === null) {
+      size += 4
+    } else if (Array.isArray(item)) {
+      size += 2 + Math.max(item.length - 1, 0)
+      for (const element of item) {
+        // undefined and functions are encoded as null in arrays
+        pending.push(element === undefined || typeof element === 'function' ? null : element)
+      }
+    } else if (typeof item === 'object') {
+      let entries = 0
+      for (const [key, entry] of Object.entries(item)) {
+        if (entry !== undefined && typeof entry !== 'function' && typeof entry !== 'symbol') {
+          size += Buffer.byteLength(key) + 3
+          entries++
+          pending.push(entry)
+        }
+      }
+      size += 2 + Math.max(entries - 1, 0)
+    }
+  }
+
+  return size
+}
+
+/**
+ * Moves values whose JSON is above the threshold to a payload file. Smaller values are only
+ * sized, so they are encoded once, by the channel sending them.
+ */
+export const packPayload = async <T>(value: T): Promise<PackedPayload<T>> => {
+  const threshold = payloadThreshold()
+
+  if (jsonSize(value, threshold) <= threshold) {
+    let json: string | undefined
+    return {
+      payload: value,
+      get json() {
+        json = json ?? JSON.stringify(value)
+        return json
+      },
+      release: () => {},
+    }
+  }
+
+  const json = JSON.stringify(value)
+  const size = Buffer.byteLength(json)
+  const filePath = path.join(payloadDir(), `motia-${randomUUID()}.json`)
+  await fs.promises.writeFile(filePath, json)
+
+  const handle: PayloadHandle = { [PAYLOAD_KEY]: { path: filePath, size } }
+
+  return {
+    payload: handle,
+    json: JSON.stringify(handle),
+    release: () => fs.promises.rm(filePath, { force: true }).catch(() => {}),
+  }
+}
+
+/**
+ * Reads and removes the payload file a handle points to, other values are returned as is
+ */
+export const unpackPayload = async <T>(value: T | PayloadHandle): Promise<T> => {
+  if (!isPayloadHandle(value)) {
+    return value
+  }
+
+  const filePath = value[PAYLOAD_KEY].path
+
+  // handles are only trusted when they point to a payload file
+  if (path.dirname(filePath) !== payloadDir() || !path.basename(filePath).startsWith('motia-')) {
+    throw new Error(`Invalid payload file ${filePath}`)
+  }
+
+  try {
+    return JSON.parse(await fs.promises.readFile(filePath, 'utf-8'))
+  } finally {
+    await fs.promises.rm(filePath, { force: true })
+  }
+}
@@ -2,7 +2,8 @@ import { spawn, ChildProcess } from 'child_process'
 import { createCommunicationConfig, CommunicationType } from './communication-config'
 import { RpcProcessor } from '../step-handler-rpc-processor'
 import { RpcStdinProcessor } from '../step-handler-rpc-stdin-processor'
-import { RpcProcessorInterface, RpcHandler, MessageCallback } from './rpc-processor-interface'
+import { RpcFramedProcessor } from '../step-handler-rpc-framed-processor'
+import { RpcProcessorInterface, RpcHandler, RpcHandlerRegistry, MessageCallback } from './rpc-processor-interface'
 import { Logger } from '../logger'
 
 export interface ProcessManagerOptions {
@@ -36,7 +37,12 @@ export class ProcessManager {
     this.child = spawn(command, args, commConfig.spawnOptions)
 
     // Create appropriate processor based on communication type
-    this.processor = this.communicationType === 'rpc' ? new RpcStdinProcessor(this.child) : new RpcProcessor(this.child)
+    this.processor =
+      this.communicationType === 'rpc'
+        ? new RpcStdinProcessor(this.child)
+        : this.communicationType === 'framed'
+          ? new RpcFramedProcessor(this.child)
+          : new RpcProcessor(this.child)
 
     // Initialize the processor
     await this.processor.init()
@@ -44,11 +50,25 @@ export class ProcessManager {
     return this.child
   }
 
-  handler<TInput, TOutput = unknown>(method: string, handler: RpcHandler<TInput, TOutput>): void {
+  handler<TInput, TOutput = unknown>(method: string, handler: RpcHandler<TInput, TOutput>, scope?: string): void {
     if (!this.processor) {
       throw new Error('Process not spawned yet. Call spawn() first.')
     }
-    this.processor.handler(method, handler)
+    this.processor.handler(method, handler, scope)
+  }
+
+  /**
+   * Registry of handlers that only serve requests tagged with the given invocation id
+   */
+  scoped(scope: string): RpcHandlerRegistry {
+    return {
+      handler: <TInput, TOutput = unknown>(method: string, handler: RpcHandler<TInput, TOutput>) =>
+        this.handler(method, handler, scope),
+    }
+  }
+
+  removeScope(scope: string): void {
+    this.processor?.removeScope(scope)
   }
 
   onMessage<T = unknown>(callback: MessageCallback<T>): void {
@@ -58,6 +78,13 @@ export class ProcessManager {
     this.processor.onMessage(callback)
   }
 
+  send(message: unknown): void {
+    if (!this.processor) {
+      throw new Error('Process not spawned yet. Call spawn() first.')
+    }
+    this.processor.send(message)
+  }
+
   onProcessClose(callback: (code: number | null) => void): void {
     if (!this.child) {
       throw new Error('Process not spawned yet. Call spawn() first.')
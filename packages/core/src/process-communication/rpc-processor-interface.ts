@@ -1,10 +1,19 @@
 export type RpcHandler<TInput, TOutput> = (input: TInput) => Promise<TOutput>
 export type MessageCallback<T = unknown> = (message: T) => void
 
-export interface RpcProcessorInterface {
+export interface RpcHandlerRegistry {
   handler<TInput, TOutput = unknown>(method: string, handler: RpcHandler<TInput, TOutput>): void
-  handle(method: string, input: unknown): Promise<unknown>
+}
+
+export interface RpcProcessorInterface {
+  /**
+   * Handlers registered with a scope only receive requests tagged with that invocation id
+   */
+  handler<TInput, TOutput = unknown>(method: string, handler: RpcHandler<TInput, TOutput>, scope?: string): void
+  handle(method: string, input: unknown, scope?: string): Promise<unknown>
+  removeScope(scope: string): void
   onMessage<T = unknown>(callback: MessageCallback<T>): void
+  send(message: unknown): void
   init(): Promise<void>
   close(): void
 }
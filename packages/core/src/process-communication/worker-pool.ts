@@ -0,0 +1,167 @@
+import { Logger } from '../logger'
+import { ProcessManager } from './process-manager'
+
+export type WorkerPoolOptions = {
+  command: string
+  args: string[]
+  logger: Logger
+  poolSize: number
+  concurrency: number
+  maxRequests: number
+  idleTimeoutMs: number
+}
+
+export type Worker = {
+  processManager: ProcessManager
+  ready: boolean
+  active: number
+  requests: number
+  idleTimer?: NodeJS.Timeout
+  /**
+   * Called for every in-flight invocation when the worker process dies
+   */
+  exitHandlers: Set<(reason: string) => void>
+}
+
+type Waiter = {
+  resolve: (worker: Worker) => void
+  reject: (error: unknown) => void
+}
+
+export class WorkerPool {
+  private workers: Worker[] = []
+  private waiters: Waiter[] = []
+  private isClosed = false
+
+  constructor(private readonly options: WorkerPoolOptions) {}
+
+  /**
+   * Resolves with a worker that has a free invocation slot. When every worker
+   * is at its concurrency limit the caller waits until a slot is released.
+   */
+  acquire(): Promise<Worker> {
+    return new Promise((resolve, reject) => {
+      if (this.isClosed) {
+        return reject(new Error('Worker pool is closed'))
+      }
+
+      this.waiters.push({ resolve, reject })
+      this.dispatch()
+    })
+  }
+
+  release(worker: Worker): void {
+    worker.active--
+
+    if (worker.active === 0) {
+      if (worker.requests >= this.options.maxRequests) {
+        this.retire(worker)
+      } else {
+        worker.idleTimer = setTimeout(() => this.retire(worker), this.options.idleTimeoutMs)
+        worker.idleTimer.unref()
+      }
+    }
+
+    this.dispatch()
+  }
+
+  close(): void {
+    this.isClosed = true
+    this.waiters.splice(0).forEach((waiter) => waiter.reject(new Error('Worker pool is closed')))
+    this.workers.slice().forEach((worker) => this.retire(worker))
+  }
+
+  private checkout(worker: Worker): Worker {
+    clearTimeout(worker.idleTimer)
+    worker.active++
+    worker.requests++
+    return worker
+  }
+
+  private isAvailable(worker: Worker): boolean {
+    return worker.ready && worker.active < this.options.concurrency && worker.requests < this.options.maxRequests
+  }
+
+  private dispatch(): void {
+    while (this.waiters.length > 0) {
+      const available = this.workers.filter((worker) => this.isAvailable(worker))
+      const idle = available.find((worker) => worker.active === 0)
+
+      if (idle || (available.length > 0 && this.workers.length >= this.options.poolSize)) {
+        // prefer idle workers, then the least loaded one
+        const worker = idle ?? available.reduce((a, b) => (b.active < a.active ? b : a))
+        this.waiters.shift()?.resolve(this.checkout(worker))
+      } else if (this.workers.length < this.options.poolSize) {
+        const waiter = this.waiters.shift() as Waiter
+        this.spawn().then((worker) => {
+          waiter.resolve(worker)
+          this.dispatch()
+        }, waiter.reject)
+      } else {
+        return
+      }
+    }
+  }
+
+  private async spawn(): Promise<Worker> {
+    const { command, args, logger } = this.options
+    const processManager = new ProcessManager({ command, args, logger, context: 'StepWorker' })
+    const worker: Worker = { processManager, ready: false, active: 1, requests: 1, exitHandlers: new Set() }
+
+    // registered before spawning so concurrent acquires respect the pool size
+    this.workers.push(worker)
+
+    try {
+      await processManager.spawn()
+    } catch (error) {
+      this.remove(worker)
+      throw error
+    }
+
+    const onExit = (reason: string) => {
+      this.remove(worker)
+      processManager.close()
+      worker.exitHandlers.forEach((handler) => handler(reason))
+      worker.exitHandlers.clear()
+      this.dispatch()
+    }
+
+    processManager.onProcessClose((code) => onExit(`Process exited with code ${code}`))
+    processManager.onProcessError((error) =>
+      onExit(error.code === 'ENOENT' ? `Executable ${command} not found` : error.message),
+    )
+
+    worker.ready = true
+
+    return worker
+  }
+
+  private retire(worker: Worker): void {
+    clearTimeout(worker.idleTimer)
+    this.remove(worker)
+    worker.processManager.kill()
+  }
+
+  private remove(worker: Worker): void {
+    this.workers = this.workers.filter((w) => w !== worker)
+  }
+}
+
+const pools: Record<string, WorkerPool> = {}
+
+export const getWorkerPool = (key: string, options: WorkerPoolOptions): WorkerPool => {
+  if (!pools[key]) {
+    pools[key] = new WorkerPool(options)
+  }
+
+  return pools[key]
+}
+
+export const closeWorkerPool = (key: string): void => {
+  pools[key]?.close()
+  delete pools[key]
+}
+
+export const closeWorkerPools = (): void => {
+  Object.keys(pools).forEach(closeWorkerPool)
+}
@@ -0,0 +1,159 @@
+import fs from 'fs'
+import net from 'net'
+import os from 'os'
+import path from 'path'
+import { Logger } from '../logger'
+import { ProcessManager } from './process-manager'
+
+export type ZygoteOptions = {
+  command: string
+  args: string[]
+  logger: Logger
+}
+
+type ChildExitInput = { invocationId: string; code: number | null }
+
+/**
+ * A long-lived Python process that has already imported the runtime and the step,
+ * forking a child per invocation. Each child connects back to a socket created for
+ * its invocation, so invocations stay isolated without paying interpreter startup.
+ */
+export class Zygote {
+  private processManager?: ProcessManager
+  private starting?: Promise<ProcessManager>
+  private socketDir?: string
+  /**
+   * Forks whose child did not connect yet, failed when the child or the zygote exits
+   */
+  private pendingForks = new Map<string, (code: number | null) => void>()
+  private forks = 0
+  private isClosed = false
+
+  constructor(private readonly options: ZygoteOptions) {}
+
+  /**
+   * Asks the zygote for a child serving the invocation and resolves with its socket,
+   * rejects when the child exits before connecting
+   */
+  async fork(invocationId: string, args: unknown): Promise<net.Socket> {
+    const processManager = await this.start()
+    const socketPath = path.join(this.socketDir as string, `${++this.forks}.sock`)
+    const server = net.createServer()
+
+    await new Promise<void>((resolve, reject) => {
+      server.once('error', reject)
+      server.listen(socketPath, resolve)
+    })
+
+    try {
+      return await new Promise<net.Socket>((resolve, reject) => {
+        this.pendingForks.set(invocationId, (code) => reject(new Error(`Process exited with code ${code}`)))
+
+        server.once('connection', (socket) => {
+          this.pendingForks.delete(invocationId)
+          resolve(socket)
+        })
+
+        processManager.send({ type: 'fork', invocationId, socketPath, args })
+      })
+    } finally {
+      this.pendingForks.delete(invocationId)
+      server.close()
+      fs.rm(socketPath, { force: true }, () => {})
+    }
+  }
+
+  /**
+   * Kills the child serving the invocation, for one that does not react to its cancellation
+   */
+  kill(invocationId: string): void {
+    this.processManager?.send({ type: 'kill', invocationId })
+  }
+
+  close(): void {
+    this.isClosed = true
+    this.processManager?.kill()
+    this.processManager = undefined
+    this.starting = undefined
+
+    if (this.socketDir) {
+      fs.rmSync(this.socketDir, { recursive: true, force: true })
+      this.socketDir = undefined
+    }
+  }
+
+  private start(): Promise<ProcessManager> {
+    if (this.isClosed) {
+      return Promise.reject(new Error('Zygote is closed'))
+    }
+
+    if (!this.starting) {
+      this.starting = this.spawn().catch((error) => {
+        this.starting = undefined
+        throw error
+      })
+    }
+
+    return this.starting
+  }
+
+  private async spawn(): Promise<ProcessManager> {
+    const { command, args, logger } = this.options
+    const processManager = new ProcessManager({ command, args, logger, context: 'StepZygote' })
+
+    // private directory, so no other user can connect to the sockets first
+    this.socketDir = this.socketDir ?? fs.mkdtempSync(path.join(os.tmpdir(), 'motia-'))
+
+    await processManager.spawn()
+
+    processManager.handler<ChildExitInput, void>('child_exit', async ({ invocationId, code }) => {
+      this.pendingForks.get(invocationId)?.(code)
+    })
+
+    // a process failing to spawn or to be killed emits both 'error' and 'close'
+    let hasExited = false
+
+    const onExit = (code: number | null) => {
+      if (hasExited) {
+        return
+      }
+
+      hasExited = true
+      processManager.close()
+
+      if (this.processManager === processManager) {
+        this.processManager = undefined
+        this.starting = undefined
+      }
+
+      // connected children keep running on their own, only pending forks fail
+      Array.from(this.pendingForks.values()).forEach((fail) => fail(code))
+    }
+
+    processManager.onProcessClose(onExit)
+    processManager.onProcessError(() => onExit(null))
+
+    this.processManager = processManager
+
+    return processManager
+  }
+}
+
+const zygotes: Record<string, Zygote> = {}
+
+export const getZygote = (key: string, options: ZygoteOptions): Zygote => {
+  if (!zygotes[key]) {
+    zygotes[key] = new Zygote(options)
+  }
+
+  return zygotes[key]
+}
+
+export const closeZygote = (key: string): void => {
+  zygotes[key]?.close()
+  delete zygotes[key]
+}
+
+export const closeZygotes = (): void => {
+  Object.keys(zygotes).forEach(closeZygote)
+}
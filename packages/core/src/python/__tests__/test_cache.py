@@ -0,0 +1,155 @@
+import asyncio
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from motia_cache import INDEX_KEY, cache_middleware
+
+class State:
+    def __init__(self):
+        self.items = {}
+
+    async def get(self, scope, key):
+        value = self.items.get((scope, key))
+        # dicts come back wrapped, like from the state manager
+        return {"data": value} if isinstance(value, dict) else value
+
+    async def set(self, scope, key, value):
+        self.items[(scope, key)] = value
+
+    async def delete(self, scope, key):
+        return self.items.pop((scope, key), None)
+
+class Context:
+    def __init__(self):
+        self.state = State()
+
+def request(headers=None, **query):
+    return {"pathParams": {"id": "1"}, "queryParams": query, "headers": headers or {}, "body": None}
+
+class CacheMiddlewareTests(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.calls = 0
+        self.context = Context()
+
+    async def handler(self, status=200, delay=0.01):
+        self.calls += 1
+        await asyncio.sleep(delay)
+        return {"status": status, "body": {"call": self.calls}}
+
+    def test_requires_a_namespace(self):
+        with self.assertRaises(ValueError):
+            cache_middleware("")
+
+    async def test_serves_cached_responses(self):
+        middleware = cache_middleware("GET /orders/:id")
+
+        first = await middleware(request(), self.context, self.handler)
+        second = await middleware(request(), self.context, self.handler)
+
+        self.assertEqual(self.calls, 1)
+        self.assertEqual(second["body"], first["body"])
+        self.assertIn("ETag", second["headers"])
+
+    async def test_not_modified(self):
+        middleware = cache_middleware("GET /orders/:id")
+        etag = (await middleware(request(), self.context, self.handler))["headers"]["ETag"]
+
+        response = await middleware(request({"If-None-Match": etag}), self.context, self.handler)
+
+        self.assertEqual(response["status"], 304)
+        self.assertIsNone(response["body"])
+
+    async def test_keys_on_selected_headers_and_query_params(self):
+        middleware = cache_middleware("GET /orders/:id", headers=["Accept"], query_params=["q"])
+
+        await middleware(request(q="a", page="1"), self.context, self.handler)
+        await middleware(request(q="a", page="2"), self.context, self.handler)
+        await middleware(request({"accept": "text/csv"}, q="a"), self.context, self.handler)
+        await middleware(request(q="b"), self.context, self.handler)
+
+        self.assertEqual(self.calls, 3)
+
+    async def test_skips_uncacheable_responses(self):
+        middleware = cache_middleware("GET /orders/:id")
+
+        await middleware(request(), self.context, lambda: self.handler(status=500))
+        await middleware(request(), self.context, lambda: self.handler(status=500))
+        await middleware(request({"cache-control": "no-cache"}), self.context, self.handler)
+
+        self.assertEqual(self.calls, 3)
+
+    async def test_shares_entries_through_state(self):
+        middleware = cache_middleware("GET /orders/:id", state_scope="cache")
+        await middleware(request(), self.context, self.handler)
+        middleware.cache.clear()
+
+        response = await middleware(request(), self.context, self.handler)
+
+        self.assertEqual(self.calls, 1)
+        self.assertEqual(response["body"], {"call": 1})
+
+    async def test_prunes_entries_in_state(self):
+        middleware = cache_middleware("GET /orders/:id", max_entries=2, state_scope="cache")
+
+        for page in range(3):
+            await middleware(request(page=str(page)), self.context, self.handler)
+
+        keys = [key for scope, key in self.context.state.items if key != INDEX_KEY]
+        self.assertEqual(len(keys), 2)
+        self.assertEqual([name for name, _ in self.context.state.items[("cache", INDEX_KEY)]], keys)
+
+    async def test_prunes_expired_entries_in_state(self):
+        middleware = cache_middleware("GET /orders/:id", state_scope="cache")
+        await middleware(request(page="1"), self.context, self.handler)
+        self.context.state.items[("cache", INDEX_KEY)][0][1] = 0
+
+        await middleware(request(page="2"), self.context, self.handler)
+
+        self.assertEqual(len(self.context.state.items), 2)
+
+    async def test_responses_do_not_share_headers(self):
+        middleware = cache_middleware("GET /orders/:id")
+        (await middleware(request(), self.context, self.handler))["headers"]["X-Request"] = "1"
+
+        response = await middleware(request(), self.context, self.handler)
+
+        self.assertNotIn("X-Request", response["headers"])
+
+    async def test_coalesces_concurrent_misses(self):
+        middleware = cache_middleware("GET /orders/:id")
+
+        responses = await asyncio.gather(*[middleware(request(), self.context, self.handler) for _ in range(5)])
+
+        self.assertEqual(self.calls, 1)
+        self.assertEqual({response["body"]["call"] for response in responses}, {1})
+
+    async def test_waiters_run_their_own_handler_when_the_miss_is_cancelled(self):
+        middleware = cache_middleware("GET /orders/:id")
+        first = asyncio.create_task(middleware(request(), self.context, lambda: self.handler(delay=1)))
+        await asyncio.sleep(0)
+        waiter = asyncio.create_task(middleware(request(), self.context, self.handler))
+        await asyncio.sleep(0)
+
+        first.cancel()
+        response = await waiter
+
+        self.assertTrue(first.cancelled())
+        self.assertEqual(response["body"], {"call": 2})
+
+    async def test_cancelled_waiters_leave_the_miss_running(self):
+        middleware = cache_middleware("GET /orders/:id")
+        first = asyncio.create_task(middleware(request(), self.context, self.handler))
+        await asyncio.sleep(0)
+        waiter = asyncio.create_task(middleware(request(), self.context, self.handler))
+        await asyncio.sleep(0)
+
+        waiter.cancel()
+
+        self.assertEqual((await first)["body"], {"call": 1})
+        self.assertEqual(self.calls, 1)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,71 @@
+import os
+import pickle
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from motia_dot_dict import DictView, DotDict, ListView, unwrap
+
+class DictViewTests(unittest.TestCase):
+    def test_reads_and_writes_through(self):
+        target = {"user": {"name": "Ada"}, "tags": ["a"]}
+        view = DictView(target)
+
+        view.user.name = "Grace"
+        view.tags.append("b")
+        view.extra = DictView({"x": 1})
+
+        self.assertEqual(target, {"user": {"name": "Grace"}, "tags": ["a", "b"], "extra": {"x": 1}})
+        self.assertIs(unwrap(view), target)
+
+    def test_missing_attributes(self):
+        with self.assertRaises(AttributeError):
+            DictView({}).missing
+
+    def test_pickles_as_a_view(self):
+        view = pickle.loads(pickle.dumps(DictView({"a": {"b": 1}})))
+
+        self.assertEqual(view.a.b, 1)
+
+class ListViewTests(unittest.TestCase):
+    def test_negative_indexes(self):
+        view = ListView([{"n": 1}, {"n": 2}])
+
+        self.assertEqual(view[-1].n, 2)
+        self.assertIs(view[-2], view[0])
+        with self.assertRaises(IndexError):
+            view[-3]
+        with self.assertRaises(IndexError):
+            view[2]
+
+    def test_slices_are_shallow_copies(self):
+        target = [{"n": 1}, {"n": 2}, {"n": 3}]
+        view = ListView(target)
+
+        sliced = view[1:]
+        sliced.append({"n": 4})
+        sliced[0].n = 20
+
+        self.assertEqual([item["n"] for item in target], [1, 20, 3])
+        self.assertEqual(sliced, [{"n": 20}, {"n": 3}, {"n": 4}])
+
+    def test_replaced_items_get_a_new_view(self):
+        view = ListView([{"n": 1}])
+        first = view[0]
+
+        view[0] = {"n": 2}
+
+        self.assertEqual(view[0].n, 2)
+        self.assertIsNot(view[0], first)
+
+class DotDictTests(unittest.TestCase):
+    def test_nested_values_are_views(self):
+        data = DotDict({"order": {"lines": [{"sku": "a"}]}})
+
+        data.order.lines[0].sku = "b"
+
+        self.assertEqual(data["order"]["lines"][0]["sku"], "b")
+
+if __name__ == "__main__":
+    unittest.main()
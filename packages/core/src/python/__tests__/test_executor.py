@@ -0,0 +1,70 @@
+import asyncio
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from motia_dot_dict import DictView
+from motia_executor import LoopProxy
+from motia_rpc_state_manager import RpcStateManager
+from test_state_manager import FakeRpc
+
+class Streams:
+    def __init__(self):
+        self.items = {"todo": {}}
+
+    async def set(self, group_id, item_id, data):
+        self.items[group_id][item_id] = data
+        return data
+
+class Context:
+    def __init__(self, state):
+        self.state = state
+        self.streams = DictView({"todo": Streams()})
+
+class LoopProxyTests(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.rpc = FakeRpc()
+        self.context = Context(RpcStateManager(self.rpc))
+
+    def proxy(self, is_async):
+        return LoopProxy(self.context, asyncio.get_running_loop(), is_async)
+
+    async def test_sync_handler_item_access(self):
+        context = self.proxy(is_async=False)
+
+        def handler():
+            return context.streams["todo"].set("todo", "1", {"done": True})
+
+        self.assertEqual(await asyncio.to_thread(handler), {"done": True})
+        self.assertEqual(self.context.streams["todo"].items, {"todo": {"1": {"done": True}}})
+
+    async def test_sync_handler_state_batch(self):
+        context = self.proxy(is_async=False)
+
+        def handler():
+            context.state.set("t", "k", 1)
+            with context.state.batch() as batch:
+                value = batch.get("t", "k")
+                batch.set("t", "other", 2)
+            return value.result()
+
+        self.assertEqual(await asyncio.to_thread(handler), 1)
+        self.assertEqual(self.rpc.data, {("t", "k"): 1, ("t", "other"): 2})
+        self.assertEqual(self.rpc.calls, ["state.set", "state.batch"])
+
+    async def test_async_handler_state_batch(self):
+        context = self.proxy(is_async=True)
+
+        async def handler():
+            await context.state.set("t", "k", 1)
+            async with context.state.batch() as batch:
+                value = batch.get("t", "k")
+            return await value
+
+        self.assertEqual(await asyncio.to_thread(asyncio.run, handler()), 1)
+        self.assertEqual(self.rpc.calls, ["state.set", "state.batch"])
+
+if __name__ == "__main__":
+    unittest.main()
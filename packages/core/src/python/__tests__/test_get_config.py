@@ -0,0 +1,49 @@
+import importlib.util
+import json
+import os
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+PYTHON_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+spec = importlib.util.spec_from_file_location("get_config", os.path.join(PYTHON_DIR, "get-config.py"))
+get_config = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(get_config)
+
+class RunBatchTests(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.cache_path = os.path.join(self.dir, ".motia", "config-cache.json")
+
+    def write(self, name, source):
+        path = os.path.join(self.dir, name)
+        with open(path, "w") as file:
+            file.write(source)
+        return path
+
+    def run_batch(self, paths):
+        read_fd, write_fd = os.pipe()
+        try:
+            with mock.patch.dict(os.environ, {"MOTIA_CHANNEL_FD": str(write_fd)}):
+                get_config.run_batch(paths, self.cache_path)
+            frame = os.read(read_fd, 1 << 20)
+        finally:
+            os.close(read_fd)
+            os.close(write_fd)
+        return json.loads(frame[5:])["results"]
+
+    def test_reports_configs_that_cannot_be_serialized_per_file(self):
+        valid = self.write("valid_step.py", 'config = {"type": "event", "name": "valid"}\n')
+        invalid = self.write("invalid_step.py", 'import datetime\nconfig = {"name": "invalid", "at": datetime.date.today()}\n')
+
+        results = self.run_batch([valid, invalid])
+
+        self.assertEqual(results[valid], {"config": {"type": "event", "name": "valid"}})
+        self.assertIn("not JSON serializable", results[invalid]["error"])
+        with open(self.cache_path) as file:
+            self.assertEqual(list(json.load(file)["entries"]), [valid])
+
+if __name__ == "__main__":
+    unittest.main()
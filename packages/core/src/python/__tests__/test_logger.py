@@ -0,0 +1,50 @@
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from motia_logger import Logger
+from motia_serializer import loads
+
+class Rpc:
+    def __init__(self):
+        self.sent = []
+
+    def send_no_wait(self, method, args):
+        self.sent.append((method, args))
+
+class LoggerTests(unittest.TestCase):
+    def setUp(self):
+        self.rpc = Rpc()
+        self.logger = Logger("trace", ["flow"], self.rpc)
+
+    def entries(self):
+        self.logger.flush()
+        return [entry for method, batch in self.rpc.sent if method == "log.batch" for entry in loads(batch.data)]
+
+    def test_snapshots_args_when_logged(self):
+        order = {"items": [1], "status": "new"}
+        self.logger.info("order", order)
+        order["items"].append(2)
+        order["status"] = "paid"
+
+        [entry] = self.entries()
+
+        self.assertEqual(entry["items"], [1])
+        self.assertEqual(entry["status"], "new")
+
+    def test_wraps_values_that_are_not_dicts(self):
+        self.logger.warn("count", 3)
+
+        [entry] = self.entries()
+
+        self.assertEqual((entry["level"], entry["msg"], entry["data"]), ("warn", "count", 3))
+
+    def test_skips_levels_below_log_level(self):
+        self.logger.debug("hidden", {"a": 1})
+
+        self.assertEqual(self.entries(), [])
+
+if __name__ == "__main__":
+    unittest.main()
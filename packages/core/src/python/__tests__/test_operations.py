@@ -0,0 +1,56 @@
+import asyncio
+import contextlib
+import io
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from motia_operations import PendingOperations
+
+async def fail(delay=0):
+    await asyncio.sleep(delay)
+    raise RuntimeError("state is down")
+
+class PendingOperationsTests(unittest.IsolatedAsyncioTestCase):
+    async def wait(self, operations):
+        stderr = io.StringIO()
+        with contextlib.redirect_stderr(stderr):
+            await operations.wait()
+        return stderr.getvalue()
+
+    async def test_reports_failures_never_awaited(self):
+        operations = PendingOperations()
+        operations.dispatch(fail())
+        operations.dispatch(fail(0.01))
+
+        self.assertEqual((await self.wait(operations)).count("state is down"), 2)
+
+    async def test_does_not_report_awaited_failures(self):
+        operations = PendingOperations()
+
+        with self.assertRaises(RuntimeError):
+            await operations.dispatch(fail())
+        with self.assertRaises(RuntimeError):
+            await asyncio.gather(operations.dispatch(fail()))
+        with self.assertRaises(RuntimeError):
+            await asyncio.wait_for(operations.dispatch(fail()), 1)
+
+        self.assertEqual(await self.wait(operations), "")
+
+    async def test_waits_for_operations_started_meanwhile(self):
+        operations = PendingOperations()
+        done = []
+
+        async def chained():
+            await asyncio.sleep(0)
+            operations.dispatch(asyncio.sleep(0.01)).add_done_callback(lambda _: done.append(True))
+
+        operations.dispatch(chained())
+        await operations.wait()
+
+        self.assertEqual(done, [True])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,49 @@
+import os
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from motia_payload import PAYLOAD_KEY, is_payload_handle, load_payload, open_payload, pack_payload
+from motia_serializer import RawJson, dumps_message, loads
+
+class PayloadTests(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        patcher = mock.patch.dict(os.environ, {"MOTIA_PAYLOAD_DIR": self.dir, "MOTIA_PAYLOAD_THRESHOLD": "32"})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_small_values_are_encoded_once(self):
+        packed = pack_payload({"a": 1})
+
+        self.assertIsInstance(packed, RawJson)
+        message = dumps_message({"type": "rpc_request", "method": "result", "args": packed})
+        self.assertEqual(loads(message), {"type": "rpc_request", "method": "result", "args": {"a": 1}})
+
+    def test_large_values_go_through_a_file(self):
+        value = {"text": "x" * 100}
+        handle = pack_payload(value)
+
+        self.assertTrue(is_payload_handle(handle))
+        self.assertEqual(load_payload(handle), value)
+        self.assertFalse(os.path.exists(handle[PAYLOAD_KEY]["path"]))
+
+    def test_file_is_removed_once_the_view_is_released(self):
+        handle = pack_payload({"text": "x" * 100})
+        path = handle[PAYLOAD_KEY]["path"]
+
+        with open_payload(handle) as view:
+            self.assertTrue(os.path.exists(path))
+            self.assertEqual(loads(view), {"text": "x" * 100})
+
+        self.assertFalse(os.path.exists(path))
+
+    def test_missing_files_raise(self):
+        with self.assertRaises(FileNotFoundError):
+            load_payload({PAYLOAD_KEY: {"path": os.path.join(self.dir, "missing.json"), "size": 1}})
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,60 @@
+import asyncio
+import importlib.util
+import os
+import sys
+import unittest
+from types import SimpleNamespace
+
+PYTHON_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PYTHON_DIR)
+
+from motia_rpc import RpcSender
+
+spec = importlib.util.spec_from_file_location("python_runner", os.path.join(PYTHON_DIR, "python-runner.py"))
+runner = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(runner)
+
+class FakeCommunication:
+    """Channel answering every request with None and recording the messages sent"""
+
+    def __init__(self):
+        self.sent = []
+
+    def send_no_wait(self, method, args, invocation_id=None):
+        self.sent.append((method, args))
+
+    async def send(self, method, args, invocation_id=None):
+        self.sent.append((method, args))
+
+BODY_SCHEMA = {"type": "object", "properties": {"name": {"type": "string"}}, "required": ["name"]}
+
+class InvokeHandlerTests(unittest.IsolatedAsyncioTestCase):
+    async def test_middleware_gets_the_plain_request(self):
+        seen = {}
+
+        async def middleware(req, context, next_fn):
+            seen["middleware"] = req.get("body")
+            return await next_fn()
+
+        async def handler(req, context):
+            seen["handler"] = req.body.name
+            return {"status": 200, "body": {}}
+
+        module = SimpleNamespace(
+            config={
+                "type": "api",
+                "name": "typed",
+                "typedInput": True,
+                "bodySchema": BODY_SCHEMA,
+                "middleware": [middleware],
+            },
+            handler=handler,
+        )
+        args = {"data": {"pathParams": {}, "queryParams": {}, "headers": {}, "body": {"name": "Ada"}}, "traceId": "t"}
+
+        await runner.invoke_handler(module, RpcSender(FakeCommunication()), args)
+
+        self.assertEqual(seen, {"middleware": {"name": "Ada"}, "handler": "Ada"})
+
+if __name__ == "__main__":
+    unittest.main()
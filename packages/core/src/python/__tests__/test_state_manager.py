@@ -0,0 +1,99 @@
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from motia_rpc_state_manager import RpcStateManager
+
+class FakeRpc:
+    """Answers state requests from a dict, like the Node.js state handlers"""
+
+    def __init__(self):
+        self.data = {}
+        self.calls = []
+
+    async def send(self, method, args):
+        self.calls.append(method)
+        if method == "state.batch":
+            return [{"result": self.run(operation["op"], operation)} for operation in args["operations"]]
+        return self.run(method.split(".")[1], args)
+
+    def run(self, op, args):
+        key = (args.get("traceId"), args.get("key"))
+        if op == "get":
+            return self.data.get(key)
+        if op == "set":
+            self.data[key] = args["value"]
+            return args["value"]
+        if op == "delete":
+            return self.data.pop(key, None)
+        if op == "clear":
+            self.data = {entry: value for entry, value in self.data.items() if entry[0] != args["traceId"]}
+
+class StateManagerBatchTests(unittest.IsolatedAsyncioTestCase):
+    async def test_single_reads_see_batch_writes(self):
+        state = RpcStateManager(FakeRpc(), cache=True)
+
+        await state.set("t", "k", 1)
+        await state.set_many("t", {"k": 2})
+        self.assertEqual(await state.get("t", "k"), 2)
+
+        await state.delete_many("t", ["k"])
+        self.assertEqual(await state.get("t", "k"), {"data": None})
+
+    async def test_batch_reads_are_served_from_the_cache(self):
+        rpc = FakeRpc()
+        rpc.data[("t", "a")] = 1
+        rpc.data[("t", "b")] = 2
+        state = RpcStateManager(rpc, cache=True)
+
+        await state.get("t", "a")
+        self.assertEqual(await state.get_many("t", ["a", "b"]), [1, 2])
+        self.assertEqual(await state.get("t", "b"), 2)
+        self.assertEqual(rpc.calls, ["state.get", "state.batch"])
+
+    async def test_batch_reads_see_deferred_writes(self):
+        rpc = FakeRpc()
+        state = RpcStateManager(rpc, defer_writes=True)
+
+        await state.set("t", "k", 1)
+        self.assertEqual(await state.get_many("t", ["k"]), [1])
+        self.assertEqual(rpc.calls, [])
+
+    async def test_batch_writes_are_deferred(self):
+        rpc = FakeRpc()
+        state = RpcStateManager(rpc, defer_writes=True)
+
+        await state.set_many("t", {"a": 1, "b": 2})
+        await state.delete_many("t", ["a"])
+        self.assertEqual(await state.get("t", "b"), 2)
+        self.assertEqual(rpc.calls, [])
+
+        await state.flush()
+        self.assertEqual(rpc.calls, ["state.batch"])
+        self.assertEqual(rpc.data, {("t", "b"): 2})
+
+    async def test_batch_context_mixes_cached_and_sent_operations(self):
+        rpc = FakeRpc()
+        rpc.data[("t", "remote")] = "value"
+        state = RpcStateManager(rpc, cache=True)
+        await state.set("t", "local", 1)
+
+        async with state.batch() as batch:
+            local = batch.get("t", "local")
+            remote = batch.get("t", "remote")
+
+        self.assertEqual(await local, 1)
+        self.assertEqual(await remote, "value")
+
+    async def test_batch_without_cache_sends_everything(self):
+        rpc = FakeRpc()
+        state = RpcStateManager(rpc)
+
+        await state.set("t", "k", 1)
+        self.assertEqual(await state.get_many("t", ["k"]), [1])
+        self.assertEqual(rpc.calls, ["state.set", "state.batch"])
+
+if __name__ == "__main__":
+    unittest.main()
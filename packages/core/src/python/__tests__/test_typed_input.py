@@ -0,0 +1,140 @@
+import json
+import os
+import sys
+import tempfile
+import unittest
+from types import SimpleNamespace
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from motia_payload import PAYLOAD_KEY
+from motia_serializer import dumps, loads
+from motia_typed_input import TYPED_DATA, InputDecoder, InputValidationError, input_decoder
+
+try:
+    import msgspec
+except ImportError:
+    msgspec = None
+
+SCHEMA = {
+    "type": "object",
+    "properties": {
+        "id": {"type": "string", "minLength": 1},
+        "count": {"type": "integer", "minimum": 0},
+        "first-name": {"type": "string"},
+        "tags": {"type": "array", "items": {"type": "string"}},
+        "kind": {"enum": ["a", "b"]},
+        "items": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "properties": {"sku": {"type": "string"}, "qty": {"type": "integer"}},
+                "required": ["sku"],
+            },
+        },
+    },
+    "required": ["id", "count"],
+}
+
+class CompilerTests:
+    """Shared by both compilers, they must decode and encode the same way"""
+
+    def decoder(self, schema=SCHEMA, **options):
+        return InputDecoder(schema, "order placed", **options)
+
+    def test_converts_valid_input(self):
+        data = self.decoder().convert({"id": "x", "count": 2, "first-name": "Ada", "items": [{"sku": "s", "qty": 1}]})
+
+        self.assertEqual(data.id, "x")
+        self.assertEqual(data.count, 2)
+        self.assertEqual(data.first_name, "Ada")
+        self.assertEqual(data.items[0].sku, "s")
+        self.assertIsNone(data.tags)
+
+    def test_rejects_invalid_input(self):
+        decoder = self.decoder()
+        invalid = [
+            {"count": 1},
+            {"id": "", "count": 1},
+            {"id": "x", "count": -1},
+            {"id": "x", "count": True},
+            {"id": "x", "count": 1, "kind": "c"},
+            {"id": "x", "count": 1, "items": [{"qty": 1}]},
+        ]
+
+        for value in invalid:
+            with self.subTest(value=value):
+                with self.assertRaises(InputValidationError):
+                    decoder.convert(value)
+
+    def test_encodes_back_to_the_input(self):
+        value = {"id": "x", "count": 1, "first-name": "Ada", "items": [{"sku": "s"}]}
+
+        self.assertEqual(loads(dumps(self.decoder().convert(value))), value)
+
+    def test_optional_properties_before_required_ones(self):
+        schema = {"type": "object", "properties": {"note": {"type": "string"}, "id": {"type": "string"}}, "required": ["id"]}
+        data = self.decoder(schema).convert({"id": "x"})
+
+        self.assertEqual((data.id, data.note), ("x", None))
+        self.assertEqual(loads(dumps(data)), {"id": "x"})
+
+    def test_batch_decodes_a_list(self):
+        data = self.decoder(batch=True).convert([{"id": "x", "count": 1}, {"id": "y", "count": 2}])
+
+        self.assertEqual([item.id for item in data], ["x", "y"])
+        with self.assertRaises(InputValidationError):
+            self.decoder(batch=True).convert({"id": "x", "count": 1})
+
+    def test_api_request_body(self):
+        request = self.decoder(api=True).convert({"pathParams": {"id": "1"}, "headers": {}, "body": {"id": "x", "count": 1}})
+
+        self.assertEqual(request.pathParams, {"id": "1"})
+        self.assertEqual(request.body.count, 1)
+
+    def test_load_args_from_payload_file(self):
+        args = {"data": {"id": "x", "count": 1}, "traceId": "trace", "flows": ["flow"]}
+        with tempfile.NamedTemporaryFile("w", suffix=".json", delete=False) as file:
+            json.dump(args, file)
+
+        loaded = self.decoder().load_args({PAYLOAD_KEY: {"path": file.name, "size": os.path.getsize(file.name)}})
+
+        self.assertFalse(os.path.exists(file.name))
+        self.assertEqual(loaded["traceId"], "trace")
+        self.assertEqual(loaded["data"].id, "x")
+        self.assertTrue(loaded[TYPED_DATA])
+
+@unittest.skipIf(msgspec is None, "msgspec is not installed")
+class MsgspecCompilerTests(CompilerTests, unittest.TestCase):
+    def test_uses_msgspec_structs(self):
+        self.assertIsInstance(self.decoder().convert({"id": "x", "count": 1}), msgspec.Struct)
+
+class DataclassCompilerTests(CompilerTests, unittest.TestCase):
+    def setUp(self):
+        # InputDecoder falls back to dataclasses when msgspec cannot be imported
+        patcher = mock.patch.dict(sys.modules, {"msgspec": None})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_uses_dataclasses(self):
+        data = self.decoder().convert({"id": "x", "count": 1})
+
+        self.assertFalse(hasattr(data, "__struct_fields__"))
+        self.assertTrue(hasattr(type(data), "__dataclass_fields__"))
+
+class InputDecoderTests(unittest.TestCase):
+    def test_only_for_steps_using_typed_input(self):
+        self.assertIsNone(input_decoder(SimpleNamespace(config={"name": "plain"})))
+
+    def test_batch_steps_get_a_list_decoder(self):
+        decoder = input_decoder(SimpleNamespace(config={"typedInput": True, "input": SCHEMA, "batch": {"maxSize": 10}}))
+
+        self.assertTrue(decoder.batch)
+
+    def test_rejects_the_process_executor(self):
+        with self.assertRaises(ValueError):
+            input_decoder(SimpleNamespace(config={"typedInput": True, "input": SCHEMA, "executor": "process"}))
+
+if __name__ == "__main__":
+    unittest.main()
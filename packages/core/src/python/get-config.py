@@ -1,14 +1,26 @@
 import sys
+import ast
 import json
+import hashlib
 import importlib.util
 import os
 import platform
+from typing import Any, Dict, List, Optional, Tuple
+
+CACHE_VERSION = 1
 
 def sendMessage(text):
     'sends a Node IPC message to parent proccess'
     # encode message as json string + newline in bytes
     bytesMessage = (json.dumps(text) + "\n").encode('utf-8')
-    
+
+    # Framed channel: 4 byte big-endian length, JSON codec tag, payload
+    if "MOTIA_CHANNEL_FD" in os.environ:
+        payload = json.dumps(text).encode('utf-8')
+        frame = (len(payload) + 1).to_bytes(4, 'big') + bytes([0]) + payload
+        os.write(int(os.environ["MOTIA_CHANNEL_FD"]), frame)
+        return
+
     # Handle Windows differently
     if platform.system() == 'Windows':
         # On Windows, write to stdout
@@ -19,21 +31,63 @@ def sendMessage(text):
         NODEIPCFD = int(os.environ["NODE_CHANNEL_FD"])
         os.write(NODEIPCFD, bytesMessage)
 
-async def run_python_module(file_path: str) -> None:
+def static_config(source: str) -> Optional[Dict[str, Any]]:
+    """Read a literal `config = {...}` without running the module.
+
+    Returns None when the config is not a literal or the module touches it anywhere
+    else at the top level, in which case the module has to be imported.
+    """
+    tree = ast.parse(source)
+    value = None
+
+    for statement in tree.body:
+        if isinstance(statement, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+            continue
+
+        targets = []
+        if isinstance(statement, ast.Assign):
+            targets = statement.targets
+        elif isinstance(statement, ast.AnnAssign):
+            targets = [statement.target]
+
+        if value is None and len(targets) == 1 and isinstance(targets[0], ast.Name) and targets[0].id == "config":
+            value = statement.value
+            continue
+
+        if any(isinstance(node, ast.Name) and node.id == "config" for node in ast.walk(statement)):
+            return None
+
+    if value is None:
+        return None
+
     try:
-        module_dir = os.path.dirname(os.path.abspath(file_path))
-        
-        if module_dir not in sys.path:
-            sys.path.insert(0, module_dir)
-            
-        flows_dir = os.path.dirname(module_dir)
-        if flows_dir not in sys.path:
-            sys.path.insert(0, flows_dir)
+        config = ast.literal_eval(value)
+    except (ValueError, TypeError, SyntaxError, MemoryError, RecursionError):
+        return None
+
+    return config if isinstance(config, dict) else None
+
+def import_config(file_path: str) -> Tuple[Dict[str, Any], Dict[str, int]]:
+    """Import the module to read its config, returns it with the project files it imported.
 
+    Project modules are unloaded afterwards so steps with same-named helpers do not
+    see each other's, third party packages stay loaded for the next step.
+    """
+    module_dir = os.path.dirname(os.path.abspath(file_path))
+    flows_dir = os.path.dirname(module_dir)
+    project_dir = os.getcwd()
+    sys_path = list(sys.path)
+    loaded = set(sys.modules)
+
+    for path in [module_dir, flows_dir]:
+        if path not in sys.path:
+            sys.path.insert(0, path)
+
+    try:
         spec = importlib.util.spec_from_file_location("dynamic_module", file_path)
         if spec is None or spec.loader is None:
             raise ImportError(f"Could not load module from {file_path}")
-            
+
         module = importlib.util.module_from_spec(spec)
         module.__package__ = os.path.basename(module_dir)
         spec.loader.exec_module(module)
@@ -41,20 +95,140 @@ async def run_python_module(file_path: str) -> None:
         if not hasattr(module, 'config'):
             raise AttributeError(f"No 'config' found in module {file_path}")
 
-        if 'middleware' in module.config:
-            del module.config['middleware']
+        config = dict(module.config)
+    finally:
+        sys.path[:] = sys_path
+        dependencies = {}
+
+        for name in set(sys.modules) - loaded:
+            module_file = getattr(sys.modules[name], "__file__", None) or ""
+            if module_file.startswith(project_dir) and "site-packages" not in module_file:
+                del sys.modules[name]
+                if os.path.exists(module_file):
+                    dependencies[module_file] = os.stat(module_file).st_mtime_ns
+
+    return config, dependencies
+
+def load_cache(cache_path: Optional[str]) -> Dict[str, Any]:
+    if cache_path:
+        try:
+            with open(cache_path) as file:
+                cache = json.load(file)
+            if cache.get("version") == CACHE_VERSION:
+                return cache["entries"]
+        except (OSError, ValueError, KeyError):
+            pass
+
+    return {}
+
+def save_cache(cache_path: Optional[str], entries: Dict[str, Any]) -> None:
+    if not cache_path:
+        return
+
+    try:
+        os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+        temp_path = f"{cache_path}.{os.getpid()}.tmp"
+        with open(temp_path, "w") as file:
+            json.dump({"version": CACHE_VERSION, "entries": entries}, file)
+        os.replace(temp_path, cache_path)
+    except (OSError, TypeError, ValueError) as error:
+        print('Could not write the config cache:', str(error), file=sys.stderr)
 
-        sendMessage(module.config)
+def dependencies_changed(dependencies: Dict[str, int]) -> bool:
+    for path, mtime in dependencies.items():
+        try:
+            if os.stat(path).st_mtime_ns != mtime:
+                return True
+        except OSError:
+            return True
+
+    return False
+
+def read_config(file_path: str, cache: Dict[str, Any]) -> Dict[str, Any]:
+    """Config of a step file, served from the cache while the file and its imports are unchanged"""
+    file_path = os.path.abspath(file_path)
+    stat = os.stat(file_path)
+    entry = cache.get(file_path)
+
+    if entry and entry["mtime"] == stat.st_mtime_ns and entry["size"] == stat.st_size:
+        if not dependencies_changed(entry["dependencies"]):
+            return entry["config"]
+
+    with open(file_path, "rb") as file:
+        content = file.read()
+    digest = hashlib.sha256(content).hexdigest()
+
+    if entry and entry["hash"] == digest and not dependencies_changed(entry["dependencies"]):
+        entry.update(mtime=stat.st_mtime_ns, size=stat.st_size)
+        return entry["config"]
+
+    config = static_config(content.decode("utf-8"))
+    dependencies: Dict[str, int] = {}
+
+    if config is None:
+        config, dependencies = import_config(file_path)
+
+    if 'middleware' in config:
+        del config['middleware']
+
+    # fails this file alone, rather than the message and the cache holding every config
+    try:
+        json.dumps(config)
+    except (TypeError, ValueError) as error:
+        raise ValueError(f"Config of {file_path} is not JSON serializable: {error}") from None
+
+    cache[file_path] = {
+        "mtime": stat.st_mtime_ns,
+        "size": stat.st_size,
+        "hash": digest,
+        "config": config,
+        "dependencies": dependencies,
+    }
+
+    return config
+
+def run_batch(file_paths: List[str], cache_path: Optional[str]) -> None:
+    """Read the config of every file in this interpreter and send them in one message"""
+    cache = load_cache(cache_path)
+    results: Dict[str, Any] = {}
+
+    for file_path in file_paths:
+        try:
+            results[file_path] = {"config": read_config(file_path, cache)}
+        except Exception as error:
+            results[file_path] = {"error": str(error)}
+
+    save_cache(cache_path, cache)
+    sendMessage({"results": results})
+
+def run_python_module(file_path: str, cache_path: Optional[str]) -> None:
+    try:
+        cache = load_cache(cache_path)
+        config = read_config(file_path, cache)
+        save_cache(cache_path, cache)
+
+        sendMessage(config)
 
     except Exception as error:
         print('Error running Python module:', str(error), file=sys.stderr)
         sys.exit(1)
 
 if __name__ == "__main__":
-    if len(sys.argv) < 2:
-        sys.exit(1)
+    args = sys.argv[1:]
+    cache_path = None
+    is_batch = False
 
-    file_path = sys.argv[1]
+    while args and args[0].startswith("--"):
+        option = args.pop(0)
+        if option == "--cache" and args:
+            cache_path = args.pop(0)
+        elif option == "--batch":
+            is_batch = True
 
-    import asyncio
-    asyncio.run(run_python_module(file_path))
\ No newline at end of file
+    if len(args) < 1:
+        sys.exit(1)
+
+    if is_batch:
+        run_batch(args, cache_path)
+    else:
+        run_python_module(args[0], cache_path)
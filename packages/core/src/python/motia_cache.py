@@ -0,0 +1,240 @@
+import asyncio
+import hashlib
+import re
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Iterable, Optional
+from motia_serializer import dumps
+
+# Status codes whose responses are cached unless `statuses` says otherwise
+DEFAULT_STATUSES = (200,)
+
+# State key, in the scope of the entries, listing the stored keys with their expiry
+INDEX_KEY = "__index__"
+
+def _header(headers: Optional[Dict[str, Any]], name: str) -> Optional[str]:
+    """Case-insensitive header lookup, the first value when a header was sent several times"""
+    if not headers:
+        return None
+
+    for key, value in headers.items():
+        if key.lower() == name:
+            return value[0] if isinstance(value, list) else value
+
+    return None
+
+def _directives(cache_control: Optional[str]) -> Dict[str, Optional[str]]:
+    directives: Dict[str, Optional[str]] = {}
+
+    for directive in (cache_control or "").split(","):
+        name, _, value = directive.strip().partition("=")
+        if name:
+            directives[name.lower()] = value.strip('"') or None
+
+    return directives
+
+def _etag(body: Any) -> str:
+    content = body if isinstance(body, bytes) else dumps(body)
+    return f'"{hashlib.blake2b(content, digest_size=16).hexdigest()}"'
+
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+
+    # weak comparison, as required for If-None-Match
+    tags = {re.sub(r"^W/", "", tag.strip()) for tag in if_none_match.split(",")}
+    return re.sub(r"^W/", "", etag) in tags
+
+class ResponseCache:
+    """In-process LRU of API responses with a TTL, optionally backed by motia state.
+
+    Entries are `{status, body, headers, etag, expiresAt}`, with `expiresAt` in wall clock
+    seconds so state-backed entries expire the same way in every process.
+    """
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry["expiresAt"] <= time.time():
+            del self._entries[key]
+            return None
+
+        self._entries.move_to_end(key)
+        return entry
+
+    def set(self, key: str, entry: Dict[str, Any]) -> None:
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+def cache_middleware(
+    namespace: str,
+    ttl: float = 60,
+    max_entries: int = 1024,
+    headers: Iterable[str] = (),
+    query_params: Optional[Iterable[str]] = None,
+    statuses: Iterable[int] = DEFAULT_STATUSES,
+    state_scope: Optional[str] = None,
+) -> Callable[[Dict[str, Any], Any, Callable[[], Awaitable[Any]]], Awaitable[Any]]:
+    """Cache the responses of an idempotent API step, for `config["middleware"]`.
+
+    The key is made of the `namespace`, the path params, the given request `headers` and
+    the query params, all of them or only the ones listed in `query_params`. The request
+    does not carry the method and path of the step, the namespace stands in for them,
+    e.g. "GET /orders/:id". Steps sharing a namespace share their entries.
+
+    Entries live for `ttl` seconds, or the `max-age` of the response's Cache-Control, in an
+    LRU of `max_entries` per process. With `state_scope`, they are also stored in motia
+    state under that scope, so every process, including single-shot ones, shares them.
+    The scope keeps at most `max_entries` as well, expired and oldest entries are deleted
+    when a new one is stored.
+
+    Responses get an ETag, and a request whose If-None-Match matches it gets a 304. A
+    request with `Cache-Control: no-cache` skips the lookup, and a response with `no-store`
+    or `private` is not cached. Concurrent misses of the same key run the handler once.
+    """
+    if not namespace:
+        raise ValueError("cache_middleware needs a namespace, e.g. the method and path of the step")
+
+    vary = tuple(sorted(header.lower() for header in headers))
+    params = None if query_params is None else tuple(sorted(query_params))
+    cacheable = frozenset(statuses)
+    entries = ResponseCache(max_entries)
+    in_flight: Dict[str, "asyncio.Future[Optional[Dict[str, Any]]]"] = {}
+
+    def cache_key(req: Dict[str, Any]) -> str:
+        # the cloud router passes the request with snake_case keys
+        path = req.get("pathParams", req.get("path_params")) or {}
+        query = req.get("queryParams", req.get("query_params")) or {}
+        request_headers = req.get("headers") or {}
+
+        key = [
+            namespace,
+            sorted(path.items()),
+            [_header(request_headers, name) for name in vary],
+            sorted((name, value) for name, value in query.items() if params is None or name in params),
+        ]
+        return hashlib.blake2b(dumps(key), digest_size=20).hexdigest()
+
+    async def load(context: Any, key: str) -> Optional[Dict[str, Any]]:
+        entry = entries.get(key)
+        if entry is not None or not state_scope:
+            return entry
+
+        stored = await context.state.get(state_scope, key)
+        # dicts come back wrapped in {"data": ...} from the state manager
+        if isinstance(stored, dict) and "expiresAt" not in stored:
+            stored = stored.get("data")
+        if not isinstance(stored, dict) or stored.get("expiresAt", 0) <= time.time():
+            return None
+
+        entries.set(key, stored)
+        return stored
+
+    async def store(context: Any, key: str, result: Any) -> Optional[Dict[str, Any]]:
+        if not isinstance(result, dict) or result.get("status") not in cacheable:
+            return None
+
+        response_headers = dict(result.get("headers") or {})
+        directives = _directives(_header(response_headers, "cache-control"))
+        if "no-store" in directives or "private" in directives:
+            return None
+
+        max_age = directives.get("s-maxage") or directives.get("max-age")
+        entry_ttl = int(max_age) if max_age and max_age.isdigit() else ttl
+        if entry_ttl <= 0:
+            return None
+
+        etag = _header(response_headers, "etag")
+        if etag is None:
+            etag = _etag(result.get("body"))
+            response_headers["ETag"] = etag
+
+        entry = {
+            "status": result["status"],
+            "body": result.get("body"),
+            "headers": response_headers,
+            "etag": etag,
+            "expiresAt": time.time() + entry_ttl,
+        }
+        entries.set(key, entry)
+        if state_scope:
+            await context.state.set(state_scope, key, entry)
+            await prune(context, key, entry["expiresAt"])
+
+        return entry
+
+    async def prune(context: Any, key: str, expires_at: float) -> None:
+        stored = await context.state.get(state_scope, INDEX_KEY)
+        if isinstance(stored, dict):
+            stored = stored.get("data")
+
+        now = time.time()
+        index = [[name, expiry] for name, expiry in stored or [] if name != key]
+        index.append([key, expires_at])
+
+        evicted = [name for name, expiry in index if expiry <= now]
+        index = [item for item in index if item[1] > now]
+        evicted.extend(name for name, _ in index[:-max_entries])
+        index = index[-max_entries:]
+
+        for name in evicted:
+            await context.state.delete(state_scope, name)
+        await context.state.set(state_scope, INDEX_KEY, index)
+
+    def respond(req: Dict[str, Any], entry: Dict[str, Any]) -> Dict[str, Any]:
+        if _etag_matches(_header(req.get("headers"), "if-none-match"), entry["etag"]):
+            return {"status": 304, "headers": dict(entry["headers"]), "body": None}
+
+        # a copy per response, the handler's response middleware may change its headers
+        return {"status": entry["status"], "headers": dict(entry["headers"]), "body": entry["body"]}
+
+    async def middleware(req: Dict[str, Any], context: Any, next_fn: Callable[[], Awaitable[Any]]) -> Any:
+        key = cache_key(req)
+        request_directives = _directives(_header(req.get("headers"), "cache-control"))
+
+        if "no-cache" not in request_directives:
+            entry = await load(context, key)
+            if entry is not None:
+                return respond(req, entry)
+
+        if "no-store" in request_directives:
+            return await next_fn()
+
+        pending = in_flight.get(key)
+        if pending is not None:
+            # shielded, a waiter going away must not cancel the future of the others
+            entry = await asyncio.shield(pending)
+            # only a cached response is shared, anything else is computed for this request
+            return respond(req, entry) if entry is not None else await next_fn()
+
+        # the miss runs in this invocation, under its deadline and its context, the
+        # concurrent requests for the same key wait for the entry it stores
+        pending = asyncio.get_running_loop().create_future()
+        in_flight[key] = pending
+        entry = None
+        try:
+            result = await next_fn()
+            entry = await store(context, key, result)
+        finally:
+            # also when failed or cancelled, the waiters then run their own handler
+            pending.set_result(entry)
+            if in_flight.get(key) is pending:
+                del in_flight[key]
+
+        return respond(req, entry) if entry is not None else result
+
+    middleware.cache = entries
+    return middleware
@@ -3,6 +3,7 @@ import platform
 from typing import Union
 from motia_rpc_communication import RpcCommunication
 from motia_ipc_communication import IpcCommunication
+from motia_framed_communication import FramedCommunication
 
 def create_communication() -> Union[RpcCommunication, IpcCommunication]:
     """
@@ -10,6 +11,7 @@ def create_communication() -> Union[RpcCommunication, IpcCommunication]:
     
     Logic:
     - Python + Windows = RPC (stdin/stdout)
+    - Other cases with MOTIA_CHANNEL_FD = framed binary channel
     - Other cases with NODE_CHANNEL_FD = IPC
     - Fallback = RPC
     """
@@ -19,10 +21,14 @@ def create_communication() -> Union[RpcCommunication, IpcCommunication]:
     
     # Check if IPC file descriptor is available
     has_ipc_fd = "NODE_CHANNEL_FD" in os.environ
+    has_framed_fd = "MOTIA_CHANNEL_FD" in os.environ
     
     if is_windows:
         # On Windows, always use RPC
         return RpcCommunication()
+    elif has_framed_fd:
+        # Binary framing was requested by Node.js through communication-config
+        return FramedCommunication()
     elif has_ipc_fd:
         # On Unix with IPC FD available, use IPC
         try:
@@ -1,9 +1,11 @@
-from typing import Any, List, Optional
+from typing import Any, Dict, List, Optional, Union
 from motia_type_definitions import HandlerResult
 from motia_rpc import RpcSender
 from motia_rpc_state_manager import RpcStateManager
 from motia_logger import Logger
-from motia_dot_dict import DotDict
+from motia_operations import PendingOperations
+from motia_response import ResponseStream
+from motia_dot_dict import DictView
 
 class Context:
     def __init__(
@@ -11,14 +13,30 @@ class Context:
         trace_id: str,
         flows: List[str],
         rpc: RpcSender,
-        streams: DotDict,
+        streams: DictView,
+        state_cache: Union[bool, Dict[str, Any], None] = None,
+        operations: Optional[PendingOperations] = None,
     ):
         self.trace_id = trace_id
         self.flows = flows
         self.rpc = rpc
-        self.state = RpcStateManager(rpc)
+        # time.time() by which the invocation has to complete, None when it is not bounded
+        self.deadline = rpc.deadline
+        # state and stream operations started by the handler, completed before it closes
+        self.operations = operations or PendingOperations()
+        self.state = RpcStateManager(
+            rpc,
+            cache=bool(state_cache),
+            defer_writes=isinstance(state_cache, dict) and bool(state_cache.get("deferWrites")),
+            operations=self.operations,
+        )
         self.streams = streams
         self.logger = Logger(self.trace_id, self.flows, rpc)
+        self.response = ResponseStream(rpc)
+
+    def time_remaining(self) -> Optional[float]:
+        """Seconds left before the deadline, None when the invocation is not bounded"""
+        return self.rpc.remaining()
 
     async def emit(self, event: Any) -> Optional[HandlerResult]:
         return await self.rpc.send('emit', event)
\ No newline at end of file
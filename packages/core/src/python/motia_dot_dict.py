@@ -1,8 +1,139 @@
+from collections.abc import MutableMapping, MutableSequence
+from typing import Any, Dict, Iterator, List
+
+def _view(views: Dict[Any, Any], key: Any, value: Any) -> Any:
+    """Cached view of a nested dict or list, rebuilt when the value itself was replaced"""
+    if not isinstance(value, (dict, list)) or isinstance(value, DotDict):
+        return value
+
+    view = views.get(key)
+    if view is None or view._target is not value:
+        view = views[key] = DictView(value) if isinstance(value, dict) else ListView(value)
+    return view
+
+def unwrap(value: Any) -> Any:
+    """The dict or list behind a view, anything else as it is"""
+    return value._target if isinstance(value, (DictView, ListView)) else value
+
+class DictView(MutableMapping):
+    """Attribute access over a dict, without copying it.
+
+    `view.a.b` reads `target["a"]["b"]`, and writes through the view change the dict
+    itself. Nested dicts and lists are returned as views as well, created once per key.
+    """
+
+    __slots__ = ("_target", "_views")
+
+    def __init__(self, target: Dict[str, Any]):
+        object.__setattr__(self, "_target", target)
+        object.__setattr__(self, "_views", {})
+
+    def __getattr__(self, key: str) -> Any:
+        try:
+            return _view(self._views, key, self._target[key])
+        except KeyError:
+            raise AttributeError(f"No such attribute: {key}")
+
+    def __setattr__(self, key: str, value: Any) -> None:
+        self._target[key] = unwrap(value)
+
+    def __delattr__(self, key: str) -> None:
+        try:
+            del self._target[key]
+        except KeyError:
+            raise AttributeError(f"No such attribute: {key}")
+
+    def __getitem__(self, key: str) -> Any:
+        return _view(self._views, key, self._target[key])
+
+    def __setitem__(self, key: str, value: Any) -> None:
+        self._target[key] = unwrap(value)
+
+    def __delitem__(self, key: str) -> None:
+        del self._target[key]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._target)
+
+    def __len__(self) -> int:
+        return len(self._target)
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._target
+
+    def __eq__(self, other: object) -> bool:
+        return self._target == unwrap(other)
+
+    def __repr__(self) -> str:
+        return f"DictView({self._target!r})"
+
+    def __reduce__(self):
+        return (DictView, (self._target,))
+
+    def to_dict(self) -> Dict[str, Any]:
+        return self._target
+
+class ListView(MutableSequence):
+    """List counterpart of DictView, items that are dicts or lists are returned as views"""
+
+    __slots__ = ("_target", "_views")
+
+    def __init__(self, target: List[Any]):
+        self._target = target
+        self._views: Dict[int, Any] = {}
+
+    def __getitem__(self, index: Any) -> Any:
+        # a slice is a view over a new list, like slicing a list it is a shallow copy:
+        # changing the slice leaves this list as it is, changing its items does not
+        if isinstance(index, slice):
+            return ListView(self._target[index])
+
+        item = self._target[index]
+        # views are cached by positive index, out of range indexes already raised above
+        if index < 0:
+            index += len(self._target)
+        return _view(self._views, index, item)
+
+    def __setitem__(self, index: Any, value: Any) -> None:
+        self._target[index] = [unwrap(item) for item in value] if isinstance(index, slice) else unwrap(value)
+
+    def __delitem__(self, index: Any) -> None:
+        del self._target[index]
+
+    def __len__(self) -> int:
+        return len(self._target)
+
+    def __iter__(self) -> Iterator[Any]:
+        for index, item in enumerate(self._target):
+            yield _view(self._views, index, item)
+
+    def insert(self, index: int, value: Any) -> None:
+        self._target.insert(index, unwrap(value))
+
+    def __eq__(self, other: object) -> bool:
+        return self._target == unwrap(other)
+
+    def __repr__(self) -> str:
+        return f"ListView({self._target!r})"
+
+    def __reduce__(self):
+        return (ListView, (self._target,))
+
+    def to_list(self) -> List[Any]:
+        return self._target
+
 class DotDict(dict):
+    """Dict with attribute access, nested dicts and lists are returned as views, not copies"""
+
+    __slots__ = ("_views",)
+
+    def __init__(self, *args: Any, **kwargs: Any):
+        super().__init__(*args, **kwargs)
+        object.__setattr__(self, "_views", {})
+
     def __getattr__(self, key):
         try:
-            value = self[key]
-            return DotDict(value) if isinstance(value, dict) else value
+            return _view(self._views, key, self[key])
         except KeyError:
             raise AttributeError(f"No such attribute: {key}")
 
@@ -13,4 +144,7 @@ class DotDict(dict):
         try:
             del self[key]
         except KeyError:
-            raise AttributeError(f"No such attribute: {key}")
\ No newline at end of file
+            raise AttributeError(f"No such attribute: {key}")
+
+    def __reduce__(self):
+        return (DotDict, (dict(self),))
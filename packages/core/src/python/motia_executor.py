@@ -0,0 +1,277 @@
+import asyncio
+import concurrent.futures
+import concurrent.futures.process
+import functools
+import inspect
+import multiprocessing
+import os
+import random
+import sys
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+# Values handed to the handler as they are, everything else is proxied
+_PLAIN_TYPES = (str, bytes, int, float, bool, type(None), list, tuple, dict)
+
+def _is_plain(value: Any) -> bool:
+    return isinstance(value, _PLAIN_TYPES)
+
+async def _call(fn: Callable, args: tuple, kwargs: Dict[str, Any]) -> Any:
+    result = fn(*args, **kwargs)
+    return await result if inspect.isawaitable(result) else result
+
+async def _call_on_loop(fn: Callable, args: tuple, kwargs: Dict[str, Any]) -> Any:
+    result = fn(*args, **kwargs)
+
+    # futures are handed back as they are, the ones of a state batch only resolve on commit
+    if isinstance(result, asyncio.Future) or not inspect.isawaitable(result):
+        return result
+
+    return await result
+
+async def _wait(future: asyncio.Future) -> Any:
+    return await future
+
+class LoopProxy:
+    """Context as seen from a handler running in a thread.
+
+    Every call is executed on the runner's event loop, where the RPC channel lives, and
+    its result is returned once available. Sync handlers get the plain value, async
+    handlers (running on their own loop in the thread) get an awaitable. Objects of the
+    loop, e.g. streams or a state batch, are handed out proxied too, and inside a batch
+    sync handlers get futures resolved once the batch is committed.
+    """
+
+    def __init__(self, target: Any, loop: asyncio.AbstractEventLoop, is_async: bool):
+        self._target = target
+        self._loop = loop
+        self._is_async = is_async
+        self._entered = False
+
+    def __getattr__(self, name: str) -> Any:
+        value = getattr(self._target, name)
+
+        if callable(value):
+            return functools.partial(self._invoke, value)
+
+        return self._wrap(value)
+
+    def __getitem__(self, key: Any) -> Any:
+        return self._wrap(self._target[key])
+
+    def __contains__(self, key: Any) -> bool:
+        return key in self._target
+
+    def __enter__(self) -> "LoopProxy":
+        self._invoke(self._target.__aenter__)
+        self._entered = True
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self._entered = False
+        self._invoke(self._target.__aexit__, exc_type, exc, tb)
+
+    async def __aenter__(self) -> "LoopProxy":
+        await self._invoke(self._target.__aenter__)
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        await self._invoke(self._target.__aexit__, exc_type, exc, tb)
+
+    def _wrap(self, value: Any) -> Any:
+        return value if _is_plain(value) else LoopProxy(value, self._loop, self._is_async)
+
+    def _invoke(self, fn: Callable, *args: Any, **kwargs: Any) -> Any:
+        future = asyncio.run_coroutine_threadsafe(_call_on_loop(fn, args, kwargs), self._loop)
+
+        if self._is_async and inspect.iscoroutinefunction(fn):
+            return self._resolve_async(future)
+
+        # plain functions run right away, e.g. batch operations must be queued in order
+        return self._wrap_result(future.result())
+
+    async def _resolve_async(self, future: "concurrent.futures.Future[Any]") -> Any:
+        return self._wrap_result(await asyncio.wrap_future(future))
+
+    def _wrap_result(self, result: Any) -> Any:
+        if not isinstance(result, asyncio.Future):
+            return self._wrap(result)
+
+        pending = asyncio.run_coroutine_threadsafe(_wait(result), self._loop)
+        if self._is_async:
+            return asyncio.wrap_future(pending)
+
+        return pending if self._entered else pending.result()
+
+class RemoteProxy:
+    """Context as seen from a handler running in a pool process.
+
+    Attribute access builds a path, calling it sends the path and the arguments to the
+    runner over a pipe and waits for the result. Logging does not wait for an answer.
+    """
+
+    def __init__(self, conn: Any, is_async: bool, path: Tuple[str, ...] = ()):
+        self._conn = conn
+        self._is_async = is_async
+        self._path = path
+
+    def __getattr__(self, name: str) -> "RemoteProxy":
+        return RemoteProxy(self._conn, self._is_async, self._path + (name,))
+
+    def __call__(self, *args: Any, **kwargs: Any) -> Any:
+        if self._path[0] == "logger":
+            self._conn.send(("notify", self._path, args, kwargs))
+            return None
+
+        if self._is_async:
+            return self._request_async(args, kwargs)
+
+        return self._request(args, kwargs)
+
+    async def _request_async(self, args: tuple, kwargs: Dict[str, Any]) -> Any:
+        return self._request(args, kwargs)
+
+    def _request(self, args: tuple, kwargs: Dict[str, Any]) -> Any:
+        self._conn.send(("call", self._path, args, kwargs))
+        status, value = self._conn.recv()
+
+        if status == "error":
+            raise RuntimeError(value)
+
+        return value
+
+class RemoteContext:
+    def __init__(self, trace_id: str, flows: List[str], deadline: Optional[float], conn: Any, is_async: bool):
+        self.trace_id = trace_id
+        self.flows = flows
+        self.deadline = deadline
+        self._conn = conn
+        self._is_async = is_async
+
+    def __getattr__(self, name: str) -> RemoteProxy:
+        return RemoteProxy(self._conn, self._is_async, (name,))
+
+def _run(handler: Callable, args: tuple) -> Any:
+    """Call the handler, running an async one on a new event loop of the calling thread"""
+    return asyncio.run(_call(handler, args, {})) if inspect.iscoroutinefunction(handler) else _resolve(handler(*args))
+
+def _resolve(result: Any) -> Any:
+    # a plain function may still return an awaitable, e.g. a wrapped async handler
+    if inspect.isawaitable(result):
+        return asyncio.run(_call(lambda: result, (), {}))
+
+    return result
+
+def _init_process() -> None:
+    # the pool forks from inside the runner's event loop, asyncio does not report a loop
+    # running in another process, the copy of the runner's loop is only dropped here
+    asyncio.set_event_loop(None)
+    random.seed()
+
+def _run_in_process(handler: Callable, data: Any, context_in_first_arg: bool, attributes: Tuple[str, List[str], Optional[float]], conn: Any) -> Any:
+    context = RemoteContext(*attributes, conn, inspect.iscoroutinefunction(handler))
+
+    try:
+        return _run(handler, (context,) if context_in_first_arg else (data, context))
+    finally:
+        conn.close()
+
+_process_pool: Optional[concurrent.futures.ProcessPoolExecutor] = None
+
+def _get_process_pool() -> Optional[concurrent.futures.ProcessPoolExecutor]:
+    """Pool shared by every invocation of this runner, None where processes cannot be forked"""
+    global _process_pool
+
+    if _process_pool is None:
+        if "fork" not in multiprocessing.get_all_start_methods():
+            return None
+
+        workers = os.environ.get("MOTIA_PYTHON_PROCESSES")
+        _process_pool = concurrent.futures.ProcessPoolExecutor(
+            max_workers=int(workers) if workers else None,
+            mp_context=multiprocessing.get_context("fork"),
+            initializer=_init_process,
+        )
+
+    return _process_pool
+
+def shutdown_executor() -> None:
+    global _process_pool
+
+    if _process_pool is not None:
+        _process_pool.shutdown(wait=True, cancel_futures=True)
+        _process_pool = None
+
+async def run_in_thread(handler: Callable, data: Any, context: Any, context_in_first_arg: bool) -> Any:
+    """Run the handler on the loop's default thread pool, keeping the loop free for RPC traffic"""
+    loop = asyncio.get_running_loop()
+    proxy = LoopProxy(context, loop, inspect.iscoroutinefunction(handler))
+    args = (proxy,) if context_in_first_arg else (data, proxy)
+
+    return await loop.run_in_executor(None, _run, handler, args)
+
+async def run_in_process(handler: Callable, data: Any, context: Any, context_in_first_arg: bool) -> Any:
+    """Run the handler in a pool process, serving its context calls on this loop.
+
+    The handler and its arguments are pickled, the step module is found in the forked
+    process under its stable module name. Falls back to a thread without fork support.
+    """
+    pool = _get_process_pool()
+    if pool is None:
+        print("WARNING: Process executor is not supported on this platform, using a thread", file=sys.stderr)
+        return await run_in_thread(handler, data, context, context_in_first_arg)
+
+    loop = asyncio.get_running_loop()
+    conn, child_conn = multiprocessing.Pipe()
+    calls: List[asyncio.Task] = []
+
+    async def serve(kind: str, path: Tuple[str, ...], args: tuple, kwargs: Dict[str, Any]) -> None:
+        try:
+            target = context
+            for name in path:
+                target = getattr(target, name)
+            result = await _call(target, args, kwargs)
+            reply = ("ok", result)
+        except Exception as error:
+            reply = ("error", str(error))
+
+        if kind == "call":
+            conn.send(reply)
+        elif reply[0] == "error":
+            print(f"ERROR: {reply[1]}", file=sys.stderr)
+
+    def on_readable() -> None:
+        while conn.poll():
+            try:
+                message = conn.recv()
+            except EOFError:
+                loop.remove_reader(conn.fileno())
+                return
+            calls.append(loop.create_task(serve(*message)))
+
+    loop.add_reader(conn.fileno(), on_readable)
+
+    try:
+        future = pool.submit(
+            _run_in_process,
+            handler,
+            data,
+            context_in_first_arg,
+            (context.trace_id, context.flows, context.deadline),
+            child_conn,
+        )
+        result = await asyncio.wrap_future(future)
+    except concurrent.futures.process.BrokenProcessPool:
+        # a pool process died, the next invocation starts a new pool
+        shutdown_executor()
+        raise
+    finally:
+        loop.remove_reader(conn.fileno())
+        # log messages sent right before the handler returned
+        on_readable()
+        if calls:
+            await asyncio.gather(*calls)
+        conn.close()
+        # closed only now, the pool pickles the arguments after submit returned
+        child_conn.close()
+
+    return result
@@ -0,0 +1,72 @@
+import os
+import sys
+from typing import Any, Dict, Optional
+from motia_ipc_communication import IpcCommunication
+from motia_serializer import dumps_message, loads, serialize_for_json
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+# Every frame is a 4 byte big-endian length followed by a codec tag and the payload
+HEADER_SIZE = 4
+JSON_CODEC = 0
+MSGPACK_CODEC = 1
+
+class FramedCommunication(IpcCommunication):
+    """Length-prefixed binary frames over a dedicated pipe.
+
+    Each frame names its own codec, so both sides can always decode JSON and switch to
+    MessagePack when it is available. Node.js advertises the codecs it can decode in
+    MOTIA_CHANNEL_CODECS; MessagePack is used only when it is advertised and installed.
+    """
+
+    fd_env = "MOTIA_CHANNEL_FD"
+
+    def __init__(self, read_size: Optional[int] = None):
+        super().__init__(read_size)
+        codecs = os.environ.get("MOTIA_CHANNEL_CODECS", "json").split(",")
+        self.codec = MSGPACK_CODEC if msgpack is not None and "msgpack" in codecs else JSON_CODEC
+
+    def _encode(self, request: Dict[str, Any]) -> bytes:
+        """Encode a message as a single frame"""
+        if self.codec == MSGPACK_CODEC:
+            payload = msgpack.packb(request, default=serialize_for_json)
+        else:
+            payload = dumps_message(request)
+
+        return (len(payload) + 1).to_bytes(HEADER_SIZE, 'big') + bytes([self.codec]) + payload
+
+    def _decode(self, codec: int, payload: bytes) -> Any:
+        if codec == MSGPACK_CODEC:
+            if msgpack is None:
+                raise ValueError("Received a MessagePack frame but msgpack is not installed")
+            return msgpack.unpackb(payload)
+
+        return loads(payload)
+
+    def _feed(self, data: bytes) -> None:
+        """Append raw bytes and dispatch every complete frame"""
+        buffer = self._buffer
+        buffer += data
+        start = 0
+
+        while len(buffer) - start >= HEADER_SIZE:
+            size = int.from_bytes(buffer[start:start + HEADER_SIZE], 'big')
+            end = start + HEADER_SIZE + size
+
+            if len(buffer) < end:
+                break
+
+            codec = buffer[start + HEADER_SIZE]
+            payload = bytes(buffer[start + HEADER_SIZE + 1:end])
+            start = end
+
+            try:
+                self._handle_message(self._decode(codec, payload))
+            except ValueError as e:
+                print(f"WARNING: Failed to decode frame: {e}", file=sys.stderr)
+
+        if start:
+            del buffer[:start]
@@ -1,58 +1,65 @@
 import uuid
 import asyncio
 import json
+import select
 import sys
 import os
 from typing import Any, Dict, Optional, Callable
+from motia_serializer import dumps_message, loads
+from motia_writer import FdWriter
 
-def serialize_for_json(obj: Any) -> Any:
-    """Convert Python objects to JSON-serializable types"""
-    if hasattr(obj, '__dict__'):
-        return obj.__dict__
-    elif hasattr(obj, '_asdict'):
-        return obj._asdict()
-    elif isinstance(obj, (list, tuple)):
-        return [serialize_for_json(item) for item in obj]
-    elif isinstance(obj, dict):
-        return {k: serialize_for_json(v) for k, v in obj.items()}
-    else:
-        return obj
+# Bytes requested from the channel on every readable event
+DEFAULT_READ_SIZE = 64 * 1024
 
 class IpcCommunication:
     """IPC communication using file descriptors"""
+
+    # Environment variable holding the channel file descriptor
+    fd_env = "NODE_CHANNEL_FD"
     
-    def __init__(self):
+    def __init__(self, read_size: Optional[int] = None, fd: Optional[int] = None):
         self.executing = True
         self.pending_requests: Dict[str, asyncio.Future] = {}
         self.ipc_reader_task: Optional[asyncio.Task] = None
         self.message_handlers: Dict[str, Callable] = {}
         self.ipc_fd: Optional[int] = None
+        self.read_size = read_size or int(os.environ.get("MOTIA_IPC_READ_SIZE", DEFAULT_READ_SIZE))
+        self._buffer = bytearray()
         
         # Get IPC file descriptor
-        if "NODE_CHANNEL_FD" in os.environ:
+        if fd is not None:
+            self.ipc_fd = fd
+        elif self.fd_env in os.environ:
             try:
-                self.ipc_fd = int(os.environ["NODE_CHANNEL_FD"])
+                self.ipc_fd = int(os.environ[self.fd_env])
             except (ValueError, TypeError):
-                raise RuntimeError("Invalid NODE_CHANNEL_FD environment variable")
+                raise RuntimeError(f"Invalid {self.fd_env} environment variable")
         else:
-            raise RuntimeError("NODE_CHANNEL_FD environment variable not found")
+            raise RuntimeError(f"{self.fd_env} environment variable not found")
+
+        self._writer = FdWriter(self.ipc_fd)
+
+    def _encode(self, request: Dict[str, Any]) -> bytes:
+        """Encode a message as a newline-delimited JSON line"""
+        return dumps_message(request) + b"\n"
         
-    def send_no_wait(self, method: str, args: Any) -> None:
+    def send_no_wait(self, method: str, args: Any, invocation_id: Optional[str] = None) -> None:
         """Send IPC request without waiting for response"""
         request = {
             'type': 'rpc_request',
             'method': method,
             'args': args
         }
+
+        if invocation_id:
+            request['invocationId'] = invocation_id
         
         try:
-            json_str = json.dumps(request, default=serialize_for_json)
-            message_bytes = (json_str + "\n").encode('utf-8')
-            os.write(self.ipc_fd, message_bytes)
+            self._writer.write(self._encode(request))
         except Exception as e:
             print(f"ERROR: Failed to send IPC request: {e}", file=sys.stderr)
 
-    async def send(self, method: str, args: Any) -> Any:
+    async def send(self, method: str, args: Any, invocation_id: Optional[str] = None) -> Any:
         """Send IPC request and wait for response"""
         request_id = str(uuid.uuid4())
         future = asyncio.Future()
@@ -64,16 +71,23 @@ class IpcCommunication:
             'method': method,
             'args': args
         }
+
+        if invocation_id:
+            request['invocationId'] = invocation_id
         
         try:
-            json_str = json.dumps(request, default=serialize_for_json)
-            message_bytes = (json_str + "\n").encode('utf-8')
-            os.write(self.ipc_fd, message_bytes)
+            self._writer.write(self._encode(request))
         except Exception as e:
             future.set_exception(e)
             return await future
 
-        return await future
+        try:
+            return await future
+        except asyncio.CancelledError:
+            # abandoned after a timeout or with its handler, Node.js drops the response
+            self.pending_requests.pop(request_id, None)
+            self._writer.write(self._encode({'type': 'rpc_cancel', 'id': request_id}))
+            raise
 
     def _handle_message(self, msg: Dict[str, Any]) -> None:
         """Handle incoming message from Node.js"""
@@ -97,44 +111,110 @@ class IpcCommunication:
             except Exception as e:
                 print(f"ERROR: Handler for {msg_type} failed: {e}", file=sys.stderr)
 
+    def _feed(self, data: bytes) -> None:
+        """Append raw bytes and dispatch every complete newline-delimited message"""
+        buffer = self._buffer
+        # bytes already buffered hold no newline, only the new chunk needs scanning
+        search_from = len(buffer)
+        buffer += data
+        start = 0
+
+        while True:
+            end = buffer.find(b'\n', search_from)
+            if end == -1:
+                break
+
+            line = buffer[start:end]
+            start = search_from = end + 1
+
+            if line.strip():
+                try:
+                    self._handle_message(loads(line))
+                except json.JSONDecodeError as e:
+                    print(f"WARNING: Failed to parse JSON: {e}", file=sys.stderr)
+
+        if start:
+            del buffer[:start]
+
     async def _read_ipc(self) -> None:
-        """Read messages from IPC file descriptor in background"""
-        loop = asyncio.get_event_loop()
-        buffer = ""
-        
-        while self.executing:
+        """Read messages from IPC file descriptor whenever the event loop reports it readable"""
+        loop = asyncio.get_running_loop()
+        closed = loop.create_future()
+
+        def on_readable() -> None:
             try:
-                data = await loop.run_in_executor(None, os.read, self.ipc_fd, 4096)
-                if not data:
-                    break
-                
-                buffer += data.decode('utf-8')
-                lines = buffer.split('\n')
-                buffer = lines[-1]  # Keep incomplete line in buffer
-                
-                for line in lines[:-1]:
-                    if line.strip():
-                        try:
-                            msg = json.loads(line.strip())
-                            self._handle_message(msg)
-                        except json.JSONDecodeError as e:
-                            print(f"WARNING: Failed to parse JSON: {e}", file=sys.stderr)
-                        
+                data = os.read(self.ipc_fd, self.read_size)
+            except (BlockingIOError, InterruptedError):
+                return
             except OSError:
                 # IPC channel closed
-                break
+                data = b''
+
+            if not data:
+                loop.remove_reader(self.ipc_fd)
+                if not closed.done():
+                    closed.set_result(None)
+                return
+
+            try:
+                self._feed(data)
             except Exception as e:
                 print(f"ERROR: Reading IPC failed: {e}", file=sys.stderr)
-                await asyncio.sleep(0.1)
+
+        loop.add_reader(self.ipc_fd, on_readable)
+
+        try:
+            await closed
+        finally:
+            loop.remove_reader(self.ipc_fd)
+
+    def read_sync(self, timeout: Optional[float] = None) -> bool:
+        """Read and dispatch the available messages without an event loop.
+
+        Waits up to `timeout` seconds for data, returns False once the channel is closed.
+        """
+        readable, _, _ = select.select([self.ipc_fd], [], [], timeout)
+        if not readable:
+            return True
+
+        try:
+            data = os.read(self.ipc_fd, self.read_size)
+        except (BlockingIOError, InterruptedError):
+            return True
+        except OSError:
+            return False
+
+        if not data:
+            return False
+
+        self._feed(data)
+        return True
 
     async def init(self) -> None:
         """Initialize IPC communication"""
         if not self.ipc_reader_task:
             self.ipc_reader_task = asyncio.create_task(self._read_ipc())
 
+    async def drain(self) -> None:
+        """Wait until every queued message has been written"""
+        await self._writer.drain()
+
+    async def wait_closed(self) -> None:
+        """Wait for the background reader to stop"""
+        if self.ipc_reader_task:
+            try:
+                await self.ipc_reader_task
+            except asyncio.CancelledError:
+                pass
+
     def close(self) -> None:
         """Close IPC communication"""
         self.executing = False
+
+        try:
+            self._writer.flush_sync()
+        except Exception as e:
+            print(f"ERROR: Failed to flush IPC messages: {e}", file=sys.stderr)
         
         for future in self.pending_requests.values():
             if not future.done():
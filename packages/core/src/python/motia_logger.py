@@ -1,14 +1,46 @@
+import asyncio
+import os
 import time
-from typing import Any, Dict, Optional
+from collections import deque
+from typing import Any, Deque, Dict, Optional
 from motia_rpc import RpcSender
+from motia_serializer import RawJson, dumps
+
+# Same levels and variable as the Node.js logger
+LEVELS = {"debug": 10, "info": 20, "warn": 30, "error": 40}
+
+def _env_int(name: str, default: int) -> int:
+    value = os.environ.get(name)
+    return int(value) if value else default
 
 class Logger:
+    """Buffered logger for a handler invocation.
+
+    Entries below LOG_LEVEL are discarded before anything is built. The others are encoded
+    right away, so later changes to their args do not show, kept in a ring buffer and sent
+    as a single `log.batch` message once MOTIA_LOG_BATCH_SIZE entries are pending or
+    MOTIA_LOG_FLUSH_MS elapsed, and when the handler completes.
+    When more than MOTIA_LOG_BUFFER_SIZE entries pile up before the loop gets to flush
+    them, the oldest ones are dropped and a warning reports how many.
+    """
+
     def __init__(self, trace_id: str, flows: list[str], rpc: RpcSender):
         self.trace_id = trace_id
         self.flows = flows
         self.rpc = rpc
+        self.min_level = LEVELS.get(os.environ.get("LOG_LEVEL", "info"), LEVELS["info"])
+        self.batch_size = _env_int("MOTIA_LOG_BATCH_SIZE", 100)
+        self.flush_ms = _env_int("MOTIA_LOG_FLUSH_MS", 50)
+        # encoded entries, sent as they are
+        self._buffer: Deque[bytes] = deque(maxlen=_env_int("MOTIA_LOG_BUFFER_SIZE", 10000))
+        self._dropped = 0
+        self._flush_handle: Optional[asyncio.Handle] = None
+        self._flush_soon = False
 
     def _log(self, level: str, message: str, args: Optional[Dict[str, Any]] = None) -> None:
+        if LEVELS[level] < self.min_level:
+            return
+
         log_entry = {
             "level": level,
             "time": int(time.time() * 1000),
@@ -18,14 +50,58 @@ class Logger:
         }
 
         if args:
-            # Use our serializer to ensure args are JSON-serializable
             if hasattr(args, '__dict__'):
                 args = vars(args)
             elif not isinstance(args, dict):
                 args = {"data": args}
             log_entry.update(args)
 
-        self.rpc.send_no_wait('log', log_entry)
+        if len(self._buffer) == self._buffer.maxlen:
+            self._dropped += 1
+        # the entry is sent later, the handler may change the args meanwhile
+        self._buffer.append(dumps(log_entry))
+        self._schedule_flush()
+
+    def _schedule_flush(self) -> None:
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            # no loop to flush from later, e.g. logging from a worker thread
+            self.flush()
+            return
+
+        if len(self._buffer) >= self.batch_size:
+            if not self._flush_soon:
+                if self._flush_handle is not None:
+                    self._flush_handle.cancel()
+                # flush as soon as the handler yields, logging itself never writes
+                self._flush_handle = loop.call_soon(self.flush)
+                self._flush_soon = True
+        elif self._flush_handle is None:
+            self._flush_handle = loop.call_later(self.flush_ms / 1000, self.flush)
+
+    def flush(self) -> None:
+        """Send every buffered entry in a single log.batch message"""
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        self._flush_soon = False
+
+        entries = list(self._buffer)
+        self._buffer.clear()
+
+        if self._dropped:
+            entries.append(dumps({
+                "level": "warn",
+                "time": int(time.time() * 1000),
+                "traceId": self.trace_id,
+                "flows": self.flows,
+                "msg": f"Dropped {self._dropped} log entries, the log buffer is full",
+            }))
+            self._dropped = 0
+
+        if entries:
+            self.rpc.send_no_wait('log.batch', RawJson(b"[" + b",".join(entries) + b"]"))
 
     def info(self, message: str, args: Optional[Any] = None) -> None:
         self._log("info", message, args)
@@ -0,0 +1,57 @@
+import asyncio
+import sys
+from typing import Any, Coroutine, List, Set
+
+class Operation(asyncio.Task):
+    """Task of a dispatched operation, which knows whether anything retrieved its outcome"""
+
+    retrieved = False
+
+    def __await__(self):
+        self.retrieved = True
+        return super().__await__()
+
+    __iter__ = __await__
+
+    def result(self) -> Any:
+        self.retrieved = True
+        return super().result()
+
+    def exception(self) -> Any:
+        self.retrieved = True
+        return super().exception()
+
+class PendingOperations:
+    """State and stream operations started during an invocation.
+
+    Every operation is dispatched right away as a task, so it runs whether or not the
+    handler awaits it, and the invocation waits for all of them before it closes.
+    Operations that failed without the handler ever awaiting them are reported then.
+    """
+
+    def __init__(self):
+        self._tasks: Set[asyncio.Task] = set()
+        self._failed: List[Operation] = []
+
+    def dispatch(self, operation: Coroutine[Any, Any, Any]) -> asyncio.Task:
+        task = Operation(operation, loop=asyncio.get_running_loop())
+        self._tasks.add(task)
+        task.add_done_callback(self._done)
+        return task
+
+    def _done(self, task: Operation) -> None:
+        self._tasks.discard(task)
+
+        # read through the base class, so the operation still counts as not retrieved
+        if not task.cancelled() and asyncio.Task.exception(task) is not None:
+            self._failed.append(task)
+
+    async def wait(self) -> None:
+        """Wait until every dispatched operation, including ones started meanwhile, completed"""
+        while self._tasks:
+            await asyncio.wait(list(self._tasks))
+
+        for task in self._failed:
+            if not task.retrieved:
+                print(f"Unhandled exception in background task: {asyncio.Task.exception(task)}", file=sys.stderr)
+        self._failed.clear()
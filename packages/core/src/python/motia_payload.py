@@ -0,0 +1,65 @@
+import mmap
+import os
+import tempfile
+import uuid
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator
+from motia_serializer import RawJson, dumps, loads
+
+# Payloads above the threshold travel through a file in shared memory (/dev/shm when
+# available) and only a handle {PAYLOAD_KEY: {"path", "size"}} goes over the channel.
+# Node.js sets the same defaults, MOTIA_PAYLOAD_DIR and MOTIA_PAYLOAD_THRESHOLD override both.
+PAYLOAD_KEY = "__motia_payload__"
+DEFAULT_THRESHOLD = 64 * 1024
+
+def payload_threshold() -> int:
+    value = os.environ.get("MOTIA_PAYLOAD_THRESHOLD")
+    return int(value) if value else DEFAULT_THRESHOLD
+
+def payload_dir() -> str:
+    configured = os.environ.get("MOTIA_PAYLOAD_DIR")
+    if configured:
+        return configured
+    return "/dev/shm" if os.path.isdir("/dev/shm") else tempfile.gettempdir()
+
+def is_payload_handle(value: Any) -> bool:
+    return isinstance(value, dict) and len(value) == 1 and PAYLOAD_KEY in value
+
+@contextmanager
+def open_payload(handle: Dict[str, Any]) -> Iterator[memoryview]:
+    """Map the payload file and yield a view over its bytes, the file is removed once the view is released"""
+    path = handle[PAYLOAD_KEY]["path"]
+
+    try:
+        with open(path, "rb") as file:
+            mapped = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        try:
+            with memoryview(mapped) as view:
+                yield view
+        finally:
+            mapped.close()
+    finally:
+        # only once unmapped, Windows refuses to remove a mapped file
+        try:
+            os.unlink(path)
+        except FileNotFoundError:
+            pass
+
+def load_payload(handle: Dict[str, Any]) -> Any:
+    """Decode a JSON payload straight from the mapped file"""
+    with open_payload(handle) as view:
+        return loads(view)
+
+def pack_payload(value: Any) -> Any:
+    """Return the value, encoded once and sent as is, or a handle to a payload file when it is above the threshold"""
+    data = dumps(value)
+
+    if len(data) <= payload_threshold():
+        return RawJson(data)
+
+    path = os.path.join(payload_dir(), f"motia-{uuid.uuid4()}.json")
+    with open(path, "wb") as file:
+        file.write(data)
+
+    return {PAYLOAD_KEY: {"path": path, "size": len(data)}}
@@ -0,0 +1,50 @@
+import base64
+from typing import Any, Dict, Optional, Union
+from motia_rpc import RpcSender
+from motia_serializer import dumps
+
+class ResponseStream:
+    """Streams the HTTP response of an API step chunk by chunk.
+
+    Every write waits until Node.js handed the chunk to the socket, so a slow client
+    slows the handler down instead of piling chunks up in memory. Async generator
+    handlers are streamed through this as well, one write per yielded chunk.
+    """
+
+    def __init__(self, rpc: RpcSender):
+        self.rpc = rpc
+        self.started = False
+        self.ended = False
+
+    async def start(self, status: int = 200, headers: Optional[Dict[str, str]] = None) -> None:
+        """Send the status and headers, optional before the first write"""
+        if self.started:
+            raise RuntimeError("The response was already started")
+
+        self.started = True
+        await self.rpc.send("response.start", {"status": status, "headers": headers or {}})
+
+    async def write(self, chunk: Union[str, bytes, bytearray, memoryview, Any]) -> None:
+        """Send a chunk, bytes as they are, strings as UTF-8 and anything else as JSON"""
+        if self.ended:
+            raise RuntimeError("The response already ended")
+        if not self.started:
+            await self.start()
+
+        if isinstance(chunk, str):
+            message = {"data": chunk}
+        elif isinstance(chunk, (bytes, bytearray, memoryview)):
+            message = {"data": base64.b64encode(chunk).decode("ascii"), "encoding": "base64"}
+        else:
+            message = {"data": dumps(chunk).decode("utf-8")}
+
+        await self.rpc.send("response.write", message)
+
+    async def end(self) -> None:
+        if self.ended:
+            return
+        if not self.started:
+            await self.start()
+
+        self.ended = True
+        await self.rpc.send("response.end", None)
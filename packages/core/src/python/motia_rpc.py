@@ -1,39 +1,109 @@
-from typing import Any, Union
+import asyncio
+import os
+import time
+from typing import Any, Callable, Dict, Optional, Union
 from motia_communication_factory import create_communication
 from motia_rpc_communication import RpcCommunication
 from motia_ipc_communication import IpcCommunication
-
-def serialize_for_json(obj: Any) -> Any:
-    """Convert Python objects to JSON-serializable types"""
-    if hasattr(obj, '__dict__'):
-        return obj.__dict__
-    elif hasattr(obj, '_asdict'):  # For namedtuples
-        return obj._asdict()
-    elif isinstance(obj, (list, tuple)):
-        return [serialize_for_json(item) for item in obj]
-    elif isinstance(obj, dict):
-        return {k: serialize_for_json(v) for k, v in obj.items()}
-    else:
-        return obj
+from motia_timing import Timings
 
 class RpcSender:
     """Unified communication interface that delegates to appropriate implementation"""
     
-    def __init__(self):
-        self._communication: Union[RpcCommunication, IpcCommunication] = create_communication()
-        
+    def __init__(
+        self,
+        communication: Optional[Union[RpcCommunication, IpcCommunication]] = None,
+        invocation_id: Optional[str] = None,
+        deadline: Optional[float] = None,
+        timings: Optional[Timings] = None,
+    ):
+        self._communication: Union[RpcCommunication, IpcCommunication] = communication or create_communication()
+        self.invocation_id = invocation_id
+        # time.time() after which requests fail right away, None for no limit
+        self.deadline = deadline
+        # accumulates the time spent waiting for responses, when set
+        self.timings = timings
+        timeout_ms = os.environ.get("MOTIA_RPC_TIMEOUT_MS")
+        self.timeout: Optional[float] = int(timeout_ms) / 1000 if timeout_ms else None
+
+    def for_invocation(self, invocation_id: str) -> "RpcSender":
+        """Create a sender sharing this channel that tags every request with the invocation id"""
+        return RpcSender(self._communication, invocation_id)
+
+    def with_deadline(self, deadline: Optional[float]) -> "RpcSender":
+        """Create a sender sharing this channel whose requests never wait past `deadline`"""
+        return RpcSender(self._communication, self.invocation_id, deadline, self.timings)
+
+    def with_timings(self, timings: Optional[Timings]) -> "RpcSender":
+        """Create a sender sharing this channel that adds its waiting time to `timings`"""
+        return RpcSender(self._communication, self.invocation_id, self.deadline, timings)
+
+    def extend_deadline(self, seconds: float) -> None:
+        """Leave at least `seconds` to the requests sent from now on, e.g. to flush once the deadline passed"""
+        if self.deadline is not None:
+            self.deadline = max(self.deadline, time.time() + seconds)
+
+    def remaining(self) -> Optional[float]:
+        """Seconds left until the deadline, None without one"""
+        return None if self.deadline is None else max(self.deadline - time.time(), 0)
+
+
     def send_no_wait(self, method: str, args: Any) -> None:
         """Send request without waiting for response"""
-        return self._communication.send_no_wait(method, args)
+        return self._communication.send_no_wait(method, args, self.invocation_id)
+
+    async def send(self, method: str, args: Any, timeout: Optional[float] = None) -> Any:
+        """Send request and wait for response.
 
-    async def send(self, method: str, args: Any) -> Any:
-        """Send request and wait for response"""
-        return await self._communication.send(method, args)
+        Waits at most `timeout` seconds (MOTIA_RPC_TIMEOUT_MS by default) and never past
+        the deadline, then raises TimeoutError and tells Node.js to drop the request.
+        """
+        if self.timings is None:
+            return await self._send(method, args, timeout)
+
+        start = time.perf_counter_ns()
+        try:
+            return await self._send(method, args, timeout)
+        finally:
+            self.timings.add("rpc_wait", time.perf_counter_ns() - start)
+
+    async def _send(self, method: str, args: Any, timeout: Optional[float]) -> Any:
+        limits = [limit for limit in (timeout or self.timeout, self.remaining()) if limit is not None]
+        request = self._communication.send(method, args, self.invocation_id)
+
+        if not limits:
+            return await request
+
+        try:
+            return await asyncio.wait_for(request, min(limits))
+        except asyncio.TimeoutError:
+            raise TimeoutError(f"Request {method} timed out after {min(limits):.3f}s") from None
+
+    def on_message(self, msg_type: str, handler: Callable[[Dict[str, Any]], None]) -> None:
+        """Register a handler for messages pushed by Node.js"""
+        self._communication.message_handlers[msg_type] = handler
+
+    def read_sync(self, timeout: Optional[float] = None) -> bool:
+        """Dispatch incoming messages without an event loop, returns False once the channel is closed"""
+        return self._communication.read_sync(timeout)
+
+    @property
+    def fd(self) -> Optional[int]:
+        """File descriptor of the channel, when it has one"""
+        return getattr(self._communication, "ipc_fd", None)
 
     async def init(self) -> None:
         """Initialize communication"""
         return await self._communication.init()
 
+    async def drain(self) -> None:
+        """Wait until every message sent so far has been written to the channel"""
+        return await self._communication.drain()
+
+    async def wait_closed(self) -> None:
+        """Wait until the channel to Node.js is closed"""
+        return await self._communication.wait_closed()
+
     def close(self) -> None:
         """Close communication"""
         return self._communication.close()
@@ -3,19 +3,8 @@ import asyncio
 import json
 import sys
 from typing import Any, Dict, Optional, Callable
-
-def serialize_for_json(obj: Any) -> Any:
-    """Convert Python objects to JSON-serializable types"""
-    if hasattr(obj, '__dict__'):
-        return obj.__dict__
-    elif hasattr(obj, '_asdict'):
-        return obj._asdict()
-    elif isinstance(obj, (list, tuple)):
-        return [serialize_for_json(item) for item in obj]
-    elif isinstance(obj, dict):
-        return {k: serialize_for_json(v) for k, v in obj.items()}
-    else:
-        return obj
+from motia_serializer import dumps_message, loads
+from motia_writer import StdoutWriter
 
 class RpcCommunication:
     """RPC communication using stdin/stdout"""
@@ -25,22 +14,28 @@ class RpcCommunication:
         self.pending_requests: Dict[str, asyncio.Future] = {}
         self.stdin_reader_task: Optional[asyncio.Task] = None
         self.message_handlers: Dict[str, Callable] = {}
+        self._writer = StdoutWriter()
         
-    def send_no_wait(self, method: str, args: Any) -> None:
+    def _write(self, request: Dict[str, Any]) -> None:
+        self._writer.write(dumps_message(request) + b"\n")
+
+    def send_no_wait(self, method: str, args: Any, invocation_id: Optional[str] = None) -> None:
         """Send RPC request without waiting for response"""
         request = {
             'type': 'rpc_request',
             'method': method,
             'args': args
         }
+
+        if invocation_id:
+            request['invocationId'] = invocation_id
         
         try:
-            json_str = json.dumps(request, default=serialize_for_json)
-            print(json_str, flush=True)
+            self._write(request)
         except Exception as e:
             print(f"ERROR: Failed to send RPC request: {e}", file=sys.stderr)
 
-    async def send(self, method: str, args: Any) -> Any:
+    async def send(self, method: str, args: Any, invocation_id: Optional[str] = None) -> Any:
         """Send RPC request and wait for response"""
         request_id = str(uuid.uuid4())
         future = asyncio.Future()
@@ -52,15 +47,23 @@ class RpcCommunication:
             'method': method,
             'args': args
         }
+
+        if invocation_id:
+            request['invocationId'] = invocation_id
         
         try:
-            json_str = json.dumps(request, default=serialize_for_json)
-            print(json_str, flush=True)
+            self._write(request)
         except Exception as e:
             future.set_exception(e)
             return await future
 
-        return await future
+        try:
+            return await future
+        except asyncio.CancelledError:
+            # abandoned after a timeout or with its handler, Node.js drops the response
+            self.pending_requests.pop(request_id, None)
+            self._write({'type': 'rpc_cancel', 'id': request_id})
+            raise
 
     def _handle_message(self, msg: Dict[str, Any]) -> None:
         """Handle incoming message from Node.js"""
@@ -98,7 +101,7 @@ class RpcCommunication:
                 line = line.strip()
                 if line:
                     try:
-                        msg = json.loads(line)
+                        msg = loads(line)
                         self._handle_message(msg)
                     except json.JSONDecodeError as e:
                         print(f"WARNING: Failed to parse JSON: {e}", file=sys.stderr)
@@ -112,9 +115,26 @@ class RpcCommunication:
         if not self.stdin_reader_task:
             self.stdin_reader_task = asyncio.create_task(self._read_stdin())
 
+    async def drain(self) -> None:
+        """Wait until every queued message has been written"""
+        await self._writer.drain()
+
+    async def wait_closed(self) -> None:
+        """Wait for the background reader to stop"""
+        if self.stdin_reader_task:
+            try:
+                await self.stdin_reader_task
+            except asyncio.CancelledError:
+                pass
+
     def close(self) -> None:
         """Close RPC communication"""
         self.executing = False
+
+        try:
+            self._writer.flush_sync()
+        except Exception as e:
+            print(f"ERROR: Failed to flush RPC messages: {e}", file=sys.stderr)
         
         for future in self.pending_requests.values():
             if not future.done():
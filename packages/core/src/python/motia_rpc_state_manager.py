@@ -1,56 +1,277 @@
 import asyncio
-import functools
-import sys
-from typing import Any
+from typing import Any, Dict, List, Optional, Set, Tuple
+from motia_operations import PendingOperations
 from motia_rpc import RpcSender
 
-class RpcStateManager:
+def normalize_get_result(result: Any) -> Any:
+    if result is None:
+        return {'data': None}
+    elif isinstance(result, dict):
+        if 'data' not in result:
+            return {'data': result}
+
+    return result
+
+class StateBatch:
+    """Collects state operations and sends them to Node.js in a single state.batch request.
+
+    Each operation returns a future that resolves with its own result once the batch is
+    committed, which happens automatically when used as `async with context.state.batch()`.
+    """
+
     def __init__(self, rpc: RpcSender):
         self.rpc = rpc
+        # None for operations answered locally, which are not sent
+        self._operations: List[Optional[Dict[str, Any]]] = []
+        self._futures: List[asyncio.Future] = []
+
+    def _add(self, operation: Dict[str, Any]) -> asyncio.Future:
+        future = asyncio.get_event_loop().create_future()
+        self._operations.append(operation)
+        self._futures.append(future)
+        return future
+
+    def _add_resolved(self, value: Any) -> asyncio.Future:
+        future = asyncio.get_event_loop().create_future()
+        future.set_result(value)
+        self._operations.append(None)
+        self._futures.append(future)
+        return future
+
+    def _committed(self, operation: Dict[str, Any], result: Any) -> None:
+        """Called with the raw result of every operation that succeeded"""
+
+    def get(self, trace_id: str, key: str) -> asyncio.Future:
+        return self._add({'op': 'get', 'traceId': trace_id, 'key': key})
+
+    def set(self, trace_id: str, key: str, value: Any) -> asyncio.Future:
+        return self._add({'op': 'set', 'traceId': trace_id, 'key': key, 'value': value})
+
+    def delete(self, trace_id: str, key: str) -> asyncio.Future:
+        return self._add({'op': 'delete', 'traceId': trace_id, 'key': key})
+
+    def clear(self, trace_id: str) -> asyncio.Future:
+        return self._add({'op': 'clear', 'traceId': trace_id})
+
+    async def commit(self) -> List[Any]:
+        """Send all collected operations and resolve their futures, returns the results in order.
+
+        Raises the first failed operation's error after every future has been resolved.
+        """
+        operations, futures = self._operations, self._futures
+        self._operations, self._futures = [], []
+
+        sent = [(operation, future) for operation, future in zip(operations, futures) if operation is not None]
+
+        if sent:
+            try:
+                results = await self.rpc.send('state.batch', {'operations': [operation for operation, _ in sent]})
+            except Exception as error:
+                for _, future in sent:
+                    self._fail(future, error)
+                raise
+
+            for (operation, future), result in zip(sent, results):
+                if result.get('error') is not None:
+                    self._fail(future, Exception(str(result['error'])))
+                    continue
+
+                value = result.get('result')
+                self._committed(operation, value)
+                future.set_result(normalize_get_result(value) if operation['op'] == 'get' else value)
+
+        errors = [future.exception() for future in futures if future.exception() is not None]
+        if errors:
+            raise errors[0]
+
+        return [future.result() for future in futures]
+
+    @staticmethod
+    def _fail(future: asyncio.Future, error: Exception) -> None:
+        future.set_exception(error)
+        # commit raises the error itself, so an unawaited future must not warn about it
+        future.exception()
+
+    async def __aenter__(self) -> "StateBatch":
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        if exc_type is None:
+            await self.commit()
+        else:
+            for future in self._futures:
+                future.cancel()
+            self._operations, self._futures = [], []
+
+class CachedStateBatch(StateBatch):
+    """Batch of a state manager, going through its cache and deferred writes like single operations"""
+
+    def __init__(self, state: "RpcStateManager"):
+        super().__init__(state.rpc)
+        self.state = state
+
+    def _committed(self, operation: Dict[str, Any], result: Any) -> None:
+        if operation['op'] == 'get':
+            self.state._store(operation['traceId'], operation['key'], result)
+        elif operation['op'] == 'delete':
+            self.state._store(operation['traceId'], operation['key'], None)
+
+    def get(self, trace_id: str, key: str) -> asyncio.Future:
+        cached = self.state._cached(trace_id, key)
+        if cached is not _MISSING:
+            return self._add_resolved(normalize_get_result(cached))
+
+        return super().get(trace_id, key)
+
+    def set(self, trace_id: str, key: str, value: Any) -> asyncio.Future:
+        self.state._store(trace_id, key, value)
+
+        if self.state._defer_writes:
+            self.state._pending_writes.set(trace_id, key, value)
+            return self._add_resolved(value)
+
+        return super().set(trace_id, key, value)
+
+    def delete(self, trace_id: str, key: str) -> asyncio.Future:
+        if self.state._defer_writes:
+            previous = self.state._cached(trace_id, key)
+            self.state._store(trace_id, key, None)
+            self.state._pending_writes.delete(trace_id, key)
+            return self._add_resolved(None if previous is _MISSING else previous)
+
+        return super().delete(trace_id, key)
+
+    def clear(self, trace_id: str) -> asyncio.Future:
+        self.state._forget(trace_id)
+
+        if self.state._defer_writes:
+            self.state._pending_writes.clear(trace_id)
+            return self._add_resolved(None)
+
+        return super().clear(trace_id)
+
+_MISSING = object()
+
+class RpcStateManager:
+    """State access for a handler invocation.
+
+    With `cache` enabled, values read or written during the invocation are kept locally,
+    keyed on (trace_id, key), and repeated reads are served without a round trip. With
+    `defer_writes` also enabled, set/delete/clear are applied to the local cache only and
+    sent to Node.js as one batch when `flush` runs at handler completion.
+
+    Operations start when they are called and return an awaitable. The ones a handler
+    does not await are tracked in `operations` and completed before the invocation closes.
+    """
+
+    def __init__(
+        self,
+        rpc: RpcSender,
+        cache: bool = False,
+        defer_writes: bool = False,
+        operations: Optional[PendingOperations] = None,
+    ):
+        self.rpc = rpc
+        self.operations = operations or PendingOperations()
         self._loop = asyncio.get_event_loop()
+        self._cache_enabled = cache or defer_writes
+        self._defer_writes = defer_writes
+        self._cache: Dict[Tuple[str, str], Any] = {}
+        self._cleared: Set[str] = set()
+        self._pending_writes = StateBatch(rpc)
+
+    def _cached(self, trace_id: str, key: str) -> Any:
+        if not self._cache_enabled:
+            return _MISSING
+        if (trace_id, key) in self._cache:
+            return self._cache[(trace_id, key)]
+        # every key of a cleared trace is known to be empty until written again
+        return None if trace_id in self._cleared else _MISSING
+
+    def _store(self, trace_id: str, key: str, value: Any) -> None:
+        if self._cache_enabled:
+            self._cache[(trace_id, key)] = value
+
+    def _resolved(self, value: Any) -> "asyncio.Future[Any]":
+        future = self._loop.create_future()
+        future.set_result(value)
+        return future
+
+    def get(self, trace_id: str, key: str) -> "asyncio.Future[Any]":
+        cached = self._cached(trace_id, key)
+        if cached is not _MISSING:
+            return self._resolved(normalize_get_result(cached))
 
-    async def get(self, trace_id: str, key: str) -> asyncio.Future[Any]:
+        return self.operations.dispatch(self._get(trace_id, key))
+
+    async def _get(self, trace_id: str, key: str) -> Any:
         result = await self.rpc.send('state.get', {'traceId': trace_id, 'key': key})
-        
-        if result is None:
-            return {'data': None}
-        elif isinstance(result, dict):
-            if 'data' not in result:
-                return {'data': result}
-        
+        self._store(trace_id, key, result)
+        return normalize_get_result(result)
+
+    def set(self, trace_id: str, key: str, value: Any) -> "asyncio.Future[Any]":
+        self._store(trace_id, key, value)
+
+        if self._defer_writes:
+            self._pending_writes.set(trace_id, key, value)
+            return self._resolved(value)
+
+        return self.operations.dispatch(self.rpc.send('state.set', {'traceId': trace_id, 'key': key, 'value': value}))
+
+    def delete(self, trace_id: str, key: str) -> "asyncio.Future[Any]":
+        if self._defer_writes:
+            previous = self._cached(trace_id, key)
+            self._store(trace_id, key, None)
+            self._pending_writes.delete(trace_id, key)
+            return self._resolved(None if previous is _MISSING else previous)
+
+        return self.operations.dispatch(self._delete(trace_id, key))
+
+    async def _delete(self, trace_id: str, key: str) -> Any:
+        result = await self.rpc.send('state.delete', {'traceId': trace_id, 'key': key})
+        self._store(trace_id, key, None)
         return result
 
-    async def set(self, trace_id: str, key: str, value: Any) -> asyncio.Future[None]:
-        future = await self.rpc.send('state.set', {'traceId': trace_id, 'key': key, 'value': value})
-        return future
+    def _forget(self, trace_id: str) -> None:
+        if self._cache_enabled:
+            self._cache = {entry: value for entry, value in self._cache.items() if entry[0] != trace_id}
+            self._cleared.add(trace_id)
+
+    def clear(self, trace_id: str) -> "asyncio.Future[Any]":
+        self._forget(trace_id)
+
+        if self._defer_writes:
+            self._pending_writes.clear(trace_id)
+            return self._resolved(None)
+
+        return self.operations.dispatch(self.rpc.send('state.clear', {'traceId': trace_id}))
+
+    async def flush(self) -> None:
+        """Send the writes deferred during the invocation in a single batch"""
+        await self._pending_writes.commit()
+
+    def batch(self) -> StateBatch:
+        """Group the operations issued on the returned batch into one round trip.
+
+        Cached values and deferred writes are handled like for single operations, only
+        the operations that still need Node.js are sent.
+        """
+        return CachedStateBatch(self)
+
+    async def get_many(self, trace_id: str, keys: List[str]) -> List[Any]:
+        batch = self.batch()
+        for key in keys:
+            batch.get(trace_id, key)
+        return await batch.commit()
+
+    async def set_many(self, trace_id: str, mapping: Dict[str, Any]) -> List[Any]:
+        batch = self.batch()
+        for key, value in mapping.items():
+            batch.set(trace_id, key, value)
+        return await batch.commit()
 
-    async def delete(self, trace_id: str, key: str) -> asyncio.Future[None]:
-        return await self.rpc.send('state.delete', {'traceId': trace_id, 'key': key})
-
-    async def clear(self, trace_id: str) -> asyncio.Future[None]:
-        return await self.rpc.send('state.clear', {'traceId': trace_id})
-
-    # Add wrappers to handle non-awaited coroutines
-    def __getattribute__(self, name):
-        attr = super().__getattribute__(name)
-        if name in ('get', 'set', 'delete', 'clear') and asyncio.iscoroutinefunction(attr):
-            @functools.wraps(attr)
-            def wrapper(*args, **kwargs):
-                coro = attr(*args, **kwargs)
-                # Check if this is being awaited
-                frame = sys._getframe(1)
-                if frame.f_code.co_name != '__await__':
-                    # Not being awaited, schedule in background
-                    # But we need to make sure this task completes before the handler returns
-                    # So we'll return the task for the caller to await if needed
-                    task = asyncio.create_task(coro)
-                    # Add error handling for the background task
-                    def handle_exception(t):
-                        if t.done() and not t.cancelled() and t.exception():
-                            print(f"Unhandled exception in background task: {t.exception()}", file=sys.stderr)
-                    task.add_done_callback(handle_exception)
-                    return task
-                # Being awaited, return coroutine as normal
-                return coro
-            return wrapper
-        return attr
+    async def delete_many(self, trace_id: str, keys: List[str]) -> List[Any]:
+        batch = self.batch()
+        for key in keys:
+            batch.delete(trace_id, key)
+        return await batch.commit()
@@ -1,50 +1,90 @@
 import asyncio
-import functools
-import sys
-from typing import Any
+from typing import Any, Dict, Optional, Set, Tuple
+from motia_operations import PendingOperations
 from motia_rpc import RpcSender
 
 class RpcStreamManager:
-    def __init__(self, stream_name: str,rpc: RpcSender):
+    """Stream access for a handler invocation.
+
+    Updates can be coalesced, either per call with `set(..., coalesce_ms=50)` or for the
+    whole stream through `coalesceMs` in the stream config, which the runner passes as
+    `coalesce_ms`. Coalesced updates keep only the latest value per (group_id, id) and are
+    sent at most once per window; `flush` sends whatever is left and runs when the handler
+    completes.
+
+    Like state operations, calls start right away, return an awaitable and are tracked
+    in `operations` until they complete.
+    """
+
+    def __init__(
+        self,
+        stream_name: str,
+        rpc: RpcSender,
+        coalesce_ms: Optional[int] = None,
+        operations: Optional[PendingOperations] = None,
+    ):
         self.rpc = rpc
+        self.operations = operations or PendingOperations()
         self.stream_name = stream_name
+        self.coalesce_ms = coalesce_ms
         self._loop = asyncio.get_event_loop()
+        self._pending: Dict[Tuple[str, str], Any] = {}
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+        self._flushing: Set[asyncio.Task] = set()
+
+    def get(self, group_id: str, id: str) -> "asyncio.Future[Any]":
+        return self.operations.dispatch(self.rpc.send(f'streams.{self.stream_name}.get', {'groupId': group_id, 'id': id}))
+
+    def set(self, group_id: str, id: str, data: Any, coalesce_ms: Optional[int] = None) -> "asyncio.Future[Any]":
+        window = self.coalesce_ms if coalesce_ms is None else coalesce_ms
+
+        if window:
+            self._pending[(group_id, id)] = data
+            if self._flush_handle is None:
+                self._flush_handle = self._loop.call_later(window / 1000, self._flush_in_background)
+
+            future = self._loop.create_future()
+            future.set_result(data)
+            return future
+
+        # a direct write supersedes the coalesced value of the same item
+        self._pending.pop((group_id, id), None)
+        return self.operations.dispatch(self._set(group_id, id, data))
+
+    async def _set(self, group_id: str, id: str, data: Any) -> Any:
+        # a direct write must land after the coalesced values being sent
+        if self._flushing:
+            await asyncio.gather(*self._flushing, return_exceptions=True)
+
+        return await self.rpc.send(f'streams.{self.stream_name}.set', {'groupId': group_id, 'id': id, 'data': data})
+
+    def delete(self, group_id: str, id: str) -> "asyncio.Future[Any]":
+        self._pending.pop((group_id, id), None)
+        return self.operations.dispatch(self.rpc.send(f'streams.{self.stream_name}.delete', {'groupId': group_id, 'id': id}))
+
+    def getGroup(self, group_id: str) -> "asyncio.Future[Any]":
+        return self.operations.dispatch(self.rpc.send(f'streams.{self.stream_name}.getGroup', {'groupId': group_id}))
+
+    def _flush_in_background(self) -> None:
+        self._flush_handle = None
+        task = asyncio.create_task(self._send_pending())
+        self._flushing.add(task)
+        task.add_done_callback(self._flushing.discard)
+
+    async def _send_pending(self) -> None:
+        pending, self._pending = self._pending, {}
+        await asyncio.gather(*[
+            self.rpc.send(f'streams.{self.stream_name}.set', {'groupId': group_id, 'id': id, 'data': data})
+            for (group_id, id), data in pending.items()
+        ])
+
+    async def flush(self) -> None:
+        """Send every coalesced update that is still pending"""
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+
+        if self._flushing:
+            await asyncio.gather(*self._flushing, return_exceptions=True)
 
-    async def get(self, group_id: str, id: str) -> asyncio.Future[Any]:
-        result = await self.rpc.send(f'streams.{self.stream_name}.get', {'groupId': group_id, 'id': id})
-        return result
-
-    async def set(self, group_id: str, id: str, data: Any) -> asyncio.Future[None]:
-        future = await self.rpc.send(f'streams.{self.stream_name}.set', {'groupId': group_id, 'id': id, 'data': data})
-        return future
-
-    async def delete(self, group_id: str, id: str) -> asyncio.Future[None]:
-        return await self.rpc.send(f'streams.{self.stream_name}.delete', {'groupId': group_id, 'id': id})
-
-    async def getGroup(self, group_id: str) -> asyncio.Future[None]:
-        return await self.rpc.send(f'streams.{self.stream_name}.getGroup', {'groupId': group_id})
-
-    # Add wrappers to handle non-awaited coroutines
-    def __getattribute__(self, name):
-        attr = super().__getattribute__(name)
-        if name in ('get', 'set', 'delete', 'getGroup') and asyncio.iscoroutinefunction(attr):
-            @functools.wraps(attr)
-            def wrapper(*args, **kwargs):
-                coro = attr(*args, **kwargs)
-                # Check if this is being awaited
-                frame = sys._getframe(1)
-                if frame.f_code.co_name != '__await__':
-                    # Not being awaited, schedule in background
-                    # But we need to make sure this task completes before the handler returns
-                    # So we'll return the task for the caller to await if needed
-                    task = asyncio.create_task(coro)
-                    # Add error handling for the background task
-                    def handle_exception(t):
-                        if t.done() and not t.cancelled() and t.exception():
-                            print(f"Unhandled exception in background task: {t.exception()}", file=sys.stderr)
-                    task.add_done_callback(handle_exception)
-                    return task
-                # Being awaited, return coroutine as normal
-                return coro
-            return wrapper
-        return attr
+        await self._send_pending()
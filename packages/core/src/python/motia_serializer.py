@@ -0,0 +1,170 @@
+import base64
+import dataclasses
+import datetime
+import decimal
+import enum
+import json
+import pathlib
+import uuid
+from typing import Any, Callable, Dict, Optional, Union
+from motia_dot_dict import DictView, ListView, unwrap
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+Encoder = Callable[[Any], Any]
+
+class RawJson:
+    """JSON encoded ahead of time, embedded as is in the `args` of an RPC message"""
+
+    __slots__ = ("data",)
+
+    def __init__(self, data: bytes):
+        self.data = data
+
+def _encode_bytes(obj: Union[bytes, bytearray, memoryview]) -> str:
+    return base64.b64encode(obj).decode("ascii")
+
+def _dataclass_encoder(cls: type) -> Encoder:
+    # fields can be encoded under another name, and left out while None, through their metadata
+    fields = [
+        (field.name, field.metadata.get("json_name", field.name), field.metadata.get("omit_none", False))
+        for field in dataclasses.fields(cls)
+    ]
+
+    def encode_dataclass(obj: Any) -> Dict[str, Any]:
+        # shallow on purpose, nested values go through the encoder again
+        encoded = {}
+        for name, json_name, omit_none in fields:
+            value = getattr(obj, name)
+            if value is not None or not omit_none:
+                encoded[json_name] = value
+        return encoded
+
+    return encode_dataclass
+
+def _encode_struct(obj: Any) -> Any:
+    # msgspec is installed whenever one of its structs exists, to_builtins keeps renamed fields
+    import msgspec
+    return msgspec.to_builtins(obj)
+
+def _slots_encoder(cls: type) -> Encoder:
+    names = []
+    for base in reversed(cls.__mro__):
+        slots = base.__dict__.get("__slots__", ())
+        for name in [slots] if isinstance(slots, str) else slots:
+            if name not in ("__dict__", "__weakref__"):
+                names.append(name)
+
+    return lambda obj: {name: getattr(obj, name) for name in names if hasattr(obj, name)}
+
+# Encoders for exact types and their subclasses, extended with register_encoder
+_encoders: Dict[type, Encoder] = {
+    datetime.datetime: lambda obj: obj.isoformat(),
+    datetime.date: lambda obj: obj.isoformat(),
+    datetime.time: lambda obj: obj.isoformat(),
+    datetime.timedelta: lambda obj: obj.total_seconds(),
+    decimal.Decimal: str,
+    uuid.UUID: str,
+    pathlib.PurePath: str,
+    enum.Enum: lambda obj: obj.value,
+    set: list,
+    frozenset: list,
+    bytes: _encode_bytes,
+    bytearray: _encode_bytes,
+    memoryview: _encode_bytes,
+    DictView: unwrap,
+    ListView: unwrap,
+    # anywhere it cannot be embedded as is, e.g. in a MessagePack frame
+    RawJson: lambda obj: loads(obj.data),
+}
+
+# Encoder resolved for every class seen so far, None when the class is not serializable
+_resolved: Dict[type, Optional[Encoder]] = {}
+
+def register_encoder(cls: type, encoder: Encoder) -> None:
+    """Serialize instances of `cls` (and its subclasses) with `encoder`.
+
+    The encoder returns a JSON-compatible value, nested objects are encoded again.
+    """
+    _encoders[cls] = encoder
+    _resolved.clear()
+
+def _resolve(cls: type) -> Optional[Encoder]:
+    for base in cls.__mro__:
+        if base in _encoders:
+            return _encoders[base]
+
+    if dataclasses.is_dataclass(cls):
+        return _dataclass_encoder(cls)
+    if hasattr(cls, "__struct_fields__"):  # msgspec
+        return _encode_struct
+    if hasattr(cls, "model_dump"):  # pydantic v2
+        return lambda obj: obj.model_dump(mode="json")
+    if hasattr(cls, "__fields__") and hasattr(cls, "dict"):  # pydantic v1
+        return lambda obj: obj.dict()
+    if hasattr(cls, "_asdict"):
+        return lambda obj: obj._asdict()
+    if hasattr(cls, "tolist"):  # numpy arrays and scalars
+        return lambda obj: obj.tolist()
+    if "__dict__" in dir(cls):
+        return vars
+    if hasattr(cls, "__slots__"):
+        return _slots_encoder(cls)
+
+    return None
+
+def serialize_for_json(obj: Any) -> Any:
+    """Convert an object the JSON encoder does not support into one it does.
+
+    Used as the `default` hook of the encoders, the encoder is looked up once per class.
+    """
+    cls = type(obj)
+
+    try:
+        encoder = _resolved[cls]
+    except KeyError:
+        encoder = _resolved[cls] = _resolve(cls)
+
+    if encoder is None:
+        raise TypeError(f"Object of type {cls.__name__} is not JSON serializable")
+
+    return encoder(obj)
+
+# orjson handles numpy natively, non string keys are converted like the json module does.
+# Dataclasses go through serialize_for_json, so their field metadata is honored either way.
+_ORJSON_OPTIONS = (
+    (orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATACLASS) if orjson is not None else 0
+)
+
+def dumps(obj: Any) -> bytes:
+    """Encode `obj` as compact UTF-8 JSON, with orjson when it is installed"""
+    if orjson is not None:
+        try:
+            return orjson.dumps(obj, default=serialize_for_json, option=_ORJSON_OPTIONS)
+        except TypeError:
+            # e.g. integers above 64 bits, which the json module still supports
+            pass
+
+    return json.dumps(obj, default=serialize_for_json, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+def dumps_message(message: Dict[str, Any]) -> bytes:
+    """Encode an RPC message, with its `args` embedded as is when they are RawJson"""
+    args = message.get("args")
+    if type(args) is not RawJson:
+        return dumps(message)
+
+    head = dumps({key: value for key, value in message.items() if key != "args"})
+    return head[:-1] + b',"args":' + args.data + b"}"
+
+def loads(data: Union[str, bytes, bytearray, memoryview]) -> Any:
+    """Decode JSON, with orjson when it is installed"""
+    if orjson is not None:
+        return orjson.loads(data)
+
+    if isinstance(data, memoryview):
+        data = str(data, "utf-8")
+
+    return json.loads(data)
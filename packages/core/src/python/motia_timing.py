@@ -0,0 +1,72 @@
+import contextlib
+import cProfile
+import os
+import re
+import time
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+class Timings:
+    """Where the time of an invocation went, measured with perf_counter_ns.
+
+    Phases are sequential sections with a start and a duration. Totals add up time
+    spread over the invocation, e.g. waiting for RPC responses, and may overlap phases.
+    Sent to Node.js with the close message, which shows every entry as a span.
+    """
+
+    def __init__(self, started_at: Optional[float] = None, origin_ns: Optional[int] = None):
+        # wall clock of the origin, in milliseconds like the Node.js timestamps
+        self.started_at = started_at if started_at is not None else time.time() * 1000
+        self._origin = origin_ns if origin_ns is not None else time.perf_counter_ns()
+        self._phases: List[Tuple[str, int, int]] = []
+        self._totals: Dict[str, int] = {}
+
+    @contextlib.contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        start = time.perf_counter_ns()
+        try:
+            yield
+        finally:
+            self._phases.append((name, start - self._origin, time.perf_counter_ns() - start))
+
+    def record(self, name: str, start_ns: int, end_ns: int) -> None:
+        """Add a phase measured elsewhere, from perf_counter_ns values"""
+        self._phases.append((name, start_ns - self._origin, end_ns - start_ns))
+
+    def add(self, name: str, duration_ns: int) -> None:
+        self._totals[name] = self._totals.get(name, 0) + duration_ns
+
+    def to_json(self) -> Dict[str, Any]:
+        return {
+            "startedAt": self.started_at,
+            "phases": [
+                {"name": name, "start": start / 1e6, "duration": duration / 1e6}
+                for name, start, duration in self._phases
+            ],
+            "totals": {name: duration / 1e6 for name, duration in self._totals.items()},
+        }
+
+def profile_enabled(config: Dict[str, Any]) -> bool:
+    """Profiling is opt-in, per step through `profile` or for every step through MOTIA_PYTHON_PROFILE"""
+    return bool(config.get("profile")) or os.environ.get("MOTIA_PYTHON_PROFILE") == "true"
+
+@contextlib.contextmanager
+def profiled(step_name: str) -> Iterator[Dict[str, str]]:
+    """Run the block under cProfile and dump the stats to a .prof file.
+
+    Files go to MOTIA_PROFILE_DIR, by default .motia/profiles in the project. Only the
+    event loop thread is profiled, handlers running in an executor are not. The yielded
+    dict receives the path of the written file.
+    """
+    directory = os.environ.get("MOTIA_PROFILE_DIR") or os.path.join(os.getcwd(), ".motia", "profiles")
+    name = re.sub(r"[^\w.-]+", "_", step_name or "step")
+    output: Dict[str, str] = {}
+    profiler = cProfile.Profile()
+
+    profiler.enable()
+    try:
+        yield output
+    finally:
+        profiler.disable()
+        os.makedirs(directory, exist_ok=True)
+        output["path"] = os.path.join(directory, f"{name}-{int(time.time() * 1000)}-{os.getpid()}.prof")
+        profiler.dump_stats(output["path"])
@@ -9,16 +9,20 @@ JsonSchema = Dict[str, any]
 ValidationResult = Dict[str, Union[bool, Dict, str]]
 HandlerResult = Optional[Dict[str, any]]
 HandlerFunction = Callable[..., Coroutine[any, any, HandlerResult]]
+# msgspec Struct or slots dataclass compiled from the step's schema, see motia_typed_input
+TypedInput = any
 
 class FlowConfig(SimpleNamespace):
     type: str
     input: Optional[JsonSchema]
     bodySchema: Optional[JsonSchema]
+    # decode `input` (or the body after `bodySchema` for API steps) into TypedInput
+    typedInput: Optional[bool]
 
 class HandlerArgs(SimpleNamespace):
     traceId: str
     flows: List[str]
-    data: Union[Dict, SimpleNamespace]
+    data: Union[Dict, SimpleNamespace, TypedInput]
     contextInFirstArg: bool
 
 class ApiResponse:
@@ -0,0 +1,452 @@
+import dataclasses
+import keyword
+import re
+import sys
+from typing import Annotated, Any, Callable, Dict, List, Literal, Optional, Tuple, Union
+
+from motia_payload import open_payload
+from motia_serializer import loads
+
+# Invocation args the runner reads, decoded along with the typed data
+INVOCATION_FIELDS: List[Tuple[str, Any]] = [
+    ("traceId", Optional[str]),
+    ("flows", Optional[List[str]]),
+    ("contextInFirstArg", Optional[bool]),
+    ("streams", Optional[List[Dict[str, Any]]]),
+    ("deadline", Optional[float]),
+]
+
+# Set in args whose data was already decoded into the typed input
+TYPED_DATA = "__motia_typed_data__"
+
+_JSON_TYPES = {
+    "string": str,
+    "integer": int,
+    "number": float,
+    "boolean": bool,
+    "null": type(None),
+    "array": list,
+    "object": dict,
+}
+
+class InputValidationError(ValueError):
+    """The input of a step does not match its schema"""
+
+def _attribute_name(name: str) -> str:
+    attribute = re.sub(r"\W", "_", name)
+    if not attribute.isidentifier() or keyword.iskeyword(attribute):
+        attribute = f"field_{attribute}"
+    return attribute
+
+def _class_name(name: str) -> str:
+    return "".join(part[:1].upper() + part[1:] for part in re.split(r"\W+", name) if part) or "Input"
+
+def _resolve_ref(schema: Dict[str, Any], root: Dict[str, Any]) -> Dict[str, Any]:
+    ref = schema.get("$ref")
+    if not isinstance(ref, str) or not ref.startswith("#/"):
+        return schema
+
+    resolved: Any = root
+    for part in ref[2:].split("/"):
+        resolved = resolved.get(part, {}) if isinstance(resolved, dict) else {}
+    return resolved
+
+def _schema_types(schema: Dict[str, Any]) -> List[str]:
+    types = schema.get("type")
+    if isinstance(types, list):
+        return types
+    if types:
+        return [types]
+    if "properties" in schema:
+        return ["object"]
+    if "items" in schema:
+        return ["array"]
+    return []
+
+class _MsgspecCompiler:
+    """Builds msgspec types from a JSON schema, msgspec validates while it decodes"""
+
+    def __init__(self, msgspec: Any, root: Dict[str, Any]):
+        self.msgspec = msgspec
+        self.root = root
+        self.resolving: set = set()
+
+    def meta(self, base: Any, schema: Dict[str, Any]) -> Any:
+        constraints = {
+            "ge": schema.get("minimum"),
+            "le": schema.get("maximum"),
+            "gt": schema.get("exclusiveMinimum"),
+            "lt": schema.get("exclusiveMaximum"),
+            "multiple_of": schema.get("multipleOf"),
+            "pattern": schema.get("pattern"),
+            "min_length": schema.get("minLength", schema.get("minItems")),
+            "max_length": schema.get("maxLength", schema.get("maxItems")),
+        }
+        constraints = {key: value for key, value in constraints.items() if value is not None}
+        if not constraints:
+            return base
+
+        return Annotated[base, self.msgspec.Meta(**constraints)]
+
+    def type(self, schema: Any, name: str) -> Any:
+        if not isinstance(schema, dict) or not schema:
+            return Any
+
+        ref = schema.get("$ref")
+        if ref is not None:
+            # recursive schemas are not unrolled, the recursive part is left untyped
+            if ref in self.resolving:
+                return Any
+            self.resolving.add(ref)
+            try:
+                return self.type(_resolve_ref(schema, self.root), name)
+            finally:
+                self.resolving.discard(ref)
+
+        if "const" in schema:
+            return Literal[schema["const"]]
+        if "enum" in schema:
+            return Literal[tuple(schema["enum"])]
+
+        options = schema.get("anyOf") or schema.get("oneOf")
+        if options:
+            return Union[tuple(self.type(option, f"{name}{index}") for index, option in enumerate(options))]
+
+        types = _schema_types(schema)
+        if not types:
+            return Any
+        if len(types) > 1:
+            return Union[tuple(self.type({**schema, "type": option}, name) for option in types)]
+
+        kind = types[0]
+        if kind == "object":
+            return self.object(schema, name)
+        if kind == "array":
+            return self.meta(List[self.type(schema.get("items"), f"{name}Item")], schema)
+        return self.meta(_JSON_TYPES.get(kind, Any), schema)
+
+    def object(self, schema: Dict[str, Any], name: str) -> Any:
+        properties = schema.get("properties")
+        additional = schema.get("additionalProperties")
+        if not properties:
+            values = self.type(additional, f"{name}Value") if isinstance(additional, dict) else Any
+            return Dict[str, values]
+
+        required = set(schema.get("required") or [])
+        fields = []
+        rename = {}
+        for key, property_schema in properties.items():
+            attribute = _attribute_name(key)
+            if attribute != key:
+                rename[attribute] = key
+            field_type = self.type(property_schema, f"{name}{_class_name(key)}")
+            fields.append((attribute, field_type) if key in required else (attribute, field_type, None))
+
+        return self.msgspec.defstruct(
+            _class_name(name),
+            fields,
+            kw_only=True,
+            rename=rename or None,
+            forbid_unknown_fields=additional is False,
+            # optional fields missing from the input are left out when encoded again
+            omit_defaults=True,
+        )
+
+class _DataclassCompiler:
+    """Builds `__slots__` dataclasses from a JSON schema, with a converter per type that
+    validates and builds the instances in a single walk over the decoded JSON"""
+
+    def __init__(self, root: Dict[str, Any]):
+        self.root = root
+        self.resolving: set = set()
+
+    def converter(self, schema: Any, name: str) -> Callable[[Any, str], Any]:
+        if not isinstance(schema, dict) or not schema:
+            return lambda value, path: value
+
+        ref = schema.get("$ref")
+        if ref is not None:
+            if ref in self.resolving:
+                return lambda value, path: value
+            self.resolving.add(ref)
+            try:
+                return self.converter(_resolve_ref(schema, self.root), name)
+            finally:
+                self.resolving.discard(ref)
+
+        if "const" in schema or "enum" in schema:
+            allowed = [schema["const"]] if "const" in schema else list(schema["enum"])
+
+            def convert_enum(value: Any, path: str) -> Any:
+                if value not in allowed:
+                    raise InputValidationError(f"Expected one of {allowed!r} - at `{path}`")
+                return value
+
+            return convert_enum
+
+        options = schema.get("anyOf") or schema.get("oneOf")
+        if options:
+            return self.union([self.converter(option, f"{name}{index}") for index, option in enumerate(options)])
+
+        types = _schema_types(schema)
+        if not types:
+            return lambda value, path: value
+        if len(types) > 1:
+            return self.union([self.converter({**schema, "type": option}, name) for option in types])
+
+        kind = types[0]
+        if kind == "object":
+            return self.object(schema, name)
+        if kind == "array":
+            return self.array(schema, name)
+        return self.scalar(kind, schema)
+
+    def union(self, converters: List[Callable[[Any, str], Any]]) -> Callable[[Any, str], Any]:
+        def convert_union(value: Any, path: str) -> Any:
+            for convert in converters:
+                try:
+                    return convert(value, path)
+                except InputValidationError:
+                    continue
+            raise InputValidationError(f"Object does not match any of the allowed types - at `{path}`")
+
+        return convert_union
+
+    def scalar(self, kind: str, schema: Dict[str, Any]) -> Callable[[Any, str], Any]:
+        expected = _JSON_TYPES.get(kind)
+        pattern = re.compile(schema["pattern"]) if "pattern" in schema else None
+        minimum, maximum = schema.get("minimum"), schema.get("maximum")
+        min_length, max_length = schema.get("minLength"), schema.get("maxLength")
+
+        def convert_scalar(value: Any, path: str) -> Any:
+            # bool is an int in Python, not in JSON
+            if expected is None:
+                return value
+            if isinstance(value, bool) and expected is not bool:
+                raise InputValidationError(f"Expected `{kind}`, got `bool` - at `{path}`")
+            if expected is float and isinstance(value, int):
+                value = float(value)
+            elif not isinstance(value, expected):
+                raise InputValidationError(f"Expected `{kind}`, got `{type(value).__name__}` - at `{path}`")
+
+            if minimum is not None and value < minimum:
+                raise InputValidationError(f"Expected `{kind}` >= {minimum} - at `{path}`")
+            if maximum is not None and value > maximum:
+                raise InputValidationError(f"Expected `{kind}` <= {maximum} - at `{path}`")
+            if min_length is not None and len(value) < min_length:
+                raise InputValidationError(f"Expected `str` of length >= {min_length} - at `{path}`")
+            if max_length is not None and len(value) > max_length:
+                raise InputValidationError(f"Expected `str` of length <= {max_length} - at `{path}`")
+            if pattern is not None and not pattern.search(value):
+                raise InputValidationError(f"Expected `str` matching regex {pattern.pattern!r} - at `{path}`")
+            return value
+
+        return convert_scalar
+
+    def array(self, schema: Dict[str, Any], name: str) -> Callable[[Any, str], Any]:
+        convert_item = self.converter(schema.get("items"), f"{name}Item")
+        min_items, max_items = schema.get("minItems"), schema.get("maxItems")
+
+        def convert_array(value: Any, path: str) -> Any:
+            if not isinstance(value, list):
+                raise InputValidationError(f"Expected `array`, got `{type(value).__name__}` - at `{path}`")
+            if min_items is not None and len(value) < min_items:
+                raise InputValidationError(f"Expected `array` of length >= {min_items} - at `{path}`")
+            if max_items is not None and len(value) > max_items:
+                raise InputValidationError(f"Expected `array` of length <= {max_items} - at `{path}`")
+            return [convert_item(item, f"{path}[{index}]") for index, item in enumerate(value)]
+
+        return convert_array
+
+    def object(self, schema: Dict[str, Any], name: str) -> Callable[[Any, str], Any]:
+        properties = schema.get("properties")
+        additional = schema.get("additionalProperties")
+
+        if not properties:
+            convert_value = self.converter(additional, f"{name}Value") if isinstance(additional, dict) else None
+
+            def convert_dict(value: Any, path: str) -> Any:
+                if not isinstance(value, dict):
+                    raise InputValidationError(f"Expected `object`, got `{type(value).__name__}` - at `{path}`")
+                if convert_value is None:
+                    return value
+                return {key: convert_value(item, f"{path}.{key}") for key, item in value.items()}
+
+            return convert_dict
+
+        required = set(schema.get("required") or [])
+        converters = []
+        fields = []
+        for key, property_schema in properties.items():
+            attribute = _attribute_name(key)
+            converters.append((key, attribute, key in required, self.converter(property_schema, f"{name}{_class_name(key)}")))
+            # encoded again under the JSON name, leaving out optional fields that were not set
+            if key in required:
+                fields.append((attribute, Any, dataclasses.field(metadata={"json_name": key})))
+            else:
+                fields.append((attribute, Any, dataclasses.field(default=None, metadata={"json_name": key, "omit_none": True})))
+
+        if sys.version_info >= (3, 10):
+            options: Dict[str, Any] = {"kw_only": True, "slots": True}
+        else:
+            # without kw_only, fields with a default have to come after the others
+            options = {}
+            fields.sort(key=lambda field: field[2].default is not dataclasses.MISSING)
+        cls = dataclasses.make_dataclass(_class_name(name), fields, **options)
+        known = set(properties)
+
+        def convert_object(value: Any, path: str) -> Any:
+            if not isinstance(value, dict):
+                raise InputValidationError(f"Expected `object`, got `{type(value).__name__}` - at `{path}`")
+
+            values = {}
+            for key, attribute, is_required, convert in converters:
+                if key in value:
+                    values[attribute] = convert(value[key], f"{path}.{key}")
+                elif is_required:
+                    raise InputValidationError(f"Object missing required field `{key}` - at `{path}`")
+
+            if additional is False:
+                for key in value:
+                    if key not in known:
+                        raise InputValidationError(f"Object contains unknown field `{key}` - at `{path}`")
+
+            return cls(**values)
+
+        return convert_object
+
+class InputDecoder:
+    """Decodes the input of a step into typed objects, compiled once from its schema.
+
+    With msgspec installed the objects are msgspec Structs, decoded and validated in a
+    single pass straight from the JSON bytes. Otherwise they are `__slots__` dataclasses
+    built while validating the decoded JSON. Both encode back to the same JSON.
+
+    With `batch`, the input is the list of the data of every event in the batch.
+
+    API steps get a request object whose `body` is typed after `bodySchema`, the path
+    params, query params and headers stay dicts. Middleware is not affected, it keeps
+    receiving the request as a dict and only the handler gets the typed object.
+    """
+
+    def __init__(self, schema: Optional[Dict[str, Any]], name: str, api: bool = False, batch: bool = False):
+        self.api = api
+        self.batch = batch
+
+        try:
+            import msgspec
+        except ImportError:
+            msgspec = None
+
+        if msgspec is not None:
+            try:
+                self._init_msgspec(msgspec, schema or {}, name)
+                return
+            except TypeError:
+                # e.g. unions msgspec cannot tell apart, such as two objects
+                pass
+
+        self._init_dataclass(schema or {}, name)
+
+    def _init_msgspec(self, msgspec: Any, schema: Dict[str, Any], name: str) -> None:
+        compiler = _MsgspecCompiler(msgspec, schema)
+        data_type = compiler.type({"type": "array", "items": schema}, name) if self.batch else compiler.type(schema, name)
+        if self.api:
+            headers = Dict[str, Union[str, List[str]]]
+            data_type = msgspec.defstruct(
+                "ApiRequest",
+                [
+                    ("pathParams", Dict[str, str], msgspec.field(default_factory=dict)),
+                    ("queryParams", headers, msgspec.field(default_factory=dict)),
+                    ("headers", headers, msgspec.field(default_factory=dict)),
+                    ("body", data_type, None),
+                ],
+                kw_only=True,
+            )
+        invocation = msgspec.defstruct(
+            "Invocation",
+            [("data", data_type, None), *[(field, field_type, None) for field, field_type in INVOCATION_FIELDS]],
+            kw_only=True,
+        )
+
+        self.type = data_type
+        self._validation_error = msgspec.ValidationError
+        self._convert = lambda value: msgspec.convert(value, data_type)
+        self._decode_args = msgspec.json.Decoder(invocation).decode
+
+    def _init_dataclass(self, schema: Dict[str, Any], name: str) -> None:
+        compiler = _DataclassCompiler(schema)
+        convert_data = compiler.array({"items": schema}, name) if self.batch else compiler.converter(schema, name)
+        if self.api:
+            options: Dict[str, Any] = {"kw_only": True, "slots": True} if sys.version_info >= (3, 10) else {}
+            request = dataclasses.make_dataclass(
+                "ApiRequest",
+                [
+                    ("pathParams", Dict[str, str], dataclasses.field(default_factory=dict)),
+                    ("queryParams", Dict[str, Any], dataclasses.field(default_factory=dict)),
+                    ("headers", Dict[str, Any], dataclasses.field(default_factory=dict)),
+                    ("body", Any, dataclasses.field(default=None)),
+                ],
+                **options,
+            )
+
+            def convert_request(value: Any, path: str) -> Any:
+                if not isinstance(value, dict):
+                    raise InputValidationError(f"Expected `object`, got `{type(value).__name__}` - at `{path}`")
+                return request(
+                    pathParams=value.get("pathParams") or {},
+                    queryParams=value.get("queryParams") or {},
+                    headers=value.get("headers") or {},
+                    body=convert_data(value["body"], f"{path}.body") if value.get("body") is not None else None,
+                )
+
+            self.type = request
+            self._convert = lambda value: convert_request(value, "$")
+        else:
+            self.type = None
+            self._convert = lambda value: convert_data(value, "$")
+
+        self._validation_error = InputValidationError
+        self._decode_args = None
+
+    def convert(self, value: Any) -> Any:
+        """Typed input from already decoded JSON"""
+        if value is None and not self.api:
+            return None
+        try:
+            return self._convert(value)
+        except self._validation_error as error:
+            raise InputValidationError(str(error)) from None
+
+    def load_args(self, handle: Dict[str, Any]) -> Dict[str, Any]:
+        """Invocation args from a payload file, with the data decoded into its typed input"""
+        with open_payload(handle) as view:
+            if self._decode_args is None:
+                args = loads(view)
+                return {**args, "data": self.convert(args.get("data")), TYPED_DATA: True}
+
+            try:
+                invocation = self._decode_args(view)
+            except self._validation_error as error:
+                raise InputValidationError(str(error)) from None
+            args = {field: getattr(invocation, field) for field, _ in INVOCATION_FIELDS}
+            return {**args, "data": invocation.data, TYPED_DATA: True}
+
+def input_decoder(module: Any) -> Optional[InputDecoder]:
+    """The decoder of a step module opted into `typedInput`, compiled on first use"""
+    decoder = module.__dict__.get("__motia_input_decoder__", False)
+    if decoder is not False:
+        return decoder
+
+    config = module.config
+    decoder = None
+    if config.get("typedInput"):
+        if config.get("executor") == "process":
+            raise ValueError("typedInput is not supported with the process executor")
+
+        is_api = config.get("type") == "api"
+        schema = config.get("bodySchema") if is_api else config.get("input")
+        decoder = InputDecoder(schema, config.get("name") or "Input", api=is_api, batch=bool(config.get("batch")))
+
+    module.__motia_input_decoder__ = decoder
+    return decoder
@@ -0,0 +1,176 @@
+import asyncio
+from abc import ABC, abstractmethod
+import itertools
+import os
+import select
+import sys
+from collections import deque
+from typing import Deque, List, Optional
+
+try:
+    IOV_MAX = os.sysconf("SC_IOV_MAX")
+except (AttributeError, ValueError, OSError):
+    IOV_MAX = 1024
+
+class FrameWriter(ABC):
+    """Outgoing frames, coalesced and written once per event loop iteration.
+
+    `write` only queues the frame, so sending never blocks the handler. Frames queued
+    from another thread are handed over to the loop, and without any loop they are
+    written right away. `drain` waits until every queued frame has been written.
+    """
+
+    def __init__(self):
+        self._frames: Deque[bytes] = deque()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._scheduled = False
+        self._drain_waiters: List[asyncio.Future] = []
+
+    def write(self, data: bytes) -> None:
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            loop = None
+
+        if loop is None:
+            if self._loop is not None and self._loop.is_running():
+                self._loop.call_soon_threadsafe(self._enqueue, data)
+            else:
+                self._frames.append(data)
+                self.flush_sync()
+            return
+
+        self._loop = loop
+        self._enqueue(data)
+
+    def _enqueue(self, data: bytes) -> None:
+        self._frames.append(data)
+
+        if not self._scheduled:
+            self._scheduled = True
+            self._loop.call_soon(self._flush)
+
+    def _flush(self) -> None:
+        self._scheduled = False
+
+        try:
+            done = self._write_frames()
+        except Exception as e:
+            print(f"ERROR: Failed to write to channel: {e}", file=sys.stderr)
+            self._frames.clear()
+            done = True
+
+        if done:
+            self._wake_drain_waiters()
+
+    @abstractmethod
+    def _write_frames(self) -> bool:
+        """Write as many queued frames as possible, returns True once the queue is empty"""
+
+    def _wake_drain_waiters(self) -> None:
+        waiters, self._drain_waiters = self._drain_waiters, []
+        for waiter in waiters:
+            if not waiter.done():
+                waiter.set_result(None)
+
+    async def drain(self) -> None:
+        """Wait until every queued frame has been written"""
+        if not self._frames:
+            return
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._drain_waiters.append(waiter)
+        await waiter
+
+    @abstractmethod
+    def flush_sync(self) -> None:
+        """Write every queued frame, blocking until done"""
+
+class FdWriter(FrameWriter):
+    """Frame writer for a channel file descriptor.
+
+    The descriptor is switched to non-blocking mode, queued frames go out in a single
+    writev call and whatever the kernel does not accept is retried when the event loop
+    reports the descriptor writable.
+    """
+
+    def __init__(self, fd: int):
+        super().__init__()
+        self.fd = fd
+        self._waiting_writable = False
+        os.set_blocking(fd, False)
+
+    def _write_frames(self) -> bool:
+        frames = self._frames
+
+        while frames:
+            try:
+                written = os.writev(self.fd, list(itertools.islice(frames, IOV_MAX)))
+            except (BlockingIOError, InterruptedError):
+                written = 0
+
+            if written == 0:
+                if not self._waiting_writable:
+                    self._waiting_writable = True
+                    self._loop.add_writer(self.fd, self._on_writable)
+                return False
+
+            while written:
+                frame = frames[0]
+                if written >= len(frame):
+                    frames.popleft()
+                    written -= len(frame)
+                else:
+                    frames[0] = memoryview(frame)[written:]
+                    written = 0
+
+        if self._waiting_writable:
+            self._waiting_writable = False
+            self._loop.remove_writer(self.fd)
+
+        return True
+
+    def _on_writable(self) -> None:
+        self._flush()
+
+    def flush_sync(self) -> None:
+        while self._frames:
+            _, writable, _ = select.select([], [self.fd], [])
+            if not writable:
+                continue
+
+            try:
+                written = os.write(self.fd, self._frames[0])
+            except (BlockingIOError, InterruptedError):
+                continue
+
+            if written >= len(self._frames[0]):
+                self._frames.popleft()
+            else:
+                self._frames[0] = memoryview(self._frames[0])[written:]
+
+        self._wake_drain_waiters()
+
+class StdoutWriter(FrameWriter):
+    """Frame writer for stdout, used where the channel is stdin/stdout.
+
+    Pending print output is flushed first so it never lands in the middle of a frame,
+    then the queued frames are written with a single buffered write.
+    """
+
+    def _write_frames(self) -> bool:
+        self.flush_sync()
+        return True
+
+    def flush_sync(self) -> None:
+        if not self._frames:
+            return
+
+        data = b"".join(self._frames)
+        self._frames.clear()
+
+        sys.stdout.flush()
+        sys.stdout.buffer.write(data)
+        sys.stdout.buffer.flush()
+
+        self._wake_drain_waiters()
@@ -1,108 +1,490 @@
+import time
+
+# taken before anything else is imported, the runtime import is part of the reported timings
+STARTED_AT = time.time() * 1000
+STARTED_NS = time.perf_counter_ns()
+
 import sys
 import json
+import hashlib
+import importlib
+import inspect
 import importlib.util
 import os
 import asyncio
+import random
+import signal
+import socket
 import traceback
-from typing import Callable, List, Dict
+from typing import Any, Awaitable, Callable, List, Dict, Optional, Tuple
 from motia_rpc import RpcSender
+from motia_ipc_communication import IpcCommunication
 from motia_context import Context
 from motia_middleware import compose_middleware
+from motia_operations import PendingOperations
 from motia_rpc_stream_manager import RpcStreamManager
-from motia_dot_dict import DotDict
+from motia_dot_dict import DictView
+from motia_payload import is_payload_handle, load_payload, pack_payload
+from motia_executor import run_in_process, run_in_thread, shutdown_executor
+from motia_timing import Timings, profile_enabled, profiled
+from motia_typed_input import TYPED_DATA, input_decoder
+
+IMPORTED_NS = time.perf_counter_ns()
+
+RUNNER_FILE = os.path.abspath(__file__)
 
 def parse_args(arg: str) -> Dict:
     """Parse command line arguments into HandlerArgs"""
     try:
-        return json.loads(arg)
+        args = json.loads(arg)
+        return load_payload(args) if is_payload_handle(args) else args
     except json.JSONDecodeError:
         print('Error parsing args:', arg)
         return arg
 
-async def run_python_module(file_path: str, rpc: RpcSender, args: Dict) -> None:
-    """Execute a Python module with the given arguments"""
+def load_args(handle: Dict[str, Any], module: Optional[Any]) -> Dict:
+    """Invocation args from a payload file, straight into the typed input of steps using `typedInput`.
+
+    Steps with middleware get plain args, their middleware receives the input as dicts.
+    """
+    decoder = input_decoder(module) if module is not None else None
+    if decoder is None or module.config.get("middleware"):
+        return load_payload(handle)
+    return decoder.load_args(handle)
+
+# Loaded step modules by module name, with the hash of the source they were loaded from
+_module_cache: Dict[str, Tuple[str, Any]] = {}
+
+def module_name(file_path: str) -> str:
+    """Stable module name for a step file, unique per path"""
+    path = os.path.abspath(file_path)
+    stem = os.path.splitext(os.path.basename(path))[0].replace(".", "_").replace("-", "_")
+    return f"motia_step_{stem}_{hashlib.sha1(path.encode('utf-8')).hexdigest()[:10]}"
+
+def load_module(file_path: str) -> Any:
+    """Import the step file and return its module.
+
+    The module is registered in sys.modules under a stable name, so pickling and
+    `inspect` work for its classes, and is reused while the source is unchanged.
+    Bytecode is cached by the regular __pycache__ mechanism.
+    """
+    module_dir = os.path.dirname(os.path.abspath(file_path))
+    flows_dir = os.path.dirname(module_dir)
+    name = module_name(file_path)
+
+    with open(file_path, "rb") as file:
+        digest = hashlib.sha256(file.read()).hexdigest()
+
+    cached = _module_cache.get(name)
+    if cached and cached[0] == digest:
+        return cached[1]
+
+    for path in [module_dir, flows_dir]:
+        if path not in sys.path:
+            sys.path.insert(0, path)
+
+    spec = importlib.util.spec_from_file_location(name, file_path)
+    if spec is None or spec.loader is None:
+        raise ImportError(f"Could not load module from {file_path}")
+
+    module = importlib.util.module_from_spec(spec)
+    module.__package__ = os.path.basename(module_dir)
+    sys.modules[name] = module
+
     try:
-        module_dir = os.path.dirname(os.path.abspath(file_path))
-        flows_dir = os.path.dirname(module_dir)
-        
-        for path in [module_dir, flows_dir]:
-            if path not in sys.path:
-                sys.path.insert(0, path)
-
-        spec = importlib.util.spec_from_file_location("dynamic_module", file_path)
-        if spec is None or spec.loader is None:
-            raise ImportError(f"Could not load module from {file_path}")
-            
-        module = importlib.util.module_from_spec(spec)
-        module.__package__ = os.path.basename(module_dir)
         spec.loader.exec_module(module)
+    except BaseException:
+        del sys.modules[name]
+        raise
+
+    if not hasattr(module, "handler"):
+        raise AttributeError(f"Function 'handler' not found in module {file_path}")
+
+    _module_cache[name] = (digest, module)
+    return module
+
+def preload_modules(names: List[str]) -> None:
+    """Import the listed modules up front, failures are reported and otherwise ignored"""
+    for name in names:
+        try:
+            importlib.import_module(name)
+        except Exception as error:
+            print(f"WARNING: Could not preload {name}: {error}", file=sys.stderr)
+
+def serialize_error(error: Exception) -> Dict[str, str]:
+    """Build the close payload for a failed invocation, hiding the runner's own frames"""
+    frames = [
+        frame for frame in traceback.extract_tb(error.__traceback__)
+        if os.path.abspath(frame.filename) != RUNNER_FILE
+    ]
+
+    # errors raised in a pool process carry the formatted remote traceback as their cause
+    remote_stack = getattr(error.__cause__, "tb", None)
+
+    return {
+        "message": str(error),
+        "stack": remote_stack if isinstance(remote_stack, str) else "\n".join(traceback.format_list(frames))
+    }
+
+def process_timings(args: Dict) -> Timings:
+    """Timings of a single-shot run, starting when Node.js spawned the process if it says when"""
+    spawned_at = args.get("spawnedAt")
 
-        if not hasattr(module, "handler"):
-            raise AttributeError(f"Function 'handler' not found in module {file_path}")
+    if not spawned_at or spawned_at >= STARTED_AT:
+        timings = Timings(STARTED_AT, STARTED_NS)
+    else:
+        spawned_ns = STARTED_NS - int((STARTED_AT - spawned_at) * 1e6)
+        timings = Timings(spawned_at, spawned_ns)
+        timings.record("startup", spawned_ns, STARTED_NS)
 
-        config = module.config
+    timings.record("runtime_import", STARTED_NS, IMPORTED_NS)
+    return timings
+
+# Seconds the final flushes of an invocation get when it already reached its deadline,
+# within the grace period Node.js gives before stopping the process
+FLUSH_GRACE_S = 0.5
+
+async def with_deadline(invocation: Awaitable[Any], remaining: Optional[float]) -> Any:
+    if remaining is None:
+        return await invocation
+
+    try:
+        return await asyncio.wait_for(invocation, remaining)
+    except asyncio.TimeoutError:
+        raise TimeoutError("Invocation exceeded its deadline") from None
+
+async def invoke_handler(module: Any, rpc: RpcSender, args: Dict, timings: Optional[Timings] = None) -> Any:
+    """Run the step handler of an already loaded module through its middleware.
+
+    The middleware chain, the handler, the final flushes and the time spent waiting for
+    RPC responses are recorded in `timings`.
+    """
+    config = module.config
+    timings = timings or Timings()
+    rpc = rpc.with_timings(timings)
+
+    trace_id = args.get("traceId")
+    flows = args.get("flows") or []
+    data = args.get("data")
+    # middleware receives the plain input, only the handler gets the typed one
+    handler_data = data
+    decoder = input_decoder(module)
+    if decoder is not None and not args.get(TYPED_DATA):
+        with timings.phase("decode"):
+            handler_data = decoder.convert(data)
+    context_in_first_arg = args.get("contextInFirstArg")
+    streams_config = args.get("streams") or []
+
+    # every request of the invocation, including its final flushes, is bounded by the deadline
+    if args.get("deadline"):
+        rpc = rpc.with_deadline(args["deadline"] / 1000)
+
+    operations = PendingOperations()
+    streams = DictView({})
+    for item in streams_config:
+        name = item.get("name")
+        streams[name] = RpcStreamManager(name, rpc, coalesce_ms=item.get("coalesceMs"), operations=operations)
+
+    context = Context(trace_id, flows, rpc, streams, config.get("stateCache"), operations)
+
+    middlewares: List[Callable] = config.get("middleware", [])
+    composed_middleware = compose_middleware(*middlewares)
+
+    handler = module.handler
+    executor = config.get("executor")
+
+    async def handler_fn():
+        with timings.phase("handler"):
+            return await call_handler()
+
+    async def call_handler():
+        # every chunk an async generator yields is streamed as part of the response
+        if inspect.isasyncgenfunction(handler):
+            chunks = handler(context) if context_in_first_arg else handler(handler_data, context)
+            async for chunk in chunks:
+                await context.response.write(chunk)
+            return None
+
+        # sync handlers never run on the loop, it keeps serving their RPC traffic
+        if executor == "process":
+            return await run_in_process(handler, handler_data, context, context_in_first_arg)
+        if executor == "thread" or not inspect.iscoroutinefunction(handler):
+            return await run_in_thread(handler, handler_data, context, context_in_first_arg)
+
+        if context_in_first_arg:
+            return await handler(context)
+        else:
+            return await handler(handler_data, context)
+
+    async def invoke():
+        if not middlewares:
+            return await handler_fn()
+
+        with timings.phase("middleware"):
+            return await composed_middleware(data, context, handler_fn)
+
+    async def finish():
+        # past the deadline, the deferred writes and buffered logs still get a short budget
+        rpc.extend_deadline(FLUSH_GRACE_S)
+
+        with timings.phase("flush"):
+            # operations the handler started without awaiting them
+            await operations.wait()
+            for stream in streams.values():
+                await stream.flush()
+            await context.state.flush()
+            context.logger.flush()
+
+    try:
+        if profile_enabled(config):
+            with profiled(config.get("name")) as profile:
+                result = await with_deadline(invoke(), rpc.remaining())
+            context.logger.info(f"Profile written to {profile['path']}")
+        else:
+            result = await with_deadline(invoke(), rpc.remaining())
 
-        trace_id = args.get("traceId")
-        flows = args.get("flows") or []
-        data = args.get("data")
-        context_in_first_arg = args.get("contextInFirstArg")
-        streams_config = args.get("streams") or []
+        if context.response.started:
+            await context.response.end()
+    except BaseException:
+        # the invocation fails with its own error, a failed flush is only reported
+        try:
+            await finish()
+        except Exception as error:
+            print(f"ERROR: Failed to flush the invocation: {error}", file=sys.stderr)
+        raise
 
-        streams = DotDict()
-        for item in streams_config:
-            name = item.get("name")
-            streams[name] = RpcStreamManager(name, rpc)
-        
-        context = Context(trace_id, flows, rpc, streams)
+    await finish()
+    return result
 
-        middlewares: List[Callable] = config.get("middleware", [])
-        composed_middleware = compose_middleware(*middlewares)
-        
-        async def handler_fn():
-            if context_in_first_arg:
-                return await module.handler(context)
-            else:
-                return await module.handler(data, context)
+# Close payload of an invocation Node.js cancelled
+CANCELLED_ERROR = {"message": "Invocation was cancelled", "stack": ""}
 
-        result = await composed_middleware(data, context, handler_fn)
+def close_payload(timings: Timings, error: Optional[Dict[str, str]] = None) -> Dict[str, Any]:
+    """Close message arguments, the error fields only when the invocation failed"""
+    return {**(error or {}), "timings": timings.to_json()}
 
-        if result:
-            await rpc.send('result', result)
+async def send_result(rpc: RpcSender, result: Any, timings: Timings) -> None:
+    if result:
+        with timings.phase("serialize"):
+            payload = pack_payload(result)
+        await rpc.send('result', payload)
 
-        rpc.send_no_wait("close", None)
+async def run_python_module(file_path: str, rpc: RpcSender, args: Dict, timings: Optional[Timings] = None) -> None:
+    """Execute a Python module with the given arguments, until Node.js cancels it"""
+    task = asyncio.current_task()
+    rpc.on_message("cancel", lambda msg: task.cancel())
+    timings = timings or Timings()
+
+    try:
+        with timings.phase("import"):
+            module = load_module(file_path)
+        if is_payload_handle(args):
+            args = load_args(args, module)
+        result = await invoke_handler(module, rpc, args, timings)
+        await send_result(rpc, result, timings)
+
+        rpc.send_no_wait("close", close_payload(timings))
+        await rpc.drain()
         rpc.close()
-        
+
     except Exception as error:
-        stack_list = traceback.format_exception(type(error), error, error.__traceback__)
-
-        # We're removing the first two and last item
-        # 0: Traceback (most recent call last):
-        # 1: File "python-runner.py", line 82, in run_python_module
-        # 2: File "python-runner.py", line 69, in run_python_module
-        # -1: Exception: message
-        stack_list = stack_list[3:-1]
-
-        rpc.send_no_wait("close", {
-            "message": str(error),
-            "stack": "\n".join(stack_list)
-        })
+        rpc.send_no_wait("close", close_payload(timings, serialize_error(error)))
+        await rpc.drain()
+        rpc.close()
+
+    except asyncio.CancelledError:
+        rpc.send_no_wait("close", CANCELLED_ERROR)
+        await rpc.drain()
         rpc.close()
 
+    finally:
+        shutdown_executor()
+
+async def run_worker(file_path: str, rpc: RpcSender, concurrency: int = 1, preload: Optional[List[str]] = None) -> None:
+    """Keep the step module resident and serve invocations until the channel closes.
+
+    Invocations run as concurrent tasks on this event loop, each one tagging its
+    requests with its invocation id. At most `concurrency` handlers run at once,
+    the remaining invocations wait for a free slot.
+
+    The `preload` modules and the step module are imported when the worker boots, so
+    the first invocation does not pay for them. If the step fails to import, every
+    invocation retries and reports the error.
+    """
+    module: Optional[Any] = None
+
+    preload_modules(preload or [])
+    try:
+        module = load_module(file_path)
+    except Exception:
+        pass
+    tasks: Dict[str, asyncio.Task] = {}
+    slots = asyncio.Semaphore(concurrency)
+
+    async def invoke(invocation_rpc: RpcSender, args: Dict) -> None:
+        nonlocal module
+        timings = Timings()
+        queued = time.perf_counter_ns()
+
+        async with slots:
+            # time spent waiting for a free slot
+            timings.record("queued", queued, time.perf_counter_ns())
+            try:
+                if module is None:
+                    with timings.phase("import"):
+                        module = load_module(file_path)
+                # loaded here and not when the invocation arrives, so a failure closes the invocation
+                if is_payload_handle(args):
+                    args = load_args(args, module)
+
+                result = await invoke_handler(module, invocation_rpc, args, timings)
+                await send_result(invocation_rpc, result, timings)
+
+                invocation_rpc.send_no_wait("close", close_payload(timings))
+
+            except Exception as error:
+                invocation_rpc.send_no_wait("close", close_payload(timings, serialize_error(error)))
+
+    def on_invoke(msg: Dict[str, Any]) -> None:
+        invocation_id = msg.get("invocationId")
+        invocation_rpc = rpc.for_invocation(invocation_id)
+        args = msg.get("args") or {}
+        task = asyncio.create_task(invoke(invocation_rpc, args))
+        tasks[invocation_id] = task
+
+        def on_done(task: asyncio.Task) -> None:
+            tasks.pop(invocation_id, None)
+            # also covers invocations cancelled before they started
+            if task.cancelled():
+                invocation_rpc.send_no_wait("close", CANCELLED_ERROR)
+
+        task.add_done_callback(on_done)
+
+    def on_cancel(msg: Dict[str, Any]) -> None:
+        task = tasks.get(msg.get("invocationId"))
+        if task is not None:
+            task.cancel()
+
+    rpc.on_message("invoke", on_invoke)
+    rpc.on_message("cancel", on_cancel)
+
+    await rpc.init()
+    await rpc.wait_closed()
+
+def run_forked_invocation(file_path: str, zygote_rpc: RpcSender, socket_path: str, args: Dict) -> None:
+    """Runs in a child forked by the zygote, serves one invocation over its own socket and exits"""
+    code = 0
+    timings = Timings()
+
+    try:
+        os.close(zygote_rpc.fd)
+        # the fork copied the zygote's random state, every child must not draw the same numbers
+        random.seed()
+
+        channel = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        with timings.phase("connect"):
+            channel.connect(socket_path)
+        rpc = RpcSender(IpcCommunication(fd=channel.detach()))
+
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        loop.run_until_complete(asyncio.gather(rpc.init(), run_python_module(file_path, rpc, args, timings)))
+    except BaseException as error:
+        print(f"ERROR: Forked invocation failed: {error}", file=sys.stderr)
+        code = 1
+    finally:
+        sys.stdout.flush()
+        sys.stderr.flush()
+        os._exit(code)
+
+def run_zygote(file_path: str, rpc: RpcSender, preload: Optional[List[str]] = None) -> None:
+    """Import the runtime, the `preload` modules and the step once, then fork a child per invocation.
+
+    Children inherit the warmed interpreter copy-on-write and talk to Node.js over the
+    socket named in the fork request, so every invocation still runs in its own process.
+    The zygote reports each child's exit code. It runs without an event loop, so the
+    children can start their own.
+    """
+    preload_modules(preload or [])
+    try:
+        load_module(file_path)
+    except Exception:
+        # reported by the children, which import the step again
+        pass
+
+    children: Dict[int, str] = {}
+
+    def on_fork(msg: Dict[str, Any]) -> None:
+        # buffered output would otherwise be written again by the child
+        sys.stdout.flush()
+        sys.stderr.flush()
+        pid = os.fork()
+        if pid == 0:
+            run_forked_invocation(file_path, rpc, msg["socketPath"], msg.get("args") or {})
+        children[pid] = msg.get("invocationId")
+
+    def reap_children() -> None:
+        while children:
+            try:
+                pid, status = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                return
+            if pid == 0:
+                return
+
+            invocation_id = children.pop(pid, None)
+            rpc.send_no_wait("child_exit", {"invocationId": invocation_id, "code": os.waitstatus_to_exitcode(status)})
+
+    def on_kill(msg: Dict[str, Any]) -> None:
+        # a child that ignored its cancellation, e.g. stuck in a CPU-bound loop
+        for pid, invocation_id in children.items():
+            if invocation_id == msg.get("invocationId"):
+                os.kill(pid, signal.SIGKILL)
+
+    rpc.on_message("fork", on_fork)
+    rpc.on_message("kill", on_kill)
+
+    while rpc.read_sync(timeout=0.1):
+        reap_children()
+
 if __name__ == "__main__":
-    if len(sys.argv) < 2:
-        print("Usage: python pythonRunner.py <file-path> <arg>", file=sys.stderr)
+    argv = sys.argv[1:]
+    is_worker = "--worker" in argv
+    is_zygote = "--zygote" in argv
+    preload: List[str] = []
+
+    if is_worker:
+        argv.remove("--worker")
+    if is_zygote:
+        argv.remove("--zygote")
+    if "--preload" in argv:
+        index = argv.index("--preload")
+        preload = [name for name in argv[index + 1].split(",") if name]
+        del argv[index:index + 2]
+
+    if len(argv) < 1:
+        print("Usage: python pythonRunner.py [--worker|--zygote] [--preload modules] <file-path> [arg|concurrency]", file=sys.stderr)
         sys.exit(1)
 
-    file_path = sys.argv[1]
-    arg = sys.argv[2] if len(sys.argv) > 2 else None
+    file_path = argv[0]
+    arg = argv[1] if len(argv) > 1 else None
 
     rpc = RpcSender()
+
+    if is_zygote:
+        run_zygote(file_path, rpc, preload)
+        sys.exit(0)
+
     try:
         loop = asyncio.get_running_loop()
     except RuntimeError:
         loop = asyncio.new_event_loop()
     asyncio.set_event_loop(loop)
 
-    args = parse_args(arg) if arg else None
-    tasks = asyncio.gather(rpc.init(), run_python_module(file_path, rpc, args))
-    loop.run_until_complete(tasks)
+    if is_worker:
+        concurrency = int(arg) if arg else 1
+        loop.run_until_complete(run_worker(file_path, rpc, concurrency, preload))
+    else:
+        args = parse_args(arg) if arg else None
+        tasks = asyncio.gather(rpc.init(), run_python_module(file_path, rpc, args, process_timings(args or {})))
+        loop.run_until_complete(tasks)
@@ -5,7 +5,7 @@ import http from 'http'
 import { Server as WsServer } from 'ws'
 import { analyticsEndpoint } from './analytics-endpoint'
 import { trackEvent } from './analytics/utils'
-import { callStepFile } from './call-step-file'
+import { callStepFile, ResponseStream } from './call-step-file'
 import { CronManager, setupCronHandlers } from './cron-handler'
 import { flowsConfigEndpoint } from './flows-config-endpoint'
 import { flowsEndpoint } from './flows-endpoint'
@@ -15,6 +15,8 @@ import { LockedData } from './locked-data'
 import { BaseLoggerFactory } from './logger-factory'
 import { Motia } from './motia'
 import { createTracerFactory } from './observability/tracer'
+import { closeWorkerPool, closeWorkerPools } from './process-communication/worker-pool'
+import { closeZygote, closeZygotes } from './process-communication/zygote'
 import { createSocketServer } from './socket-server'
 import { createStepHandlers, MotiaEventManager } from './step-handlers'
 import { systemSteps } from './steps'
@@ -161,6 +163,16 @@ export const createServer = (
   const tracerFactory = createTracerFactory(lockedData)
   const motia: Motia = { loggerFactory, eventManager, state, lockedData, printer, tracerFactory }
 
+  // warm workers keep the step module loaded, so they must be recycled when the step changes
+  lockedData.onStep('step-updated', (step) => {
+    closeWorkerPool(step.filePath)
+    closeZygote(step.filePath)
+  })
+  lockedData.onStep('step-removed', (step) => {
+    closeWorkerPool(step.filePath)
+    closeZygote(step.filePath)
+  })
+
   const cronManager = setupCronHandlers(motia)
   const motiaEventManager = createStepHandlers(motia)
 
@@ -180,11 +192,48 @@ export const createServer = (
         queryParams: req.query as Record<string, string | string[]>,
       }
 
+      const response: ResponseStream = {
+        start: (status, headers) => {
+          Object.entries(headers).forEach(([key, value]) => res.setHeader(key, value))
+          res.status(status)
+          res.flushHeaders()
+        },
+        write: (chunk) =>
+          new Promise((resolve) => {
+            if (res.destroyed || res.write(chunk)) {
+              resolve()
+            } else {
+              res.once('drain', resolve)
+              res.once('close', resolve)
+            }
+          }),
+        end: () => res.end(),
+      }
+
+      // a client that went away before the response was sent cancels the step
+      const abortController = new AbortController()
+      res.on('close', () => {
+        if (!res.writableFinished) {
+          abortController.abort()
+        }
+      })
+
       try {
-        const result = await callStepFile<ApiResponse>({ data, step, logger, tracer, traceId }, motia)
+        const result = await callStepFile<ApiResponse>(
+          { data, step, logger, tracer, traceId, response, signal: abortController.signal },
+          motia,
+        )
 
         trackEvent('api_call_success', { stepName })
 
+        if (res.headersSent) {
+          // streamed by the step, ended here as well when the step failed midway
+          if (!res.writableEnded) {
+            res.end()
+          }
+          return
+        }
+
         if (!result) {
           console.log('no result')
           res.status(500).json({ error: 'Internal server error' })
@@ -205,6 +254,12 @@ export const createServer = (
         })
         logger.error('[API] Internal server error', { error })
         console.log(error)
+
+        if (res.headersSent) {
+          res.end()
+          return
+        }
+
         res.status(500).json({ error: 'Internal server error' })
       }
     }
@@ -270,6 +325,8 @@ export const createServer = (
 
   const close = async (): Promise<void> => {
     cronManager.close()
+    closeWorkerPools()
+    closeZygotes()
     socketServer.close()
   }
 
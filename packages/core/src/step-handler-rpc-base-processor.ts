@@ -0,0 +1,97 @@
+import { RpcProcessorInterface, RpcHandler, MessageCallback } from './process-communication/rpc-processor-interface'
+
+export type RpcMessage = {
+  type: 'rpc_request'
+  id: string | undefined
+  method: string
+  args: unknown
+  invocationId?: string
+}
+
+/**
+ * Handler registry, invocation scopes and request bookkeeping shared by every transport,
+ * subclasses only read messages from their channel and write messages to it
+ */
+export abstract class RpcBaseProcessor implements RpcProcessorInterface {
+  // eslint-disable-next-line @typescript-eslint/no-explicit-any
+  private handlers: Record<string, RpcHandler<any, any>> = {}
+  // eslint-disable-next-line @typescript-eslint/no-explicit-any
+  private scopes: Record<string, Record<string, RpcHandler<any, any>>> = {}
+  // eslint-disable-next-line @typescript-eslint/no-explicit-any
+  private messageCallback?: MessageCallback<any>
+  // requests being handled, a request the child cancelled is removed and gets no response
+  private inFlight = new Set<string>()
+  protected isClosed = false
+
+  abstract send(message: unknown): void
+  abstract init(): Promise<void>
+
+  handler<TInput, TOutput = unknown>(method: string, handler: RpcHandler<TInput, TOutput>, scope?: string) {
+    if (scope) {
+      this.scopes[scope] = this.scopes[scope] ?? {}
+      this.scopes[scope][method] = handler
+    } else {
+      this.handlers[method] = handler
+    }
+  }
+
+  removeScope(scope: string) {
+    delete this.scopes[scope]
+  }
+
+  onMessage<T = unknown>(callback: MessageCallback<T>): void {
+    this.messageCallback = callback
+  }
+
+  async handle(method: string, input: unknown, scope?: string) {
+    const handler = (scope && this.scopes[scope]?.[method]) || this.handlers[method]
+    if (!handler) {
+      throw new Error(`Handler for method ${method} not found`)
+    }
+    return handler(input)
+  }
+
+  close() {
+    this.isClosed = true
+    this.messageCallback = undefined
+  }
+
+  /**
+   * Called by the transport for every message read from the channel
+   */
+  // eslint-disable-next-line @typescript-eslint/no-explicit-any
+  protected onChannelMessage(msg: any) {
+    // Call generic message callback if registered
+    if (this.messageCallback) {
+      this.messageCallback(msg)
+    }
+
+    // Handle RPC requests specifically
+    if (msg && msg.type === 'rpc_request') {
+      const { id, method, args, invocationId } = msg as RpcMessage
+      if (id) {
+        this.inFlight.add(id)
+      }
+      this.handle(method, args, invocationId)
+        .then((result) => this.response(id, result, null))
+        .catch((error) => this.response(id, null, error))
+    } else if (msg && msg.type === 'rpc_cancel') {
+      this.inFlight.delete(msg.id)
+    }
+  }
+
+  private response(id: string | undefined, result: unknown, error: unknown) {
+    if (id && !this.inFlight.delete(id)) {
+      return
+    }
+
+    if (id) {
+      this.send({
+        type: 'rpc_response',
+        id,
+        result: error ? undefined : result,
+        error: error ? String(error) : undefined,
+      })
+    }
+  }
+}
@@ -0,0 +1,59 @@
+import { ChildProcess } from 'child_process'
+import { Readable, Writable } from 'stream'
+import { Codec, encodeFrame, FrameDecoder } from './process-communication/framing'
+import { FRAMED_CHANNEL_FD } from './process-communication/communication-config'
+import { RpcBaseProcessor } from './step-handler-rpc-base-processor'
+
+/**
+ * RPC over length-prefixed frames on a dedicated pipe, see ./process-communication/framing.ts
+ */
+export class RpcFramedProcessor extends RpcBaseProcessor {
+  private decoder = new FrameDecoder()
+  // replies use the codec of the last frame received, which the child picked from the supported ones
+  private codec: Codec = 'json'
+
+  constructor(private child: ChildProcess) {
+    super()
+  }
+
+  private get channel(): (Readable & Writable) | undefined {
+    return this.child.stdio[FRAMED_CHANNEL_FD] as (Readable & Writable) | undefined
+  }
+
+  send(message: unknown) {
+    const channel = this.channel
+    if (!this.isClosed && channel?.writable) {
+      channel.write(encodeFrame(message, this.codec))
+    }
+  }
+
+  async init() {
+    const channel = this.channel
+    if (!channel) {
+      throw new Error('Framed channel is not available')
+    }
+
+    channel.on('data', (data: Buffer) => {
+      try {
+        this.decoder.push(data, ({ codec, message }) => {
+          this.codec = codec
+          this.onChannelMessage(message)
+        })
+      } catch (error) {
+        console.error('[RPC Framed] Failed to decode frame', error)
+      }
+    })
+
+    // the child closing its end is reported as a stream error, the close event handles it
+    channel.on('error', () => {
+      this.isClosed = true
+    })
+
+    this.child.on('exit', () => {
+      this.isClosed = true
+    })
+    this.child.on('close', () => {
+      this.isClosed = true
+    })
+  }
+}
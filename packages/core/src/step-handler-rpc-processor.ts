@@ -1,66 +1,22 @@
 import { ChildProcess } from 'child_process'
-import { RpcProcessorInterface, RpcHandler, MessageCallback } from './process-communication/rpc-processor-interface'
+import { RpcBaseProcessor } from './step-handler-rpc-base-processor'
 
-export type RpcMessage = {
-  type: 'rpc_request'
-  id: string | undefined
-  method: string
-  args: unknown
-}
-
-export class RpcProcessor implements RpcProcessorInterface {
-  // eslint-disable-next-line @typescript-eslint/no-explicit-any
-  private handlers: Record<string, RpcHandler<any, any>> = {}
-  // eslint-disable-next-line @typescript-eslint/no-explicit-any
-  private messageCallback?: MessageCallback<any>
-  private isClosed = false
-
-  constructor(private child: ChildProcess) {}
-
-  handler<TInput, TOutput = unknown>(method: string, handler: RpcHandler<TInput, TOutput>) {
-    this.handlers[method] = handler
-  }
-
-  onMessage<T = unknown>(callback: MessageCallback<T>): void {
-    this.messageCallback = callback
-  }
+export type { RpcMessage } from './step-handler-rpc-base-processor'
 
-  async handle(method: string, input: unknown) {
-    const handler = this.handlers[method]
-    if (!handler) {
-      throw new Error(`Handler for method ${method} not found`)
-    }
-    return handler(input)
+export class RpcProcessor extends RpcBaseProcessor {
+  constructor(private child: ChildProcess) {
+    super()
   }
 
-  private response(id: string | undefined, result: unknown, error: unknown) {
-    if (id && !this.isClosed && this.child.send && this.child.connected) {
-      const responseMessage = {
-        type: 'rpc_response',
-        id,
-        result: error ? undefined : result,
-        error: error ? String(error) : undefined,
-      }
-      this.child.send(responseMessage)
+  send(message: unknown) {
+    if (!this.isClosed && this.child.send && this.child.connected) {
+      this.child.send(message)
     }
   }
 
   async init() {
     // eslint-disable-next-line @typescript-eslint/no-explicit-any
-    this.child.on('message', (msg: any) => {
-      // Call generic message callback if registered
-      if (this.messageCallback) {
-        this.messageCallback(msg)
-      }
-
-      // Handle RPC requests specifically
-      if (msg && msg.type === 'rpc_request') {
-        const { id, method, args } = msg as RpcMessage
-        this.handle(method, args)
-          .then((result) => this.response(id, result, null))
-          .catch((error) => this.response(id, null, error))
-      }
-    })
+    this.child.on('message', (msg: any) => this.onChannelMessage(msg))
 
     this.child.on('exit', () => {
       this.isClosed = true
@@ -72,9 +28,4 @@ export class RpcProcessor implements RpcProcessorInterface {
       this.isClosed = true
     })
   }
-
-  close() {
-    this.isClosed = true
-    this.messageCallback = undefined
-  }
 }
@@ -0,0 +1,45 @@
+import { Socket } from 'net'
+import readline from 'readline'
+import { RpcBaseProcessor } from './step-handler-rpc-base-processor'
+
+/**
+ * RPC over newline-delimited JSON on a socket, used by processes forked from a zygote
+ */
+export class RpcSocketProcessor extends RpcBaseProcessor {
+  private rl?: readline.Interface
+
+  constructor(private socket: Socket) {
+    super()
+  }
+
+  send(message: unknown) {
+    if (!this.isClosed && this.socket.writable) {
+      this.socket.write(JSON.stringify(message) + '\n')
+    }
+  }
+
+  async init() {
+    this.rl = readline.createInterface({ input: this.socket, crlfDelay: Infinity })
+
+    this.rl.on('line', (line) => {
+      try {
+        this.onChannelMessage(JSON.parse(line))
+      } catch (error) {
+        console.error('Failed to parse RPC message:', error, 'Raw line:', line)
+      }
+    })
+
+    this.socket.on('error', () => {
+      this.isClosed = true
+    })
+    this.socket.on('close', () => {
+      this.isClosed = true
+    })
+  }
+
+  close() {
+    super.close()
+    this.rl?.close()
+    this.socket.destroy()
+  }
+}
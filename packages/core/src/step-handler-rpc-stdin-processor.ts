@@ -1,50 +1,19 @@
 import { ChildProcess } from 'child_process'
 import readline from 'readline'
-import { RpcProcessorInterface, RpcHandler, MessageCallback } from './process-communication/rpc-processor-interface'
+import { RpcBaseProcessor } from './step-handler-rpc-base-processor'
 
-export type RpcMessage = {
-  type: 'rpc_request'
-  id: string | undefined
-  method: string
-  args: unknown
-}
+export type { RpcMessage } from './step-handler-rpc-base-processor'
 
-export class RpcStdinProcessor implements RpcProcessorInterface {
-  // eslint-disable-next-line @typescript-eslint/no-explicit-any
-  private handlers: Record<string, RpcHandler<any, any>> = {}
-  // eslint-disable-next-line @typescript-eslint/no-explicit-any
-  private messageCallback?: MessageCallback<any>
-  private isClosed = false
+export class RpcStdinProcessor extends RpcBaseProcessor {
   private rl?: readline.Interface
 
-  constructor(private child: ChildProcess) {}
-
-  handler<TInput, TOutput = unknown>(method: string, handler: RpcHandler<TInput, TOutput>) {
-    this.handlers[method] = handler
+  constructor(private child: ChildProcess) {
+    super()
   }
 
-  onMessage<T = unknown>(callback: MessageCallback<T>): void {
-    this.messageCallback = callback
-  }
-
-  async handle(method: string, input: unknown) {
-    const handler = this.handlers[method]
-    if (!handler) {
-      throw new Error(`Handler for method ${method} not found`)
-    }
-    return handler(input)
-  }
-
-  private response(id: string | undefined, result: unknown, error: unknown) {
-    if (id && !this.isClosed && this.child.stdin && !this.child.killed) {
-      const responseMessage = {
-        type: 'rpc_response',
-        id,
-        result: error ? undefined : result,
-        error: error ? String(error) : undefined,
-      }
-      const messageStr = JSON.stringify(responseMessage)
-      this.child.stdin.write(messageStr + '\n')
+  send(message: unknown) {
+    if (!this.isClosed && this.child.stdin && !this.child.killed) {
+      this.child.stdin.write(JSON.stringify(message) + '\n')
     }
   }
 
@@ -57,20 +26,7 @@ export class RpcStdinProcessor implements RpcProcessorInterface {
 
       this.rl.on('line', (line) => {
         try {
-          const msg = JSON.parse(line.trim())
-
-          // Call generic message callback if registered
-          if (this.messageCallback) {
-            this.messageCallback(msg)
-          }
-
-          // Handle RPC requests specifically
-          if (msg && msg.type === 'rpc_request') {
-            const { id, method, args } = msg as RpcMessage
-            this.handle(method, args)
-              .then((result) => this.response(id, result, null))
-              .catch((error) => this.response(id, null, error))
-          }
+          this.onChannelMessage(JSON.parse(line.trim()))
         } catch (error) {
           console.error('Failed to parse RPC message:', error, 'Raw line:', line)
         }
@@ -90,8 +46,7 @@ export class RpcStdinProcessor implements RpcProcessorInterface {
   }
 
   close() {
-    this.isClosed = true
-    this.messageCallback = undefined
+    super.close()
     if (this.rl) {
       this.rl.close()
     }
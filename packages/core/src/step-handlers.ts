@@ -1,6 +1,8 @@
 import { callStepFile } from './call-step-file'
+import { EventBatcher } from './event-batcher'
 import { globalLogger } from './logger'
 import { Motia } from './motia'
+import { MultiTracer } from './observability/multi-tracer'
 import { Event, EventConfig, Step } from './types'
 
 export type MotiaEventManager = {
@@ -19,6 +21,38 @@ export const createStepHandlers = (motia: Motia): MotiaEventManager => {
     return rest
   }
 
+  const batchers: Record<string, EventBatcher<Event>[]> = {}
+
+  /**
+   * Invokes the step once with the data of every event in the batch,
+   * under the trace of the first one and recorded in the trace of each
+   */
+  const createBatcher = (step: Step<EventConfig>) => {
+    const { maxSize = 100, maxWaitMs = 50 } = step.config.batch ?? {}
+
+    return new EventBatcher<Event>({
+      maxSize,
+      maxWaitMs,
+      onFlush: async (events) => {
+        const [{ traceId }] = events
+        const logger = events[0].logger.child({ step: step.config.name })
+        const tracer = new MultiTracer(events.map((event) => event.tracer.child(step, logger)))
+        const data = events.map((event) => event.data)
+
+        globalLogger.debug('[step handler] delivering event batch', { size: events.length, step: step.config.name })
+
+        try {
+          await callStepFile({ step, data, traceId, tracer, logger }, motia)
+
+          // eslint-disable-next-line @typescript-eslint/no-explicit-any
+        } catch (error: any) {
+          const message = typeof error === 'string' ? error : error.message
+          logger.error(message)
+        }
+      },
+    })
+  }
+
   const createHandler = (step: Step<EventConfig>) => {
     const { config, filePath } = step
     const { subscribes, name } = config
@@ -26,6 +60,23 @@ export const createStepHandlers = (motia: Motia): MotiaEventManager => {
     globalLogger.debug('[step handler] establishing step subscriptions', { filePath, step: step.config.name })
 
     subscribes.forEach((subscribe) => {
+      if (config.batch) {
+        const batcher = createBatcher(step)
+        batchers[filePath] = [...(batchers[filePath] ?? []), batcher]
+
+        motia.eventManager.subscribe({
+          filePath,
+          event: subscribe,
+          handlerName: step.config.name,
+          handler: async (event) => {
+            globalLogger.debug('[step handler] batching event', { event: removeLogger(event), step: name })
+            await batcher.add(event)
+          },
+        })
+
+        return
+      }
+
       motia.eventManager.subscribe({
         filePath,
         event: subscribe,
@@ -57,6 +108,10 @@ export const createStepHandlers = (motia: Motia): MotiaEventManager => {
     subscribes.forEach((subscribe) => {
       motia.eventManager.unsubscribe({ filePath, event: subscribe })
     })
+
+    // events already accepted are still delivered to the step being removed
+    batchers[filePath]?.forEach((batcher) => batcher.flush())
+    delete batchers[filePath]
   }
 
   eventSteps.forEach(createHandler)
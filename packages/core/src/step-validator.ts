@@ -48,6 +48,38 @@ const emits = z.array(
   ]),
 )
 
+const worker = z
+  .object({
+    poolSize: z.number().int().positive().optional(),
+    concurrency: z.number().int().positive().optional(),
+    maxRequests: z.number().int().positive().optional(),
+    idleTimeoutMs: z.number().int().nonnegative().optional(),
+    preload: z.array(z.string()).optional(),
+  })
+  .strict()
+
+const stateCache = z.union([z.boolean(), z.object({ deferWrites: z.boolean().optional() }).strict()])
+
+const batch = z
+  .object({
+    maxSize: z.number().int().positive().optional(),
+    maxWaitMs: z.number().nonnegative().optional(),
+  })
+  .strict()
+
+const executor = z.enum(['thread', 'process'])
+const zygote = z.union([z.boolean(), z.object({ preload: z.array(z.string()).optional() }).strict()])
+
+// options of the process running the handler, shared by the event, API and cron steps
+const pythonRuntimeSchema = z.object({
+  worker: worker.optional(),
+  zygote: zygote.optional(),
+  executor: executor.optional(),
+  timeoutMs: z.number().int().positive().optional(),
+  profile: z.boolean().optional(),
+  stateCache: stateCache.optional(),
+})
+
 const noopSchema = z
   .object({
     type: z.literal('noop'),
@@ -59,8 +91,8 @@ const noopSchema = z
   })
   .strict()
 
-const eventSchema = z
-  .object({
+const eventSchema = pythonRuntimeSchema
+  .extend({
     type: z.literal('event'),
     name: z.string(),
     description: z.string().optional(),
@@ -70,11 +102,13 @@ const eventSchema = z
     input: z.union([jsonSchema, z.object({}), z.null()]).optional(),
     flows: z.array(z.string()).optional(),
     includeFiles: z.array(z.string()).optional(),
+    typedInput: z.boolean().optional(),
+    batch: batch.optional(),
   })
   .strict()
 
-const apiSchema = z
-  .object({
+const apiSchema = pythonRuntimeSchema
+  .extend({
     type: z.literal('api'),
     name: z.string(),
     description: z.string().optional(),
@@ -85,6 +119,7 @@ const apiSchema = z
     virtualSubscribes: z.array(z.string()).optional(),
     flows: z.array(z.string()).optional(),
     includeFiles: z.array(z.string()).optional(),
+    typedInput: z.boolean().optional(),
     middleware: z.array(z.any()).optional(),
     queryParams: z.array(z.object({ name: z.string(), description: z.string().optional() })).optional(),
     bodySchema: z.union([jsonSchema, z.object({}), z.null()]).optional(),
@@ -92,8 +127,8 @@ const apiSchema = z
   })
   .strict()
 
-const cronSchema = z
-  .object({
+const cronSchema = pythonRuntimeSchema
+  .extend({
     type: z.literal('cron'),
     name: z.string(),
     description: z.string().optional(),
@@ -123,6 +158,15 @@ export const validateStep = (step: Step): ValidationResult => {
       noopSchema.parse(step.config)
     } else if (step.config.type === 'event') {
       eventSchema.parse(step.config)
+
+      // the other runtimes invoke their handlers with a single input
+      if (step.config.batch && !step.filePath.endsWith('.py')) {
+        return {
+          success: false,
+          error: 'Batch delivery is only supported by Python steps',
+          errors: [{ path: 'batch', message: 'Batch delivery is only supported by Python steps' }],
+        }
+      }
     } else if (step.config.type === 'api') {
       apiSchema.parse(step.config)
     } else if (step.config.type === 'cron') {
@@ -8,6 +8,11 @@ export interface StreamConfig {
     | { storageType: 'default' }
     // eslint-disable-next-line @typescript-eslint/no-explicit-any
     | { storageType: 'custom'; factory: () => MotiaStream<any> }
+  /**
+   * Time window in milliseconds over which Python steps coalesce updates of the same item,
+   * sending only its latest value once per window. Updates are sent right away by default.
+   */
+  coalesceMs?: number
 }
 
 export type StateStreamEventChannel = { groupId: string; id?: string }
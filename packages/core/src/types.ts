@@ -28,7 +28,91 @@ export type EventHandler<TInput, TEmitData> = (input: TInput, ctx: FlowContext<T
 
 export type Emit = string | { topic: string; label?: string; conditional?: boolean }
 
-export type EventConfig = {
+export type WorkerConfig = {
+  /**
+   * Number of warm worker processes kept for the step, defaults to 1
+   */
+  poolSize?: number
+  /**
+   * Invocations a single worker runs concurrently on its event loop, defaults to 1
+   */
+  concurrency?: number
+  /**
+   * Invocations a worker serves before it is recycled, defaults to 1000
+   */
+  maxRequests?: number
+  /**
+   * Time in milliseconds an idle worker is kept alive, defaults to 60000
+   */
+  idleTimeoutMs?: number
+  /**
+   * Modules a worker imports when it boots, before the step file itself
+   */
+  preload?: string[]
+}
+
+export type StateCacheConfig = boolean | { deferWrites?: boolean }
+
+export type BatchConfig = {
+  /**
+   * Events that are delivered at once, defaults to 100
+   */
+  maxSize?: number
+  /**
+   * Time in milliseconds the first event of a batch waits for more, defaults to 50
+   */
+  maxWaitMs?: number
+}
+
+export type ExecutorConfig = 'thread' | 'process'
+
+export type ZygoteConfig =
+  | boolean
+  | {
+      /**
+       * Modules the zygote imports once, before the step file itself
+       */
+      preload?: string[]
+    }
+
+/**
+ * Options of the process running the handler, shared by the event, API and cron steps
+ */
+export type PythonRuntimeConfig = {
+  /**
+   * Keeps warm worker processes for the step instead of spawning one per invocation.
+   * Only supported by Python steps.
+   */
+  worker?: WorkerConfig
+  /**
+   * Forks every invocation from a process that already imported the step, instead of
+   * starting a new interpreter. Only supported by Python steps, not available on Windows.
+   */
+  zygote?: ZygoteConfig
+  /**
+   * Where the handler runs. Python steps run sync handlers in a thread by default,
+   * `process` moves CPU-heavy handlers to a process pool. Only supported by Python steps.
+   */
+  executor?: ExecutorConfig
+  /**
+   * Time in milliseconds an invocation may take, the step is cancelled past it.
+   * Defaults to MOTIA_STEP_TIMEOUT_MS, unbounded when neither is set.
+   */
+  timeoutMs?: number
+  /**
+   * Runs Python handlers under cProfile and writes the stats to MOTIA_PROFILE_DIR,
+   * .motia/profiles by default. MOTIA_PYTHON_PROFILE=true enables it for every step.
+   */
+  profile?: boolean
+  /**
+   * Caches state reads and writes for the duration of an invocation.
+   * With `deferWrites`, writes are sent in a single batch when the handler completes.
+   * Only supported by Python steps.
+   */
+  stateCache?: StateCacheConfig
+}
+
+export type EventConfig = PythonRuntimeConfig & {
   type: 'event'
   name: string
   description?: string
@@ -42,6 +126,17 @@ export type EventConfig = {
    * Needs to be relative to the step file.
    */
   includeFiles?: string[]
+  /**
+   * Hands Python handlers their input decoded into typed objects compiled from `input`,
+   * msgspec structs when msgspec is installed or slots dataclasses otherwise.
+   */
+  typedInput?: boolean
+  /**
+   * Accumulates the events of each subscribed topic and invokes the handler once per
+   * batch, with the list of event data, under the trace of the first event. The batch is
+   * recorded in the trace of every event. Python steps only.
+   */
+  batch?: BatchConfig
 }
 
 export type NoopConfig = {
@@ -66,7 +161,7 @@ export type QueryParam = {
   description: string
 }
 
-export type ApiRouteConfig = {
+export type ApiRouteConfig = PythonRuntimeConfig & {
   type: 'api'
   name: string
   description?: string
@@ -85,6 +180,11 @@ export type ApiRouteConfig = {
    * Needs to be relative to the step file.
    */
   includeFiles?: string[]
+  /**
+   * Hands Python handlers a typed request whose body is decoded after `bodySchema`,
+   * msgspec structs when msgspec is installed or slots dataclasses otherwise.
+   */
+  typedInput?: boolean
 }
 
 export type ApiRequest<TBody = unknown> = {
@@ -106,7 +206,7 @@ export type ApiRouteHandler<
   TEmitData = never,
 > = (req: ApiRequest<TRequestBody>, ctx: FlowContext<TEmitData>) => Promise<TResponseBody>
 
-export type CronConfig = {
+export type CronConfig = PythonRuntimeConfig & {
   type: 'cron'
   name: string
   description?: string
@@ -0,0 +1,49 @@
+import fs from 'fs'
+import path from 'path'
+import { Archiver } from '../archiver'
+
+// Python modules shipped with @motiadev/core, copied next to its build output
+const motiaPythonDir = path.join(path.dirname(require.resolve('@motiadev/core')), 'src', 'python')
+
+const motiaImportPattern = /^\s*(?:from|import)\s+(motia_\w+)/gm
+
+// Modules already in each archive, the router archive gets the modules of every API step
+const addedModules = new WeakMap<Archiver, Set<string>>()
+
+/**
+ * Whether a module imported by a step is one of the Python modules of @motiadev/core,
+ * e.g. motia_cache, rather than an installed package
+ */
+export const isMotiaModule = (moduleName: string): boolean => {
+  return moduleName.startsWith('motia_') && fs.existsSync(path.join(motiaPythonDir, `${moduleName}.py`))
+}
+
+/**
+ * Adds the given @motiadev/core modules to the archive, along with the core modules they import
+ */
+export const addMotiaModulesToArchive = (archive: Archiver, moduleNames: string[]): void => {
+  const added = addedModules.get(archive) ?? new Set<string>()
+  const pending = moduleNames.filter(isMotiaModule)
+
+  addedModules.set(archive, added)
+
+  while (pending.length > 0) {
+    const moduleName = pending.pop() as string
+
+    if (added.has(moduleName)) {
+      continue
+    }
+
+    const filePath = path.join(motiaPythonDir, `${moduleName}.py`)
+    const source = fs.readFileSync(filePath, 'utf-8')
+
+    added.add(moduleName)
+    archive.append(source, `${moduleName}.py`)
+
+    for (const [, imported] of source.matchAll(motiaImportPattern)) {
+      if (isMotiaModule(imported)) {
+        pending.push(imported)
+      }
+    }
+  }
+}
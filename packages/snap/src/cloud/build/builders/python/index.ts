@@ -6,9 +6,15 @@ import { activatePythonVenv } from '../../../../utils/activate-python-env'
 import { Builder, RouterBuildResult, StepBuilder } from '../../builder'
 import { Archiver } from '../archiver'
 import { includeStaticFiles } from '../include-static-files'
+import { addMotiaModulesToArchive, isMotiaModule } from './add-motia-modules-to-archive'
 import { addPackageToArchive } from './add-package-to-archive'
 
+type PendingTrace = { resolve: (packages: string[]) => void; reject: (err: Error) => void }
+
 export class PythonBuilder implements StepBuilder {
+  private readonly packages = new Map<string, Promise<string[]>>()
+  private pendingTraces?: Map<string, PendingTrace>
+
   constructor(private readonly builder: Builder) {
     activatePythonVenv({ baseDir: this.builder.projectDir })
   }
@@ -18,8 +24,7 @@ export class PythonBuilder implements StepBuilder {
     const normalizedEntrypointPath = entrypointPath.replace(/[.]step.py$/, '_step.py')
     const sitePackagesDir = `${process.env.PYTHON_SITE_PACKAGES}-lambda`
 
-    // Get Python builder response
-    const { packages } = await this.getPythonBuilderData(step)
+    const packages = await this.getPackages(step)
 
     // Add main file to archive
     if (!fs.existsSync(step.filePath)) {
@@ -28,7 +33,14 @@ export class PythonBuilder implements StepBuilder {
 
     archive.append(fs.createReadStream(step.filePath), path.relative(this.builder.projectDir, normalizedEntrypointPath))
 
-    await Promise.all(packages.map(async (packageName) => addPackageToArchive(archive, sitePackagesDir, packageName)))
+    // modules of @motiadev/core the step imports, e.g. motia_cache, are not installed packages
+    addMotiaModulesToArchive(archive, packages.filter(isMotiaModule))
+
+    await Promise.all(
+      packages
+        .filter((packageName) => !isMotiaModule(packageName))
+        .map(async (packageName) => addPackageToArchive(archive, sitePackagesDir, packageName)),
+    )
 
     return normalizedEntrypointPath
   }
@@ -44,8 +56,7 @@ export class PythonBuilder implements StepBuilder {
       fs.mkdirSync(path.dirname(outfile), { recursive: true })
       this.builder.printer.printStepBuilding(step)
 
-      // Get Python builder response
-      const { packages } = await this.getPythonBuilderData(step)
+      const packages = (await this.getPackages(step)).filter((packageName) => !isMotiaModule(packageName))
       const stepArchiver = new Archiver(outfile)
       const stepPath = await this.buildStep(step, stepArchiver)
 
@@ -96,11 +107,22 @@ export class PythonBuilder implements StepBuilder {
 
     const zipName = 'router-python.zip'
     const archive = new Archiver(path.join(this.builder.distDir, zipName))
-    const dependencies = ['fastapi', 'uvicorn', 'pydantic', 'pydantic_core', 'uvloop', 'starlette', 'typing_inspection']
+    const dependencies = [
+      'fastapi',
+      'uvicorn',
+      'pydantic',
+      'pydantic_core',
+      'uvloop',
+      'starlette',
+      'typing_inspection',
+      'orjson',
+    ]
     const lambdaSitePackages = `${process.env.PYTHON_SITE_PACKAGES}-lambda`
     await Promise.all(
       dependencies.map(async (packageName) => addPackageToArchive(archive, lambdaSitePackages, packageName)),
     )
+    // the router encodes responses with the serializer of the Python runtime
+    addMotiaModulesToArchive(archive, ['motia_serializer'])
 
     for (const step of steps) {
       await this.buildStep(step, archive)
@@ -121,15 +143,10 @@ export class PythonBuilder implements StepBuilder {
         '# {{routes}}',
         steps
           .map((step, index) => {
-            const method = step.config.method.toLowerCase()
-            return [
-              `@app.${method}('${toFastAPI(step.config.path)}')`,
-              `async def handler_${index}(request: Request, response: Response):`,
-              `    handler_route = await router(route${index}_handler, route${index}_config, create_context(context, '${step.config.name}'))`,
-              `    return await handler_route(request, response)`,
-            ].join('\n    ')
+            const route = `router(route${index}_handler, route${index}_config, create_context(context, '${step.config.name}'))`
+            return `app.add_api_route('${toFastAPI(step.config.path)}', ${route}, methods=['${step.config.method.toUpperCase()}'])`
           })
-          .join('\n\n    '),
+          .join('\n    '),
       )
 
     archive.append(file, 'router.py')
@@ -142,16 +159,56 @@ export class PythonBuilder implements StepBuilder {
     return { size, path: zipName }
   }
 
-  private async getPythonBuilderData(step: Step): Promise<{ file: string; files: string[]; packages: string[] }> {
+  /**
+   * Packages imported by the step, dependencies included.
+   *
+   * Steps requested in the same tick, which is every step of a build, are traced by a
+   * single python-builder.py process, and each file is only traced once per build.
+   */
+  private getPackages(step: Step): Promise<string[]> {
+    const cached = this.packages.get(step.filePath)
+
+    if (cached) {
+      return cached
+    }
+
+    if (!this.pendingTraces) {
+      const pendingTraces = new Map<string, PendingTrace>()
+      this.pendingTraces = pendingTraces
+
+      setImmediate(() => {
+        this.pendingTraces = undefined
+        this.traceImports(pendingTraces)
+      })
+    }
+
+    const pendingTraces = this.pendingTraces
+    const packages = new Promise<string[]>((resolve, reject) => pendingTraces.set(step.filePath, { resolve, reject }))
+    this.packages.set(step.filePath, packages)
+
+    return packages
+  }
+
+  private async traceImports(pendingTraces: Map<string, PendingTrace>): Promise<void> {
+    try {
+      const { packages } = await this.getPythonBuilderData([...pendingTraces.keys()])
+
+      pendingTraces.forEach(({ resolve }, filePath) => resolve(packages[filePath] ?? []))
+    } catch (err) {
+      pendingTraces.forEach(({ reject }) => reject(err as Error))
+    }
+  }
+
+  private async getPythonBuilderData(filePaths: string[]): Promise<{ packages: Record<string, string[]> }> {
     return new Promise((resolve, reject) => {
-      const child = spawn('python', [path.join(__dirname, 'python-builder.py'), step.filePath], {
+      const child = spawn('python', [path.join(__dirname, 'python-builder.py'), ...filePaths], {
         cwd: this.builder.projectDir,
         stdio: [undefined, undefined, 'pipe', 'ipc'],
       })
       const err: string[] = []
 
-      child.on('stderr', (data) => err.push(data.toString()))
-      child.on('message', resolve)
+      child.stderr?.on('data', (data) => err.push(data.toString()))
+      child.on('message', (message) => resolve(message as { packages: Record<string, string[]> }))
       child.on('close', (code) => {
         if (code !== 0) {
           reject(new Error(err.join('')))
@@ -1,29 +1,27 @@
 import os
 import sys
 import json
-import importlib.util
+import sysconfig
 import traceback
-import site
-import builtins
+import hashlib
 import ast
 import importlib.metadata
-import subprocess
 import re
-from typing import Set, List, Tuple, Optional, Dict, Any
-from pathlib import Path
+from typing import Set, List, Optional, Dict, Any
 from functools import lru_cache
 
 NODEIPCFD = int(os.environ["NODE_CHANNEL_FD"])
 
-# Cache for built-in modules to avoid repeated checks
-_builtin_modules_cache: Set[str] = set()
+# Bump when the cached results change shape or meaning
+CACHE_VERSION = 3
+CACHE_FILE = os.path.join(os.getcwd(), '.motia', 'python-builder-cache.json')
 
 @lru_cache(maxsize=1024)
 def is_valid_package_name(name: str) -> bool:
     """Check if a name is a valid package name."""
     if not name or name.startswith('_'):
         return False
-    
+
     # Skip common special cases
     invalid_names = {'__main__', 'module', 'cython_runtime', 'builtins'}
     return name not in invalid_names
@@ -41,6 +39,11 @@ def clean_package_name(package_name: str) -> str:
     # Remove any remaining whitespace and convert underscores to hyphens
     return package_name.strip().replace('_', '-')
 
+@lru_cache(maxsize=1024)
+def normalize_distribution_name(name: str) -> str:
+    """Normalize a distribution name as in PEP 503, so 'PyYAML' and 'pyyaml' match."""
+    return re.sub(r'[-_.]+', '-', name).lower()
+
 @lru_cache(maxsize=1024)
 def extract_base_package_name(dependency_spec: str) -> str:
     """
@@ -53,166 +56,259 @@ def extract_base_package_name(dependency_spec: str) -> str:
     """
     # First, remove any conditions after semicolon
     base_spec = dependency_spec.split(';')[0].strip()
-    
+
     # Extract the package name before any version specifiers or extras
     match = re.match(r'^([a-zA-Z0-9_.-]+)(?:\[[^\]]+\])?(?:\s*\([^)]*\))?$', base_spec)
-    
+
     return clean_package_name(match.group(1) if match else base_spec)
 
 @lru_cache(maxsize=1024)
-def is_package_installed(package_name: str) -> bool:
-    """Check if a package is installed in the current environment."""
-    try:
-        # Try both hyphenated and non-hyphenated versions
-        try:
-            importlib.metadata.distribution(package_name)
-            return True
-        except importlib.metadata.PackageNotFoundError:
-            # Try with hyphens replaced by underscores
-            alt_name = package_name.replace('-', '_')
-            if alt_name != package_name:
-                importlib.metadata.distribution(alt_name)
-                return True
-            return False
-    except importlib.metadata.PackageNotFoundError:
-        return False
+def is_optional_dependency(req: str) -> bool:
+    """Check if a dependency is only required by an extra of the package."""
+    marker = req.split(';', 1)[1] if ';' in req else ''
+    return re.search(r'\bextra\s*==', marker) is not None
+
+def _stdlib_module_names() -> Set[str]:
+    """Top-level names of the standard library, without importing anything."""
+    if hasattr(sys, 'stdlib_module_names'):
+        return set(sys.stdlib_module_names)
+
+    # Python < 3.10, look for the modules in the stdlib directory instead
+    names = set(sys.builtin_module_names)
+    stdlib_paths = {sysconfig.get_paths()['stdlib'], sysconfig.get_paths()['platstdlib']}
+    for stdlib_path in stdlib_paths:
+        for directory in (stdlib_path, os.path.join(stdlib_path, 'lib-dynload')):
+            if not os.path.isdir(directory):
+                continue
+            for entry in os.listdir(directory):
+                name = entry.split('.')[0]
+                if name and name != 'site-packages' and name.isidentifier():
+                    names.add(name)
+    return names
+
+STDLIB_MODULES = _stdlib_module_names()
 
-@lru_cache(maxsize=1024)
 def is_builtin_module(module_name: str) -> bool:
     """Check if a module is a Python built-in module."""
-    if module_name in _builtin_modules_cache:
-        return True
-        
-    try:
-        module = importlib.import_module(module_name)
-        
-        # Built-in modules either have no __file__ attribute or their file is in the standard library
-        if not hasattr(module, '__file__'):
-            _builtin_modules_cache.add(module_name)
+    return get_package_name(module_name) in STDLIB_MODULES
+
+def is_local_module(module_name: str, directories: List[str]) -> bool:
+    """Check if a top-level module is a file or package of the project rather than an installed one."""
+    for directory in directories:
+        path = os.path.join(directory, module_name)
+        if os.path.isfile(f'{path}.py') or os.path.isdir(path):
             return True
-            
-        # Get the standard library path
-        stdlib_path = os.path.dirname(os.__file__)
-        
-        # Check if the module's file is in the standard library
-        is_builtin = module.__file__ and module.__file__.startswith(stdlib_path)
-        if is_builtin:
-            _builtin_modules_cache.add(module_name)
-        return is_builtin
-    except ImportError:
-        return False
+    return False
 
 def get_direct_imports(file_path: str) -> Set[str]:
     """Extract direct imports from a Python file using AST parsing."""
     direct_imports = set()
-    
+
     try:
         with open(file_path, 'r') as f:
             content = f.read()
-        
+
         tree = ast.parse(content)
         for node in ast.walk(tree):
             if isinstance(node, ast.Import):
                 for name in node.names:
-                    base_pkg = name.name.split('.')[0]
+                    base_pkg = get_package_name(name.name)
                     if is_valid_package_name(base_pkg) and not is_builtin_module(base_pkg):
                         direct_imports.add(base_pkg)
             elif isinstance(node, ast.ImportFrom):
-                if node.module:
-                    base_pkg = node.module.split('.')[0]
+                # relative imports are files of the project, not packages
+                if node.module and node.level == 0:
+                    base_pkg = get_package_name(node.module)
                     if is_valid_package_name(base_pkg) and not is_builtin_module(base_pkg):
                         direct_imports.add(base_pkg)
     except Exception as e:
         print(f"Warning: Could not parse imports from {file_path}: {str(e)}")
-    
+
     return direct_imports
 
-@lru_cache(maxsize=1024)
-def is_optional_dependency(req: str) -> bool:
-    """Check if a dependency is an optional dependency."""
-    return '[' in req or 'extra ==' in req
+class DistributionIndex:
+    """Installed distributions and the top-level modules they provide, read from metadata only.
+
+    Nothing is imported, so tracing torch costs the same as tracing a pure Python package.
+    """
+
+    def __init__(self):
+        self.module_distributions: Dict[str, List[str]] = {}
+        self.distribution_modules: Dict[str, Set[str]] = {}
+        self._requires: Dict[str, List[str]] = {}
+
+        for module, distributions in _packages_distributions().items():
+            for distribution in distributions:
+                name = normalize_distribution_name(distribution)
+                self.module_distributions.setdefault(module, []).append(name)
+                self.distribution_modules.setdefault(name, set()).add(module)
+
+    def requires(self, distribution: str) -> List[str]:
+        """Names of the installed distributions a distribution depends on, without extras"""
+        if distribution in self._requires:
+            return self._requires[distribution]
 
-def get_package_dependencies(package_name: str, processed: Set[str] = None) -> Set[str]:
-    """Get all dependencies (including sub-dependencies) for a given package."""
-    if processed is None:
-        processed = set()
-    
-    if package_name in processed or is_builtin_module(package_name):
-        return set()
-    
-    processed.add(package_name)
-    all_dependencies = set()
-    
-    try:
-        # Try to get the distribution
         try:
-            dist = importlib.metadata.distribution(package_name)
+            requirements = importlib.metadata.distribution(distribution).requires or []
         except importlib.metadata.PackageNotFoundError:
-            print(f'Warning: Package {package_name} not found')
-            return all_dependencies
-
-        # Filter out optional dependencies
-        sub_dependencies = list(filter(lambda dep: not is_optional_dependency(dep), dist.requires or []))
-        
-        # Get direct dependencies
-        for req in sub_dependencies:                
-            base_pkg = extract_base_package_name(req)
-            
-            if base_pkg and base_pkg not in processed:
-                # Try both hyphenated and non-hyphenated versions
-                for dep_name in [base_pkg, base_pkg.replace('-', '_'), base_pkg.replace('_', '-')]:
-                    try:
-                        importlib.import_module(dep_name)
-                        all_dependencies.add(dep_name)
-                        # Recursively get sub-dependencies
-                        all_dependencies.update(get_package_dependencies(dep_name, processed))
-                        break
-                    except ImportError:
-                        continue
-            
-    except Exception as e:
-        print(f"Warning: Error processing {package_name}: {str(e)}")
-    
-    return all_dependencies
-
-def trace_imports(entry_file: str) -> List[str]:
-    """Find all imported Python packages and files starting from an entry file."""
-    entry_file = os.path.abspath(entry_file)
-    module_dir = os.path.dirname(entry_file)
-    
-    if module_dir not in sys.path:
-        sys.path.insert(0, module_dir)
-    
-    # Get direct imports from the entry file
-    direct_imports = get_direct_imports(entry_file)
-    
-    # Initialize sets to track packages
-    all_packages = set()
-    processed_packages = set()
-    
-    # Process each direct import and its dependencies
-    for package_name in direct_imports:
-        if is_valid_package_name(package_name):
-            all_packages.add(package_name)
-            # Get all dependencies including sub-dependencies
-            all_packages.update(get_package_dependencies(package_name, processed_packages))
-    
-    # Filter out built-in packages
-    non_builtin_packages = {pkg for pkg in all_packages if not is_builtin_module(pkg)}
-    
-    return sorted(list(non_builtin_packages))
+            print(f'Warning: Package {distribution} not found')
+            requirements = []
+
+        names = []
+        for req in requirements:
+            if is_optional_dependency(req):
+                continue
+            name = normalize_distribution_name(extract_base_package_name(req))
+            if name in self.distribution_modules:
+                names.append(name)
+
+        self._requires[distribution] = names
+        return names
+
+    def packages(self, modules: Set[str], local_dirs: List[str]) -> Set[str]:
+        """Top-level modules of everything needed by the given imports, dependencies included.
+
+        Imports of modules living in `local_dirs`, e.g. `from steps.utils import x`, are files
+        of the project rather than packages, and are left out.
+        """
+        packages = set()
+        pending = []
+
+        for module in modules:
+            distributions = self.module_distributions.get(module)
+            if distributions:
+                pending.extend(distributions)
+            elif module.startswith('motia_') or not is_local_module(module, local_dirs):
+                # not installed as a distribution, keep it so the build can report it.
+                # The core modules, e.g. motia_cache, are bundled from @motiadev/core.
+                packages.add(module)
+
+        processed = set()
+        while pending:
+            distribution = pending.pop()
+            if distribution in processed:
+                continue
+            processed.add(distribution)
+            packages.update(self.distribution_modules.get(distribution, ()))
+            pending.extend(self.requires(distribution))
+
+        return {pkg for pkg in packages if is_valid_package_name(pkg) and not is_builtin_module(pkg)}
+
+def _packages_distributions() -> Dict[str, List[str]]:
+    if hasattr(importlib.metadata, 'packages_distributions'):
+        return importlib.metadata.packages_distributions()
+
+    # Python < 3.10, same lookup as packages_distributions
+    mapping: Dict[str, List[str]] = {}
+    for dist in importlib.metadata.distributions():
+        top_level = dist.read_text('top_level.txt')
+        if top_level:
+            modules = top_level.split()
+        else:
+            modules = {file.parts[0].split('.')[0] for file in dist.files or [] if file.parts}
+        for module in filter(str.isidentifier, modules):
+            mapping.setdefault(module, []).append(dist.metadata['Name'])
+    return mapping
+
+def environment_key() -> str:
+    """Identify the interpreter and the installed distributions, including their versions"""
+    digest = hashlib.sha256(f'{CACHE_VERSION}:{sys.executable}:{sys.version}'.encode('utf-8'))
+
+    for path in sys.path:
+        if not path or not os.path.isdir(path):
+            continue
+        entries = sorted(
+            entry for entry in os.listdir(path) if entry.endswith(('.dist-info', '.egg-info', '.egg-link', '.pth'))
+        )
+        digest.update(f'{path}:{",".join(entries)}'.encode('utf-8'))
+
+    return digest.hexdigest()
+
+def file_hash(file_path: str) -> str:
+    with open(file_path, 'rb') as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+def load_cache(environment: str) -> Dict[str, Any]:
+    """Results of previous builds, dropped as soon as anything was installed or upgraded"""
+    try:
+        with open(CACHE_FILE, 'r') as f:
+            cache = json.load(f)
+        if cache.get('environment') == environment:
+            return cache
+    except (OSError, ValueError):
+        pass
+
+    return {'environment': environment, 'files': {}}
+
+def save_cache(cache: Dict[str, Any]) -> None:
+    try:
+        os.makedirs(os.path.dirname(CACHE_FILE), exist_ok=True)
+        temp_file = f'{CACHE_FILE}.{os.getpid()}'
+        with open(temp_file, 'w') as f:
+            json.dump(cache, f)
+        os.replace(temp_file, CACHE_FILE)
+    except OSError as e:
+        print(f"Warning: Could not write the dependency cache: {str(e)}")
+
+def local_directories(path: str) -> List[str]:
+    """Directories whose modules a step imports as files of the project"""
+    # the runner imports steps with the project, their directory and its parent on sys.path
+    step_dir = os.path.dirname(path)
+    return [os.getcwd(), step_dir, os.path.dirname(step_dir)]
+
+def local_modules(modules: Set[str], local_dirs: List[str]) -> Dict[str, bool]:
+    """Whether each import is a file of the project, which the packages of a step depend on"""
+    return {module: is_local_module(module, local_dirs) for module in sorted(modules)}
+
+def trace_imports(entry_files: List[str]) -> Dict[str, List[str]]:
+    """Find all imported Python packages for each entry file.
+
+    Files whose content did not change since the last build, in the same environment,
+    and whose imports resolve to the same project files, are answered from the cache.
+    The distributions are only indexed on a miss.
+    """
+    cache = load_cache(environment_key())
+    index: Optional[DistributionIndex] = None
+    result: Dict[str, List[str]] = {}
+
+    for entry_file in entry_files:
+        path = os.path.abspath(entry_file)
+        digest = file_hash(path)
+        cached = cache['files'].get(path)
+        local_dirs = local_directories(path)
+
+        # a project file added or removed turns an import into a package or the other way around
+        if (
+            cached
+            and cached.get('hash') == digest
+            and cached['local'] == local_modules(set(cached['local']), local_dirs)
+        ):
+            result[entry_file] = cached['packages']
+            continue
+
+        if index is None:
+            index = DistributionIndex()
+
+        imports = get_direct_imports(path)
+        packages = sorted(index.packages(imports, local_dirs))
+        cache['files'][path] = {'hash': digest, 'packages': packages, 'local': local_modules(imports, local_dirs)}
+        result[entry_file] = packages
+
+    if index is not None:
+        save_cache(cache)
+
+    return result
 
 def main() -> None:
     """Main entry point for the script."""
-    if len(sys.argv) != 2:
-        print("Usage: python python-builder.py <entry_file>", file=sys.stderr)
+    if len(sys.argv) < 2:
+        print("Usage: python python-builder.py <entry_file> [<entry_file> ...]", file=sys.stderr)
         sys.exit(1)
 
-    entry_file = sys.argv[1]
+    entry_files = sys.argv[1:]
     try:
-        packages = trace_imports(entry_file)
         output = {
-            'packages': packages
+            'packages': trace_imports(entry_files)
         }
         bytes_message = (json.dumps(output) + '\n').encode('utf-8')
         os.write(NODEIPCFD, bytes_message)
@@ -1,78 +1,88 @@
+import copy
 from fastapi import FastAPI, Request, Response
+# orjson when it is installed, with the same encoders as the local runtime for the types
+# JSON has no notion of, e.g. datetimes, decimals, UUIDs, sets, enums, dataclasses and models
+from motia_serializer import dumps as encode_json, loads as decode_json
 # {{imports}}
 
-def create_api_step_handler(handler, config):
+class JSONResponse(Response):
+    """Encodes the body once with the motia serializer, skipping FastAPI's jsonable_encoder pass"""
+    media_type = 'application/json'
+
+    def render(self, content) -> bytes:
+        return content if isinstance(content, bytes) else encode_json(content)
+
+# Responses that must not have a body, e.g. a 304 from the cache middleware
+NO_BODY_STATUSES = {204, 304}
+
+# Bodies that never change, encoded once
+EMPTY_BODY = encode_json({})
+INTERNAL_SERVER_ERROR_BODY = encode_json({'error': 'Internal server error'})
+NOT_FOUND_BODY = encode_json({'error': 'Not found'})
+
+def with_middleware(middleware, next_handler):
     async def middleware_handler(req, ctx):
-        if not config.get('middleware'):
-            return await handler(req, ctx)
-        
-        # # Compose middleware in reverse order
-        composed_handler = lambda: handler(req, ctx)
-        for middleware in reversed(config.get('middleware', [])):
-            current_handler = composed_handler
-            composed_handler = lambda: middleware(req, ctx, current_handler)
-        
-        return await composed_handler()
-    
+        return await middleware(req, ctx, lambda: next_handler(req, ctx))
+
     return middleware_handler
 
+def create_api_step_handler(handler, config):
+    """Compose the middleware of a step once, the first one in the list runs first"""
+    composed_handler = handler
+    for middleware in reversed(config.get('middleware') or []):
+        composed_handler = with_middleware(middleware, composed_handler)
+
+    return composed_handler
+
 def create_context(context, step_name):
-    context.logger = context.logger.child({ 'step': step_name })
+    # every step gets its own context, otherwise the loggers of all steps get chained
+    step_context = copy.copy(context)
+    step_context.logger = context.logger.child({ 'step': step_name })
 
-    return context
+    return step_context
 
-async def router(handler, config, context):
-    async def route(request: Request, response: Response):
+def router(handler, config, context):
+    middleware_handler = create_api_step_handler(handler, config)
+
+    async def route(request: Request) -> Response:
+        body = await request.body()
         data = {
-            "body": await request.json() if await request.body() else {},
+            "body": decode_json(body) if body else {},
             "headers": dict(request.headers),
             "path_params": request.path_params,
             "query_params": dict(request.query_params)
         }
 
         try:
-            middleware_handler = create_api_step_handler(handler, config)
             result = await middleware_handler(data, context)
 
-            if result:
-                if result.get('headers'):
-                    for key, value in result['headers'].items():
-                        response.headers[key] = value
-
-                response.status_code = result['status']
-                return result['body']
+            if result and result['status'] in NO_BODY_STATUSES:
+                return Response(status_code = result['status'], headers = result.get('headers'))
+            elif result:
+                return JSONResponse(
+                    content = result['body'],
+                    status_code = result['status'],
+                    headers = result.get('headers')
+                )
             else:
-                response.status_code = 200
-                return {}
+                return JSONResponse(content = EMPTY_BODY, status_code = 200)
 
         except Exception as error:
             context.logger.error('Internal server error', {'error': str(error)})
-            response.status_code = 500
-            return {'error': 'Internal server error'}
+            return JSONResponse(content = INTERNAL_SERVER_ERROR_BODY, status_code = 500)
 
     return route
 
 def setup_router(context) -> FastAPI:
     app = FastAPI()
 
-    # Generated code should look like this:
-    # @app.get('/')
-    # async def handler_0(request: Request, response: Response):
-    #     handler_route = await router(handler, config, create_context(context, 'StepName'))
-    #     return await handler_route(request, response)
+    # Generated code should look like this, every route is built once here:
+    # app.add_api_route('/', router(handler, config, create_context(context, 'StepName')), methods=['GET'])
 
     # {{routes}}
 
-    @app.middleware("http")
-    async def not_found(request: Request, call_next):
-        response = await call_next(request)
-
-        if response.status_code == 404:
-            return Response(
-                content = '{"error": "Not found"}',
-                status_code = 404,
-                media_type = 'application/json'
-            )
-        return response
+    @app.exception_handler(404)
+    async def not_found(request: Request, exc: Exception):
+        return JSONResponse(content = NOT_FOUND_BODY, status_code = 404)
 
     return app
@@ -1,4 +1,4 @@
-import { LockedData, Step, getStepConfig, getStreamConfig } from '@motiadev/core'
+import { LockedData, Step, getStepConfigs, getStreamConfig } from '@motiadev/core'
 import { NoPrinter, Printer } from '@motiadev/core/dist/src/printer'
 import { randomUUID } from 'crypto'
 import { globSync } from 'glob'
@@ -23,8 +23,11 @@ export const collectFlows = async (projectDir: string, lockedData: LockedData):
     ...globSync(path.join(projectDir, '{steps,streams}/**/*_stream.{ts,js,py}')),
   ]
 
+  // Python configs are read in one batch instead of one interpreter per file
+  const stepConfigs = await getStepConfigs(stepFiles)
+
   for (const filePath of stepFiles) {
-    const config = await getStepConfig(filePath)
+    const config = stepConfigs[filePath]
 
     if (!config) {
       console.warn(`No config found in step ${filePath}, step skipped`)
@@ -1,4 +1,4 @@
-import { getStepConfig, getStreamConfig, LockedData, Printer } from '@motiadev/core'
+import { getStepConfigs, getStreamConfig, LockedData, Printer } from '@motiadev/core'
 import { randomUUID } from 'crypto'
 import { globSync } from 'glob'
 import path from 'path'
@@ -11,8 +11,10 @@ export const generateTypes = async (projectDir: string) => {
   const streamsFiles = globSync('**/*.stream.{ts,js,py,rb}', { absolute: true, cwd: stepsDir })
   const lockedData = new LockedData(projectDir, 'memory', new Printer(projectDir))
 
+  const stepConfigs = await getStepConfigs(files)
+
   for (const filePath of files) {
-    const config = await getStepConfig(filePath)
+    const config = stepConfigs[filePath]
 
     if (config) {
       lockedData.createStep({ filePath, version, config }, { disableTypeCreation: true })
@@ -1,6 +1,6 @@
 import React from 'react'
 import { TraceEvent as TraceEventType } from '@/types/observability'
-import { MessageCircle, Package, Radio, ScrollText } from 'lucide-react'
+import { MessageCircle, Package, Radio, ScrollText, Timer } from 'lucide-react'
 
 type Props = {
   event: TraceEventType
@@ -15,5 +15,7 @@ export const EventIcon: React.FC<Props> = ({ event }) => {
     return <Package className="w-4 h-4 text-muted-foreground" />
   } else if (event.type === 'stream') {
     return <Radio className="w-4 h-4 text-muted-foreground" />
+  } else if (event.type === 'timing') {
+    return <Timer className="w-4 h-4 text-muted-foreground" />
   }
 }
@@ -4,6 +4,7 @@ import { TraceEmitEvent } from './trace-emit-event'
 import { TraceLogEvent } from './trace-log-event'
 import { TraceStateEvent } from './trace-state-event'
 import { TraceStreamEvent } from './trace-stream-event'
+import { TraceTimingEvent } from './trace-timing-event'
 
 export const TraceEvent: React.FC<{ event: TraceEventType }> = memo(({ event }) => {
   if (event.type === 'log') {
@@ -14,5 +15,7 @@ export const TraceEvent: React.FC<{ event: TraceEventType }> = memo(({ event })
     return <TraceStateEvent event={event} />
   } else if (event.type === 'stream') {
     return <TraceStreamEvent event={event} />
+  } else if (event.type === 'timing') {
+    return <TraceTimingEvent event={event} />
   }
 })
@@ -0,0 +1,16 @@
+import { TimingEvent } from '@/types/observability'
+import React from 'react'
+
+const formatDuration = (duration: number) => (duration < 1 ? `${duration.toFixed(3)}ms` : `${duration.toFixed(1)}ms`)
+
+export const TraceTimingEvent: React.FC<{ event: TimingEvent }> = ({ event }) => {
+  return (
+    <div className="flex items-center gap-2">
+      <span className="font-mono">{event.name}</span>
+      <span className="text-muted-foreground">
+        {formatDuration(event.duration)}
+        {event.total && ' in total'}
+      </span>
+    </div>
+  )
+}
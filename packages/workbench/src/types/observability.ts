@@ -32,7 +32,7 @@ export type TraceError = {
   stack?: string
 }
 
-export type TraceEvent = StateEvent | EmitEvent | StreamEvent | LogEntry
+export type TraceEvent = StateEvent | EmitEvent | StreamEvent | LogEntry | TimingEvent
 
 export type StateOperation = 'get' | 'getGroup' | 'set' | 'delete' | 'clear'
 export type StreamOperation = 'get' | 'getGroup' | 'set' | 'delete' | 'clear' | 'send'
@@ -72,6 +72,14 @@ export interface LogEntry {
   metadata?: unknown
 }
 
+export interface TimingEvent {
+  type: 'timing'
+  timestamp: number
+  name: string
+  duration: number
+  total?: boolean
+}
+
 export interface ObservabilityStats {
   total: number
   running: number
@@ -39,7 +39,9 @@ async def handler(input, context):
     for chunk in response:
         if chunk.choices[0].delta.content:
             message_result.append(chunk.choices[0].delta.content)
-            context.streams.message_python.set(thread_id, assistant_message_id, {"message": "".join(message_result)})
+            context.streams.message_python.set(
+                thread_id, assistant_message_id, {"message": "".join(message_result)}, coalesce_ms=50
+            )
 
     context.streams.message_python.set(thread_id, assistant_message_id, {"message": "".join(message_result)})
 